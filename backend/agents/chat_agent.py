@@ -1,16 +1,20 @@
 from config import settings
 from langchain_openai import ChatOpenAI
+from services.llm_governor import llm_clients
+from services.model_router import model_router
 
 async def run_general_chat(query: str, portfolio_context: list, conversation_history: list) -> dict:
     """Simple LLM chat when no ticker is involved."""
-    llm = ChatOpenAI(model=settings.openai_model, temperature=0.7, api_key=settings.openai_api_key)
+    llm = ChatOpenAI(model=model_router.model_for("chat"), temperature=0.7, api_key=settings.openai_api_key, base_url=settings.openai_base_url,
+                     **llm_clients.for_agent("chat"))
     
     system_prompt = """You are Sentinel AI, a helpful financial assistant.
     You can analyze stocks (e.g. "Analyze AAPL") or discuss general market concepts.
     If the user asks for financial advice, remind them you are an educational tool."""
     
     messages = [("system", system_prompt)]
-    for m in conversation_history[-6:]:
+    # Already compacted by conversation memory (summary + recent turns)
+    for m in conversation_history:
         role = m.get('role', 'user') if isinstance(m, dict) else m.role
         content = m.get('content', '') if isinstance(m, dict) else m.content
         messages.append((role, content))
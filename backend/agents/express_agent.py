@@ -0,0 +1,77 @@
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+from agents.state import AnalysisState
+from agents.supervisor_agent import _fallback_decision, _get_structured_decision, _portfolio_summary
+from prompts.express import EXPRESS_SYSTEM_ADDENDUM, EXPRESS_USER_TEMPLATE
+from prompts.supervisor import SUPERVISOR_SYSTEM_PROMPT, SUPERVISOR_OUTPUT_FORMAT
+from config import settings
+from services.llm_cache import llm_cache
+from services.llm_governor import llm_clients
+from services.model_router import model_router
+from services.prompt_budget import compact_number, prompt_budget, rank_headlines
+from services.technical_signals import TechnicalSignalEngine
+from typing import Any, Dict
+
+# Headlines passed to the single call (the specialists' sentiment pass reads up to 15)
+EXPRESS_HEADLINES = 8
+
+
+def _data_lines(values: Dict[str, Any]) -> str:
+    """One "key: value" line per available field, numbers compacted."""
+    lines = [f"- {key}: {compact_number(value)}" for key, value in values.items()
+             if value is not None and not isinstance(value, (dict, list))]
+    return "\n".join(lines) or "Unavailable."
+
+
+def express_analysis_node(state: AnalysisState) -> dict:
+    """
+    LangGraph node for mode="express": one supervisor-style call on the gathered
+    data instead of three specialist reports plus a synthesis. Emits the same
+    SupervisorDecision fields as the supervisor node.
+    """
+    ticker = state["ticker"]
+    stock_info = state.get("stock_info") or {}
+    sentiment = state.get("sentiment_scores") or {}
+    articles = state.get("news_articles") or []
+
+    if not (state.get("technical_indicators") or state.get("fundamentals") or sentiment or articles):
+        state.setdefault("errors", []).append("express_no_data")
+        return _fallback_decision(state)
+
+    llm = ChatOpenAI(
+        model=model_router.model_for("express"),
+        temperature=0.1,
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        cache=llm_cache.for_agent("express"),
+        **llm_clients.for_agent("express"),
+    )
+
+    headlines = "No recent headlines available."
+    if articles:
+        ranked = rank_headlines(articles, ticker, stock_info.get("name"))[:EXPRESS_HEADLINES]
+        headlines = "\n".join(f"- [{a.get('source', 'Unknown')}] {a.get('headline', '')}" for a in ranked)
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SUPERVISOR_SYSTEM_PROMPT + EXPRESS_SYSTEM_ADDENDUM + f"\n\n{SUPERVISOR_OUTPUT_FORMAT}"),
+        ("human", EXPRESS_USER_TEMPLATE),
+    ])
+
+    messages = prompt_budget.render("express", prompt, {
+        "ticker": ticker,
+        "company_name": stock_info.get("name", ticker),
+        "sector": stock_info.get("sector", "Unknown"),
+        "technical_data": _data_lines(state.get("technical_indicators") or {}),
+        "quant_signals": TechnicalSignalEngine.summary_block(state.get("technical_signals") or {}),
+        "fundamental_data": _data_lines((state.get("fundamentals") or {}).get("yfinance", {})),
+        "sentiment_data": _data_lines(sentiment),
+        "analyst_rating": stock_info.get("avg_analyst_rating", "N/A"),
+        "news_headlines": headlines,
+        "query": state.get("query", ""),
+        "portfolio_summary": _portfolio_summary(state),
+    }, shrink=("news_headlines",))
+
+    update = _get_structured_decision(llm, messages, state)
+    if update.get("decision") is not None:
+        update["messages"] = [f"Express analysis completed for {ticker}"]
+    return update
@@ -3,6 +3,10 @@ from langchain_core.prompts import ChatPromptTemplate
 from agents.state import AnalysisState
 from prompts.fundamental import FUNDAMENTAL_SYSTEM_PROMPT, FUNDAMENTAL_USER_TEMPLATE
 from config import settings
+from services.llm_cache import llm_cache
+from services.llm_governor import llm_clients
+from services.model_router import model_router
+from services.prompt_budget import compact_number as fmt, prompt_budget
 
 def fundamental_analysis_node(state: AnalysisState) -> dict:
     """LangGraph node: Fundamental Analysis Agent."""
@@ -17,9 +21,12 @@ def fundamental_analysis_node(state: AnalysisState) -> dict:
         }
 
     llm = ChatOpenAI(
-        model=settings.openai_model,
+        model=model_router.model_for("fundamental"),
         temperature=0.1,
         api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        cache=llm_cache.for_agent("fundamental"),
+        **llm_clients.for_agent("fundamental"),
     )
 
     # Extract yfinance fundamentals (our primary fallback)
@@ -30,19 +37,7 @@ def fundamental_analysis_node(state: AnalysisState) -> dict:
         ("human", FUNDAMENTAL_USER_TEMPLATE),
     ])
 
-    chain = prompt | llm
-
-    def fmt(val):
-        """Format a value for prompt injection. Returns 'N/A' for None."""
-        if val is None:
-            return "N/A"
-        if isinstance(val, (int, float)) and val > 1_000_000:
-            return f"{val:,.0f}"
-        if isinstance(val, float):
-            return f"{val:.4f}"
-        return str(val)
-
-    response = chain.invoke({
+    messages = prompt_budget.render("fundamental", prompt, {
         "ticker": ticker,
         "company_name": stock_info.get("name", ticker),
         "sector": stock_info.get("sector", "Unknown"),
@@ -69,6 +64,7 @@ def fundamental_analysis_node(state: AnalysisState) -> dict:
         "ev_to_ebitda": fmt(yf_data.get("ev_to_ebitda")),
         "market_cap": fmt(yf_data.get("market_cap") or stock_info.get("market_cap")),
     })
+    response = llm.invoke(messages)
 
     return {
         "fundamental_report": response.content,
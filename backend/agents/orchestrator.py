@@ -5,46 +5,60 @@ from agents.technical_agent import technical_analysis_node
 from agents.fundamental_agent import fundamental_analysis_node
 from agents.sentiment_agent import sentiment_analysis_node
 from agents.supervisor_agent import supervisor_node
+from agents.express_agent import express_analysis_node
 from services.market_data_service import MarketDataService
 from services.fundamentals_service import FundamentalsService
 from services.news_service import NewsService
+from services.news_summary_service import news_summaries
 import asyncio
 import json
 from config import settings
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from services.entity_resolution_service import EntityResolutionService
+from services.symbol_master import symbol_master
+from services.technical_signals import technical_signals
 from agents.portfolio_agent import run_portfolio_qa
 from agents.chat_agent import run_general_chat
+from services.conversation_memory import MemoryContext, conversation_memory
 
 # --- Data Gathering Node ---
-def gather_data_node(state: AnalysisState) -> dict:
+async def gather_data_node(state: AnalysisState) -> dict:
     """
     First node in the graph.
-    Fetches all required data from external APIs in parallel (where possible)
+    Fetches all required data from external APIs concurrently
     to populate the state for downstream agents.
     """
     ticker = state["ticker"]
-    
-    # We can run these synchronously for now, or use asyncio.gather if services were async.
-    # Since services use blocking requests, we'll just call them sequentially here
-    # or wrap them in threads if performance becomes an issue. 
-    # For Phase 4 prototype, sequential is fine as they are fast/cached.
-    
-    prices = MarketDataService.get_price_history(ticker)
-    # V4: Deep Technical Metrics
-    tech_indicators = MarketDataService.compute_technical_indicators(prices)
-    stock_info = MarketDataService.get_stock_info(ticker)
-    
-    fundamentals = FundamentalsService.get_fundamentals(ticker)
-    
+
+    def _technicals():
+        prices = MarketDataService.get_price_history(ticker)
+        # V4: Deep Technical Metrics
+        return MarketDataService.compute_technical_indicators(prices)
+
+    # Blocking SDK calls (Massive, yfinance) run in threads; HTTP providers use the shared async transport.
     news_svc = NewsService()
-    news = news_svc.get_company_news(ticker)
-    sentiment = news_svc.get_sentiment_score(ticker)
+
+    async def _news():
+        articles = await news_svc.aget_company_news(ticker)
+        # Digest calls are skipped in the latency-sensitive modes
+        if settings.ENABLE_NEWS_LLM_SUMMARY and state.get("mode", "full") == "full":
+            # Digests are cached per story, so this is usually free after the first request
+            articles = await news_summaries.attach(articles)
+        return articles
+
+    tech_indicators, stock_info, fundamentals, news, sentiment = await asyncio.gather(
+        asyncio.to_thread(_technicals),
+        asyncio.to_thread(MarketDataService.get_stock_info, ticker),
+        FundamentalsService.aget_fundamentals(ticker),
+        _news(),
+        news_svc.aget_sentiment_score(ticker),
+    )
     
     return {
         "price_data": tech_indicators, # Legacy support (aliased)
         "technical_indicators": tech_indicators, # New V4 field
+        "technical_signals": technical_signals.evaluate(tech_indicators),
         "stock_info": stock_info,
         "fundamentals": fundamentals,
         "news_articles": news,
@@ -84,8 +98,26 @@ def build_analysis_graph():
 
     return workflow.compile()
 
+def build_express_graph():
+    """Single-call workflow for mode="express": gather data, then one decision call."""
+    workflow = StateGraph(AnalysisState)
+
+    workflow.add_node("gather_data", gather_data_node)
+    workflow.add_node("express", express_analysis_node)
+
+    workflow.add_edge(START, "gather_data")
+    workflow.add_edge("gather_data", "express")
+    workflow.add_edge("express", END)
+
+    return workflow.compile()
+
 # Compile once at module level
 analysis_graph = build_analysis_graph()
+express_graph = build_express_graph()
+
+
+def _graph_for(mode: str):
+    return express_graph if mode == "express" else analysis_graph
 
 async def run_analysis(
     query: str,
@@ -93,6 +125,9 @@ async def run_analysis(
     portfolio_context: list,
     conversation_history: list,
     trace_id: str | None = None,
+    mode: str = "full",
+    skip_technical_llm: bool = False,
+    session_id: str | None = None,
 ) -> dict:
     """
     Entry point called by the /api/analyze endpoint.
@@ -100,7 +135,22 @@ async def run_analysis(
     - TICKER_ANALYSIS -> Orchestrator Graph
     - PORTFOLIO_QA -> Portfolio RAG/LLM
     - GENERIC_CHAT -> Conversational Fallback
+    Prior conversation comes from the session's rolling memory (summary + recent turns).
     """
+    memory = conversation_memory.context(session_id, conversation_history)
+    result = await _route_analysis(query, ticker, portfolio_context, memory, trace_id, mode, skip_technical_llm)
+    conversation_memory.record(session_id, query, result.get("synthesis") or "")
+    return result
+
+async def _route_analysis(
+    query: str,
+    ticker: str | None,
+    portfolio_context: list,
+    memory: MemoryContext,
+    trace_id: str | None,
+    mode: str,
+    skip_technical_llm: bool,
+) -> dict:
     # 1. Resolve Entity & Intent
     resolution = await EntityResolutionService.resolve(query, portfolio_context)
     intent = resolution["intent"]
@@ -112,19 +162,20 @@ async def run_analysis(
 
     # 2. Routing
     if intent in ["PORTFOLIO_QA", "HOLDINGS_LOOKUP"]:
-        return await run_portfolio_qa(query, portfolio_context, conversation_history)
+        return await run_portfolio_qa(query, portfolio_context, memory.messages())
     
     if intent == "GENERIC_CHAT" or not ticker:
-        return await run_general_chat(query, portfolio_context, conversation_history)
+        return await run_general_chat(query, portfolio_context, memory.messages())
+
+    # 3. Validate the ticker before any provider or LLM call
+    ticker, rejection = await _validate_ticker(ticker)
+    if rejection:
+        return rejection
 
-    # 3. TICKER_ANALYSIS -> Run Graph
+    # 4. TICKER_ANALYSIS -> Run Graph
 
     # Prepare context for supervisor
-    conversation_context = ""
-    if conversation_history:
-        recent = conversation_history[-10:]
-        lines = [f"{m.role.title()}: {m.content}" for m in recent]
-        conversation_context = "\n".join(lines)
+    conversation_context = memory.as_text()
 
     initial_state = {
         "ticker": ticker.upper(),
@@ -132,6 +183,8 @@ async def run_analysis(
         "portfolio_context": portfolio_context,
         "trace_id": trace_id,
         "intent": intent,
+        "mode": mode,
+        "skip_technical_llm": skip_technical_llm,
         "entity_resolution": resolution,
         "price_data": {},
         "fundamentals": {},
@@ -155,7 +208,7 @@ async def run_analysis(
     }
 
     # Execute graph
-    result = await analysis_graph.ainvoke(initial_state)
+    result = await _graph_for(mode).ainvoke(initial_state)
 
     return {
         "ticker": result["ticker"],
@@ -178,7 +231,25 @@ async def run_analysis(
 
 # --- Helpers ---
 
-# --- Helpers ---
+async def _validate_ticker(ticker: str) -> tuple[str | None, dict | None]:
+    """
+    (canonical symbol, None) for a listed security, so aliases like FB or BRK-B
+    reach the providers as META / BRK.B; else (None, a chat-style reply with
+    "did you mean" suggestions).
+    """
+    validation = await symbol_master.validate(ticker)
+    if validation.valid:
+        return validation.symbol, None
+    message = validation.message()
+    return None, {
+        "ticker": None,
+        "synthesis": message,
+        "risks": [],
+        "catalysts": [],
+        "errors": [message],
+        "decision": None,
+    }
+
 
 # helper functions removed as they are now in separate agents
 
@@ -187,7 +258,10 @@ async def run_analysis_stream(
     ticker: str | None,
     portfolio_context: list,
     trace_id: str,
-    conversation_history: list
+    conversation_history: list,
+    mode: str = "full",
+    skip_technical_llm: bool = False,
+    session_id: str | None = None,
 ):
     """
     Generator for SSE events.
@@ -195,6 +269,8 @@ async def run_analysis_stream(
     """
     import json
     
+    memory = conversation_memory.context(session_id, conversation_history)
+
     # 1. Resolve Intent/Ticker (reusing logic from run_analysis would be ideal, but for stream we want early events)
     yield {"event": "status", "data": json.dumps({"status": "resolving_intent"})}
     
@@ -217,30 +293,35 @@ async def run_analysis_stream(
     
     # Handle non-analysis intents
     if intent in ["PORTFOLIO_QA", "HOLDINGS_LOOKUP"]:
-        result = await run_portfolio_qa(query, portfolio_context, conversation_history)
+        result = await run_portfolio_qa(query, portfolio_context, memory.messages())
+        conversation_memory.record(session_id, query, result.get("synthesis") or "")
         yield {"event": "result", "data": json.dumps(result)}
         yield {"event": "done", "data": "[DONE]"}
         return
         
     if intent == "GENERIC_CHAT" or not ticker:
-        result = await run_general_chat(query, portfolio_context, conversation_history)
+        result = await run_general_chat(query, portfolio_context, memory.messages())
+        conversation_memory.record(session_id, query, result.get("synthesis") or "")
         yield {"event": "result", "data": json.dumps(result)}
         yield {"event": "done", "data": "[DONE]"}
         return
 
+    requested_ticker = ticker
+    ticker, rejection = await _validate_ticker(ticker)
+    if rejection:
+        yield {"event": "result", "data": json.dumps(rejection)}
+        yield {"event": "done", "data": "[DONE]"}
+        return
+
     # Prepare detailed context
-    conversation_context = ""
-    if conversation_history:
-        recent = conversation_history[-10:]
-        lines = [f"{m.role.title()}: {m.content}" for m in recent]
-        conversation_context = "\n".join(lines)
+    conversation_context = memory.as_text()
 
     # D3: Extract specific Position Context for this ticker
     position_context = {}
     if ticker and portfolio_context:
         # Find exact match
         for holding in portfolio_context:
-            if holding.get("symbol") == ticker:
+            if holding.get("symbol") in (ticker, requested_ticker):
                 position_context = holding
                 break
 
@@ -251,6 +332,8 @@ async def run_analysis_stream(
         "position_context": position_context,   # specific holding info (V3)
         "trace_id": trace_id,
         "intent": intent,
+        "mode": mode,
+        "skip_technical_llm": skip_technical_llm,
         "entity_resolution": resolution,
         # Initialize other fields
         "price_data": {}, "fundamentals": {}, "news_articles": [], "sentiment_scores": {}, "stock_info": {},
@@ -261,9 +344,17 @@ async def run_analysis_stream(
     }
 
     # Stream graph updates
-    # We use .astream to get updates from each node
-    async for output in analysis_graph.astream(initial_state):
-        for node_name, node_state in output.items():
+    # We use .astream to get updates from each node; an update only carries what
+    # that node returned, so fold it into the running state
+    node_state = dict(initial_state)
+    async for output in _graph_for(mode).astream(initial_state):
+        for node_name, update in output.items():
+            for key, value in (update or {}).items():
+                if key in ("errors", "messages"):  # reducer (append) channels
+                    node_state[key] = list(node_state.get(key) or []) + list(value or [])
+                else:
+                    node_state[key] = value
+
             # Gather Data
             if node_name == "gather_data":
                 yield {"event": "status", "data": json.dumps({"status": "data_gathered"})}
@@ -276,8 +367,8 @@ async def run_analysis_stream(
             elif node_name == "sentiment_analysis":
                 yield {"event": "partial", "data": json.dumps({"type": "sentiment", "content": node_state.get("sentiment_report", "")[:100] + "..."})}
             
-            # Supervisor (Final)
-            elif node_name == "supervisor":
+            # Supervisor, or the single express call (Final)
+            elif node_name in ("supervisor", "express"):
                 final_result = {
                     "ticker": node_state["ticker"],
                     "recommendation": node_state["recommendation"],
@@ -295,6 +386,7 @@ async def run_analysis_stream(
                     "trace_id": node_state.get("trace_id"),
                     "timings": node_state.get("timings"),
                 }
-                yield {"event": "result", "data": json.dumps(final_result)}
+                conversation_memory.record(session_id, query, final_result["synthesis"] or "")
+                yield {"event": "result", "data": json.dumps(final_result, default=str)}
 
     yield {"event": "done", "data": "[DONE]"}
@@ -1,11 +1,15 @@
 from config import settings
+from services.llm_cache import llm_cache
+from services.llm_governor import llm_clients
+from services.model_router import model_router
 from langchain_openai import ChatOpenAI
 
 async def run_portfolio_qa(query: str, portfolio_context: list, conversation_history: list) -> dict:
     """
     Handle questions specifically about the user's portfolio.
     """
-    llm = ChatOpenAI(model=settings.openai_model, temperature=0.2, api_key=settings.openai_api_key)
+    llm = ChatOpenAI(model=model_router.model_for("portfolio"), temperature=0.2, api_key=settings.openai_api_key, base_url=settings.openai_base_url,
+                     cache=llm_cache.for_agent("portfolio"), **llm_clients.for_agent("portfolio"))
     
     # Build a rich portfolio summary
     portfolio_summary = "The user has no portfolio data."
@@ -36,8 +40,8 @@ If they ask about performance, diversity, or specific positions, use the numbers
 Be concise and data-driven."""
 
     messages = [("system", system_prompt)]
-    # Add conversation history
-    for m in conversation_history[-4:]:
+    # Add conversation history (already compacted by conversation memory)
+    for m in conversation_history:
         role = m.get('role', 'user') if isinstance(m, dict) else m.role
         content = m.get('content', '') if isinstance(m, dict) else m.content
         messages.append((role, content))
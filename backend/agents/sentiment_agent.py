@@ -3,6 +3,12 @@ from langchain_core.prompts import ChatPromptTemplate
 from agents.state import AnalysisState
 from prompts.sentiment import SENTIMENT_SYSTEM_PROMPT, SENTIMENT_USER_TEMPLATE
 from config import settings
+from services.llm_cache import llm_cache
+from services.llm_governor import llm_clients
+from services.model_router import model_router
+from services.lexicon_sentiment import lexicon_sentiment
+from services.prompt_budget import compact_number, prompt_budget, rank_headlines
+from services.tokens import fit_lines
 
 def sentiment_analysis_node(state: AnalysisState) -> dict:
     """LangGraph node: Market Sentiment Agent."""
@@ -17,40 +23,54 @@ def sentiment_analysis_node(state: AnalysisState) -> dict:
             "messages": [f"Sentiment analysis skipped for {ticker} — no data"],
         }
 
+    # Fast mode: score headlines locally instead of an LLM pass
+    if state.get("mode") == "fast":
+        return {
+            "sentiment_report": lexicon_sentiment.build_report(
+                ticker, articles, sentiment, stock_info.get("avg_analyst_rating")
+            ),
+            "messages": [f"Sentiment analysis (lexicon) completed for {ticker}"],
+        }
+
     llm = ChatOpenAI(
-        model=settings.openai_model,
+        model=model_router.model_for("sentiment"),
         temperature=0.2,
         api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        cache=llm_cache.for_agent("sentiment"),
+        **llm_clients.for_agent("sentiment"),
     )
 
-    # Format headlines
+    # Most useful headlines first (with cached digests when available), within the news token budget
     headlines_text = "No recent headlines available."
     if articles:
         headline_lines = []
-        for i, article in enumerate(articles[:15], 1):
+        ranked = rank_headlines(articles, ticker, stock_info.get("name"))
+        for i, article in enumerate(ranked[:15], 1):
             source = article.get("source", "Unknown")
             headline = article.get("headline", "")
-            headline_lines.append(f"{i}. [{source}] {headline}")
-        headlines_text = "\n".join(headline_lines)
+            digest = article.get("digest")
+            headline_lines.append(f"{i}. [{source}] {headline}" + (f" — {digest}" if digest else ""))
+        headlines_text = "\n".join(fit_lines(headline_lines, settings.news_prompt_token_budget))
 
     prompt = ChatPromptTemplate.from_messages([
         ("system", SENTIMENT_SYSTEM_PROMPT),
         ("human", SENTIMENT_USER_TEMPLATE),
     ])
 
-    chain = prompt | llm
-    response = chain.invoke({
+    messages = prompt_budget.render("sentiment", prompt, {
         "ticker": ticker,
-        "bullish_percent": sentiment.get("bullish_percent", "N/A"),
-        "bearish_percent": sentiment.get("bearish_percent", "N/A"),
-        "company_news_score": sentiment.get("company_news_score", "N/A"),
-        "sector_avg_bullish": sentiment.get("sector_average_bullish", "N/A"),
-        "sector_avg_news_score": sentiment.get("sector_average_news_score", "N/A"),
-        "articles_last_week": sentiment.get("articles_in_last_week", "N/A"),
-        "weekly_average": sentiment.get("weekly_average", "N/A"),
+        "bullish_percent": compact_number(sentiment.get("bullish_percent")),
+        "bearish_percent": compact_number(sentiment.get("bearish_percent")),
+        "company_news_score": compact_number(sentiment.get("company_news_score")),
+        "sector_avg_bullish": compact_number(sentiment.get("sector_average_bullish")),
+        "sector_avg_news_score": compact_number(sentiment.get("sector_average_news_score")),
+        "articles_last_week": compact_number(sentiment.get("articles_in_last_week")),
+        "weekly_average": compact_number(sentiment.get("weekly_average")),
         "analyst_rating": stock_info.get("avg_analyst_rating", "N/A"),
         "news_headlines": headlines_text,
-    })
+    }, shrink=("news_headlines",))
+    response = llm.invoke(messages)
 
     return {
         "sentiment_report": response.content,
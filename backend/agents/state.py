@@ -16,6 +16,8 @@ class AnalysisState(TypedDict, total=False):
     
     # V3 Core Fields
     intent: str  # "TICKER_ANALYSIS" | "PORTFOLIO_QA" | "GENERIC_CHAT"
+    mode: str  # "full" | "fast" | "express"
+    skip_technical_llm: bool  # rules-engine technical report instead of the technical LLM agent
     trace_id: str
     timings: Dict[str, float]
     
@@ -36,6 +38,7 @@ class AnalysisState(TypedDict, total=False):
 
     # Professional Grade Data Clusters (V4)
     technical_indicators: Dict[str, Any]  # ADX, Ichimoku, Pivots, etc.
+    technical_signals: Dict[str, Any]     # Rules-engine regime scores and composite rating
     financial_metrics: Dict[str, Any]     # ROIC, FCF Yield, Piotroski, etc.
     market_sentiment: Dict[str, Any]      # Put/Call Ratio, Max Pain, Shorts
 
@@ -1,5 +1,6 @@
 import re
 import json
+import time
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -8,6 +9,13 @@ from pydantic import ValidationError
 from agents.state import AnalysisState
 from prompts.supervisor import SUPERVISOR_SYSTEM_PROMPT, SUPERVISOR_USER_TEMPLATE, SUPERVISOR_OUTPUT_FORMAT
 from config import settings
+from services.json_repair import repair_json
+from services.llm_cache import llm_cache
+from services.llm_governor import llm_clients
+from services.model_router import model_router
+from services.metrics import metrics
+from services.prompt_budget import prompt_budget
+from services.technical_signals import TechnicalSignalEngine
 from models.schemas import SupervisorDecision
 
 # Add this to allow structured output parsing
@@ -23,17 +31,15 @@ def _supervisor_node_sync(state: AnalysisState) -> dict:
     ticker = state["ticker"]
     
     llm = ChatOpenAI(
-        model=settings.openai_model,
+        model=model_router.model_for("supervisor"),
         temperature=0.1,
         api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        cache=llm_cache.for_agent("supervisor"),
+        **llm_clients.for_agent("supervisor"),
     )
 
-    # Build portfolio summary string
-    portfolio_summary = "No portfolio context available."
-    portfolio = state.get("portfolio_context", [])
-    if portfolio:
-        holdings = [f"{h.get('symbol', '?')}: {h.get('quantity', 0)} shares @ ${h.get('price', 0):.2f}" for h in portfolio[:10]]
-        portfolio_summary = "\n".join(holdings)
+    portfolio_summary = _portfolio_summary(state)
 
     # If V3 structured outputs are enabled, append the format instructions
     system_prompt = SUPERVISOR_SYSTEM_PROMPT
@@ -45,14 +51,16 @@ def _supervisor_node_sync(state: AnalysisState) -> dict:
         ("human", SUPERVISOR_USER_TEMPLATE),
     ])
 
-    messages = prompt.format_messages(
-        ticker=ticker,
-        technical_report=state.get("technical_report", "Technical analysis unavailable."),
-        fundamental_report=state.get("fundamental_report", "Fundamental analysis unavailable."),
-        sentiment_report=state.get("sentiment_report", "Sentiment analysis unavailable."),
-        query=state.get("query", ""),
-        portfolio_summary=portfolio_summary,
-    )
+    # Over the ceiling, the upstream reports are trimmed rather than the instructions
+    messages = prompt_budget.render("supervisor", prompt, {
+        "ticker": ticker,
+        "technical_report": state.get("technical_report", "Technical analysis unavailable."),
+        "fundamental_report": state.get("fundamental_report", "Fundamental analysis unavailable."),
+        "sentiment_report": state.get("sentiment_report", "Sentiment analysis unavailable."),
+        "quant_signals": TechnicalSignalEngine.summary_block(state.get("technical_signals") or {}),
+        "query": state.get("query", ""),
+        "portfolio_summary": portfolio_summary,
+    }, shrink=("technical_report", "fundamental_report", "sentiment_report"))
 
     # --- V3 logic vs Legacy logic ---
     if settings.ENABLE_STRUCTURED_OUTPUTS:
@@ -61,31 +69,105 @@ def _supervisor_node_sync(state: AnalysisState) -> dict:
         return _legacy_parse(llm, messages, state)
 
 
+def _portfolio_summary(state: AnalysisState) -> str:
+    """Up to ten holdings as "SYM: qty shares @ $price" lines."""
+    portfolio = state.get("portfolio_context", [])
+    if not portfolio:
+        return "No portfolio context available."
+    holdings = [f"{h.get('symbol', '?')}: {h.get('quantity', 0)} shares @ ${h.get('price', 0):.2f}" for h in portfolio[:10]]
+    return "\n".join(holdings)
+
+
+# Keywords OpenAI's strict structured outputs reject; pydantic still enforces them on parse
+_UNSUPPORTED_SCHEMA_KEYWORDS = {"default", "minItems", "maxItems", "minLength", "maxLength"}
+
+
+def _strict_schema(node):
+    """
+    Make a pydantic JSON schema strict-mode compatible: every object closed and
+    every property required (Optional fields are already nullable via anyOf).
+    """
+    if isinstance(node, list):
+        return [_strict_schema(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    out = {k: _strict_schema(v) for k, v in node.items() if k not in _UNSUPPORTED_SCHEMA_KEYWORDS}
+    if out.get("type") == "object" and "properties" in out:
+        out["required"] = list(out["properties"])
+        out["additionalProperties"] = False
+    return out
+
+
+# Schema-constrained output generated from the decision model (sent as `response_format`)
+_DECISION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "supervisor_decision",
+        "strict": True,
+        "schema": _strict_schema(SupervisorDecision.model_json_schema()),
+    },
+}
+
+
 def _get_structured_decision(llm: ChatOpenAI, messages: list, state: AnalysisState) -> dict:
     """
-    V3 Logic: Use structured output or JSON parsing + retry.
+    V3 Logic: schema-constrained generation, then a local JSON repair pass,
+    and only then one LLM repair retry.
     """
-    # Attempt 1: Direct JSON parsing from standard generation
-    # (We are not using .with_structured_output() yet to keep dependencies simple and robust)
-    
+    invoke_kwargs = {"response_format": _DECISION_RESPONSE_FORMAT} if settings.SUPERVISOR_JSON_SCHEMA else {}
+
+    content = None
     try:
-        response = llm.invoke(messages)
-        content = response.content
-        return _parse_json_result(content, state)
+        content = llm.invoke(messages, **invoke_kwargs).content
+        result = _parse_json_result(content, state)
+        metrics.increment("supervisor_output", outcome="valid")
+        return result
     except Exception as e:
-        # Retry with a repair prompt
-        repair_messages = messages + [
-             SystemMessage(content=f"The previous output was invalid. Error: {str(e)}. "
-                                   "Return ONLY the corrected JSON object matching the schema.")
-        ]
-        try:
-            retry_response = llm.invoke(repair_messages)
-            return _parse_json_result(retry_response.content, state)
-        except Exception as e2:
-             # Fallback
-             print(f"Supervisor JSON parse failed: {e2}")
-             state.setdefault("errors", []).append(f"supervisor_parse_failed: {str(e2)}")
-             return _fallback_decision(state)
+        error = e
+
+    # Local repair: truncation, trailing commas, fences, enum casing
+    if isinstance(content, str):
+        start = time.perf_counter()
+        repaired = _repair_decision(content, state)
+        metrics.observe("supervisor_repair_ms", (time.perf_counter() - start) * 1000, stage="local")
+        if repaired is not None:
+            metrics.increment("supervisor_output", outcome="repaired")
+            return repaired
+
+    # Don't keep serving an unparseable completion from the cache
+    llm_cache.forget_last()
+    # Retry with a repair prompt
+    repair_messages = messages + [
+         SystemMessage(content=f"The previous output was invalid. Error: {str(error)}. "
+                               "Return ONLY the corrected JSON object matching the schema.")
+    ]
+    start = time.perf_counter()
+    try:
+        retry_response = llm.invoke(repair_messages, **invoke_kwargs)
+        result = _parse_json_result(retry_response.content, state)
+        metrics.increment("supervisor_output", outcome="llm_retry")
+        return result
+    except Exception as e2:
+         llm_cache.forget_last()
+         metrics.increment("supervisor_output", outcome="failed")
+         # Fallback
+         print(f"Supervisor JSON parse failed: {e2}")
+         state.setdefault("errors", []).append(f"supervisor_parse_failed: {str(e2)}")
+         return _fallback_decision(state)
+    finally:
+        metrics.observe("supervisor_repair_ms", (time.perf_counter() - start) * 1000, stage="llm")
+
+def _repair_decision(raw_text: str, state: AnalysisState) -> dict | None:
+    data = repair_json(raw_text)
+    if not isinstance(data, dict):
+        return None
+    for field in ("action", "confidence"):
+        if isinstance(data.get(field), str):
+            data[field] = data[field].strip().upper()
+    try:
+        return _decision_update(SupervisorDecision(**data), state)
+    except ValidationError:
+        return None
 
 def _parse_json_result(raw_text: str, state: AnalysisState) -> dict:
     """Parse JSON from LLM output, validate against schema, and return state update dict."""
@@ -99,8 +181,9 @@ def _parse_json_result(raw_text: str, state: AnalysisState) -> dict:
     cleaned = cleaned.strip()
 
     data = json.loads(cleaned)
-    decision = SupervisorDecision(**data)
-    
+    return _decision_update(SupervisorDecision(**data), state)
+
+def _decision_update(decision: SupervisorDecision, state: AnalysisState) -> dict:
     return {
         "decision": decision.model_dump(),
         # Backward compatibility
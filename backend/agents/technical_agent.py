@@ -3,6 +3,11 @@ from langchain_core.prompts import ChatPromptTemplate
 from agents.state import AnalysisState
 from prompts.technical import TECHNICAL_SYSTEM_PROMPT, TECHNICAL_USER_TEMPLATE
 from config import settings
+from services.llm_cache import llm_cache
+from services.llm_governor import llm_clients
+from services.model_router import model_router
+from services.prompt_budget import compact_fields, prompt_budget
+from services.technical_signals import technical_signals
 
 def technical_analysis_node(state: AnalysisState) -> dict:
     """LangGraph node: Technical Analysis Agent."""
@@ -17,10 +22,20 @@ def technical_analysis_node(state: AnalysisState) -> dict:
             "messages": [f"Technical analysis skipped for {ticker} — no data"],
         }
 
+    # Only the rating was asked for: the rules engine stands in for the LLM pass
+    if state.get("skip_technical_llm"):
+        return {
+            "technical_report": technical_signals.build_report(ticker, indicators),
+            "messages": [f"Technical analysis (rules engine) completed for {ticker}"],
+        }
+
     llm = ChatOpenAI(
-        model=settings.openai_model,
+        model=model_router.model_for("technical"),
         temperature=0.1,  # Low temp for analytical precision
         api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        cache=llm_cache.for_agent("technical"),
+        **llm_clients.for_agent("technical"),
     )
 
     prompt = ChatPromptTemplate.from_messages([
@@ -28,11 +43,8 @@ def technical_analysis_node(state: AnalysisState) -> dict:
         ("human", TECHNICAL_USER_TEMPLATE),
     ])
 
-    chain = prompt | llm
-    
     # Safely get values with defaults (Updated keys to match MarketDataService V4)
-    response = chain.invoke({
-        "ticker": ticker,
+    values = compact_fields({
         "current_price": indicators.get("current_price", "N/A"),
         # Trend
         "adx": indicators.get("adx", "N/A"),
@@ -60,6 +72,9 @@ def technical_analysis_node(state: AnalysisState) -> dict:
         "s1": indicators.get("s1", "N/A"),
     })
 
+    messages = prompt_budget.render("technical", prompt, {"ticker": ticker, **values})
+    response = llm.invoke(messages)
+
     return {
         "technical_report": response.content,
         "messages": [f"Technical analysis completed for {ticker}"],
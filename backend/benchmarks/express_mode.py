@@ -0,0 +1,88 @@
+"""
+Benchmark `mode="express"` (one LLM call on the gathered data) against the full
+graph (three specialists + supervisor): end-to-end latency and whether the two
+reach the same decision.
+
+Each ticker runs through both graphs `--runs` times with the LLM cache bypassed,
+so every run pays for fresh completions. Data gathering is shared by both modes
+and warmed up first, so the comparison isolates the LLM stage. Needs providers +
+OpenAI, or the stand-in:
+
+    python -m tools.provider_standin --port 8765 &
+    USE_PROVIDER_STANDIN=true python -m benchmarks.express_mode --tickers AAPL,MSFT,NVDA
+
+Usage:
+    python -m benchmarks.express_mode [--tickers T1,T2,...] [--runs 3]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List
+
+from agents.orchestrator import analysis_graph, express_graph, gather_data_node
+from services.llm_cache import bypass_llm_cache
+
+
+def _initial_state(ticker: str, mode: str) -> Dict[str, Any]:
+    return {
+        "ticker": ticker, "query": f"Should I buy {ticker}?", "portfolio_context": [], "mode": mode,
+        "technical_report": "", "fundamental_report": "", "sentiment_report": "",
+        "messages": [], "errors": [], "decision": None, "timings": {},
+    }
+
+
+async def _run(graph, ticker: str, mode: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    with bypass_llm_cache():
+        result = await graph.ainvoke(_initial_state(ticker, mode))
+    return {
+        "ms": (time.perf_counter() - start) * 1000,
+        "action": result.get("recommendation") or "?",
+        "confidence": result.get("confidence") or "?",
+    }
+
+
+async def bench(tickers: List[str], runs: int):
+    rows = []
+    for ticker in tickers:
+        await gather_data_node(_initial_state(ticker, "full"))  # warm provider caches
+        full = [await _run(analysis_graph, ticker, "full") for _ in range(runs)]
+        express = [await _run(express_graph, ticker, "express") for _ in range(runs)]
+        rows.append((ticker, full, express))
+
+    print(f"\n{'ticker':<8}{'full ms':>9}{'express ms':>12}{'speedup':>9}  {'full':<13}{'express':<13}{'agree'}")
+    action_matches = exact_matches = total = 0
+    all_full, all_express = [], []
+    for ticker, full, express in rows:
+        full_ms = statistics.median(r["ms"] for r in full)
+        express_ms = statistics.median(r["ms"] for r in express)
+        all_full += [r["ms"] for r in full]
+        all_express += [r["ms"] for r in express]
+        # Decisions are compared run by run (run i of full vs run i of express)
+        pairs = list(zip(full, express))
+        action_matches += sum(f["action"] == e["action"] for f, e in pairs)
+        exact_matches += sum((f["action"], f["confidence"]) == (e["action"], e["confidence"]) for f, e in pairs)
+        total += len(pairs)
+        f, e = full[-1], express[-1]
+        print(f"{ticker:<8}{full_ms:>9.0f}{express_ms:>12.0f}{full_ms / express_ms:>8.1f}x  "
+              f"{f['action'] + '/' + f['confidence']:<13}{e['action'] + '/' + e['confidence']:<13}"
+              f"{sum(f['action'] == e['action'] for f, e in pairs)}/{len(pairs)}")
+
+    print(f"\nMedian latency: full {statistics.median(all_full):.0f} ms, express {statistics.median(all_express):.0f} ms")
+    print(f"Action agreement: {action_matches}/{total} ({action_matches / total:.0%}); "
+          f"action + confidence: {exact_matches}/{total} ({exact_matches / total:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=str, default="AAPL,MSFT,NVDA,TSLA,AMZN")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    asyncio.run(bench(tickers, args.runs))
+
+
+if __name__ == "__main__":
+    main()
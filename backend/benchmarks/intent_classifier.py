@@ -0,0 +1,90 @@
+"""
+Benchmark the local intent classifier used ahead of the LLM in entity resolution.
+
+1. Accuracy: k-fold holdout over the labeled query file, overall and for the
+   queries above the escalation threshold (always runs, no network).
+2. Latency: per-query prediction time.
+3. LLM comparison: agreement with `_resolve_with_llm` on the labeled queries and
+   the round-trip time the local answer saves. Needs OpenAI, or the stand-in:
+
+    python -m tools.provider_standin --port 8765 &
+    USE_PROVIDER_STANDIN=true python -m benchmarks.intent_classifier --llm 40
+
+Usage:
+    python -m benchmarks.intent_classifier [--folds 5] [--llm N]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from config import settings
+from services.intent_classifier import IntentClassifier, intent_classifier, load_labeled_queries
+
+
+def bench_accuracy(folds: int, seed: int = 7):
+    rows = load_labeled_queries()
+    random.Random(seed).shuffle(rows)
+    threshold = settings.intent_classifier_threshold
+
+    correct = confident = confident_correct = 0
+    for fold in range(folds):
+        test = rows[fold::folds]
+        train = [r for i, r in enumerate(rows) if i % folds != fold]
+        model = IntentClassifier().fit([r["query"] for r in train], [r["intent"] for r in train])
+        for r in test:
+            intent, confidence = model.predict(r["query"])
+            correct += intent == r["intent"]
+            if confidence >= threshold:
+                confident += 1
+                confident_correct += intent == r["intent"]
+
+    print(f"Holdout accuracy ({folds}-fold, {len(rows)} queries): {correct / len(rows):.1%}")
+    print(f"Answered locally at threshold {threshold}: {confident / len(rows):.1%} of queries, "
+          f"{confident_correct / max(confident, 1):.1%} accurate")
+
+
+def bench_latency(repeats: int = 20):
+    queries = [r["query"] for r in load_labeled_queries()]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for q in queries:
+            intent_classifier.predict(q)
+    per_query = (time.perf_counter() - start) / (repeats * len(queries))
+    print(f"Local prediction: {per_query * 1e6:.0f} us/query")
+    return per_query
+
+
+async def bench_llm(n: int, local_s: float):
+    from services.entity_resolution_service import EntityResolutionService
+
+    rows = random.Random(11).sample(load_labeled_queries(), n)
+    agree = labeled = 0
+    llm_times = []
+    for r in rows:
+        start = time.perf_counter()
+        llm = await EntityResolutionService._resolve_with_llm(r["query"], [])
+        llm_times.append(time.perf_counter() - start)
+        agree += llm.get("intent") == intent_classifier.predict(r["query"])[0]
+        labeled += llm.get("intent") == r["intent"]
+
+    median = statistics.median(llm_times)
+    print(f"\nLLM accuracy on labels: {labeled / n:.1%}; local/LLM agreement: {agree / n:.1%} ({n} queries)")
+    print(f"LLM round-trip: median {median * 1000:.0f} ms -> ~{(median - local_s) * 1000:.0f} ms saved per locally answered query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--llm", type=int, default=0, help="Number of labeled queries to send to the LLM for comparison")
+    args = parser.parse_args()
+
+    bench_accuracy(args.folds)
+    local_s = bench_latency()
+    if args.llm:
+        asyncio.run(bench_llm(args.llm, local_s))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark the local lexicon sentiment scorer used by `mode="fast"`.
+
+1. Throughput: articles/sec over a synthetic corpus built from the stand-in news
+   fixtures (always runs, no network).
+2. Agreement: for each ticker, the lexicon rating vs the LLM sentiment agent's
+   "Rating:" line on the same articles. Needs providers + OpenAI, or the stand-in:
+
+    python -m tools.provider_standin --port 8765 &
+    USE_PROVIDER_STANDIN=true python -m benchmarks.lexicon_sentiment --agreement AAPL,MSFT,TSLA
+
+Usage:
+    python -m benchmarks.lexicon_sentiment [--articles 20000] [--agreement T1,T2,...]
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+from typing import Any, Dict, List
+
+from services.lexicon_sentiment import lexicon_sentiment
+from tools.provider_standin import load_fixture
+
+
+def synthetic_corpus(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Fixture headlines/summaries across tickers, lightly shuffled so texts differ."""
+    base = []
+    for ticker in ("AAPL", "MSFT", "NVDA", "TSLA", "AMZN"):
+        for a in load_fixture("finnhub", "company-news", ticker):
+            base.append((a["headline"], a.get("summary", "")))
+        for a in load_fixture("newsapi", "everything", ticker)["articles"]:
+            base.append((a["title"], a.get("description") or ""))
+
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n):
+        headline, summary = base[i % len(base)]
+        words = summary.split()
+        rng.shuffle(words)
+        corpus.append({"headline": headline, "summary": " ".join(words)})
+    return corpus
+
+
+def bench_throughput(n: int, repeats: int = 3):
+    corpus = synthetic_corpus(n)
+    texts = [f"{a['headline']}. {a['summary']}" for a in corpus]
+    lexicon_sentiment.score_texts(texts[:100])  # warm up
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        lexicon_sentiment.score_texts(texts)
+        best = min(best, time.perf_counter() - start)
+    print(f"Throughput: {n} articles in {best * 1000:.1f} ms -> {n / best:,.0f} articles/sec (best of {repeats})")
+
+
+_RATING = re.compile(r"Rating:\s*\**\s*(POSITIVE|NEUTRAL|NEGATIVE)", re.IGNORECASE)
+
+
+async def bench_agreement(tickers: List[str]):
+    from agents.orchestrator import gather_data_node
+    from agents.sentiment_agent import sentiment_analysis_node
+
+    matches = 0
+    rows = []
+    for ticker in tickers:
+        state = {"ticker": ticker, "mode": "full"}
+        state.update(await gather_data_node(state))
+
+        start = time.perf_counter()
+        llm_report = (await asyncio.to_thread(sentiment_analysis_node, state))["sentiment_report"]
+        llm_ms = (time.perf_counter() - start) * 1000
+        llm_rating = (_RATING.search(llm_report) or [None, "UNPARSED"])[1].upper()
+
+        start = time.perf_counter()
+        lexicon = lexicon_sentiment.score_articles(state["news_articles"][:15])
+        lex_ms = (time.perf_counter() - start) * 1000
+
+        matches += llm_rating == lexicon["rating"]
+        rows.append((ticker, len(state["news_articles"]), llm_rating, lexicon["rating"], lexicon["aggregate"], llm_ms, lex_ms))
+
+    print(f"\n{'ticker':<8}{'articles':>9}  {'LLM':<10}{'lexicon':<10}{'score':>7}{'LLM ms':>9}{'lex ms':>8}")
+    for t, n, llm, lex, score, llm_ms, lex_ms in rows:
+        print(f"{t:<8}{n:>9}  {llm:<10}{lex:<10}{score:>+7.2f}{llm_ms:>9.0f}{lex_ms:>8.2f}")
+    print(f"\nAgreement with LLM rating: {matches}/{len(rows)} ({matches / len(rows):.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--agreement", type=str, default="", help="Comma-separated tickers to compare against the LLM")
+    args = parser.parse_args()
+
+    bench_throughput(args.articles)
+    if args.agreement:
+        asyncio.run(bench_agreement([t.strip().upper() for t in args.agreement.split(",") if t.strip()]))
+
+
+if __name__ == "__main__":
+    main()
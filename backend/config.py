@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     # LLM
@@ -12,6 +12,84 @@ class Settings(BaseSettings):
     newsapi_api_key: str = ""
     massive_api_key: str = ""
 
+    # Offline provider stand-in (tools/provider_standin.py) for load and latency testing.
+    # When enabled, every provider client is pointed at the stand-in instead of the real API.
+    USE_PROVIDER_STANDIN: bool = False
+    provider_standin_url: str = "http://127.0.0.1:8765"
+
+    # Shared HTTP transport (services/http_transport.py)
+    http_max_connections: int = 50
+    http_per_host_limit: int = 8
+    http_retries: int = 2
+    http_timeout_budget_s: float = 15.0
+
+    # Provider rate limits
+    rate_limit_backend: str = "local"  # "local" (per process) or "mmap" (shared by all workers on the node)
+    rate_limit_wait_s: float = 5.0  # how long a caller waits for provider capacity before giving up
+    quota_interactive_reserve: float = 0.3  # share of daily quotas (FMP, NewsAPI) held back for /api/analyze
+    quota_batch_reserve: float = 0.5  # batch jobs leave at least this share untouched
+    quota_pace_burst: int = 5  # calls background work may run ahead of the trading-day pace
+
+    # News providers are queried concurrently; each gets its own deadline
+    news_finnhub_deadline_s: float = 6.0
+    news_newsapi_deadline_s: float = 6.0
+
+    # News digests (ENABLE_NEWS_LLM_SUMMARY) and the sentiment prompt's news budget
+    news_summary_model: str = "gpt-4o-mini"
+    news_prompt_token_budget: int = 700
+
+    # Entity resolution: below this confidence the local intent classifier defers to the LLM
+    intent_classifier_threshold: float = 0.7
+
+    # Ticker validation: symbols outside the bundled master get one lookup unless strict
+    symbol_master_strict: bool = False
+    symbol_negative_ttl_seconds: int = 86400
+
+    # Agent LLM response cache (content-addressed by model settings + rendered messages)
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 21600
+    llm_cache_max_mb: int = 64
+
+    # Process-wide OpenAI governor (adaptive concurrency, tokens-per-minute budget, retries of
+    # 429s, 408/409, 5xx and connection errors)
+    llm_max_concurrency: int = 16
+    llm_tokens_per_minute: int = 200000
+    llm_latency_target_s: float = 30.0  # calls slower than this shrink the concurrency limit
+    llm_queue_timeout_s: float = 120.0
+    llm_max_retries: int = 3
+
+    # Per-node model routing: primary model per node (others use openai_model), and the
+    # model a node downgrades to while its primary's recent p95 latency is over budget
+    node_models: Dict[str, str] = {"technical": "gpt-4o-mini", "fundamental": "gpt-4o-mini", "sentiment": "gpt-4o-mini"}
+    llm_fallback_model: str = "gpt-4o-mini"
+    node_latency_budgets_s: Dict[str, float] = {"supervisor": 20.0, "express": 15.0, "portfolio": 15.0, "chat": 10.0}
+
+    # Rolling conversation memory per session (summary + last few turns)
+    memory_recent_messages: int = 4
+    memory_turn_tokens: int = 250  # each recent turn is clipped to this
+    memory_summary_tokens: int = 400
+    memory_llm_summary: bool = True  # fold old turns with an LLM call (else extractive)
+    memory_summary_model: str = "gpt-4o-mini"
+    memory_max_sessions: int = 2000
+    memory_ttl_hours: float = 24
+
+    # SSE /api/analyze/stream: keep-alive comments, buffered events per stream, and how long a
+    # client may stall reading before it's treated as gone (the analysis is then cancelled)
+    stream_heartbeat_s: float = 15.0
+    stream_queue_size: int = 16
+    stream_send_timeout_s: float = 30.0
+
+    # Per-agent prompt token ceilings, measured locally before each request
+    prompt_token_ceilings: Dict[str, int] = {"technical": 1200, "fundamental": 1200, "sentiment": 1500, "supervisor": 4000, "express": 2500}
+
+    # Local state (quota counters, stores); relative to the working directory
+    state_dir: str = ".state"
+    fundamentals_refresh_hours: float = 24  # provider refresh for the on-disk fundamentals store
+    fundamentals_earnings_refresh_hours: float = 6  # ...tightened within two days of an earnings date
+
+    # Caching
+    reference_data_ttl_seconds: int = 21600  # yfinance .info reference records (6 hours)
+    quote_cache_ttl_seconds: float = 0.5  # live last-trade micro-cache
 
     # App
     cors_origins: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -19,6 +97,7 @@ class Settings(BaseSettings):
     # V3 Feature Flags (Migration)
     # V3 Feature Flags (Migration)
     ENABLE_STRUCTURED_OUTPUTS: bool = True
+    SUPERVISOR_JSON_SCHEMA: bool = True  # send the decision schema as response_format (json_schema)
     ENABLE_ENTITY_RESOLUTION: bool = True
     ENABLE_STREAMING: bool = True
     DEBUG_TIMINGS: bool = True
@@ -27,6 +106,44 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
+    def model_post_init(self, __context):
+        # The stand-in ignores credentials, but services only call providers that have a key.
+        if self.USE_PROVIDER_STANDIN:
+            for key in ("openai_api_key", "finnhub_api_key", "fmp_api_key", "newsapi_api_key", "massive_api_key"):
+                if not getattr(self, key):
+                    setattr(self, key, "standin")
+
+    def _provider_url(self, provider: str, default: str | None) -> str | None:
+        if self.USE_PROVIDER_STANDIN:
+            return f"{self.provider_standin_url.rstrip('/')}/{provider}"
+        return default
+
+    @property
+    def openai_base_url(self) -> str | None:
+        # None lets the OpenAI client use its default endpoint
+        return self._provider_url("openai", None)
+
+    @property
+    def finnhub_base_url(self) -> str:
+        return self._provider_url("finnhub", "https://api.finnhub.io/api/v1")
+
+    @property
+    def fmp_base_url(self) -> str:
+        return self._provider_url("fmp", "https://financialmodelingprep.com")
+
+    @property
+    def newsapi_base_url(self) -> str:
+        return self._provider_url("newsapi", "https://newsapi.org")
+
+    @property
+    def massive_base_url(self) -> str:
+        return self._provider_url("massive", "https://api.massive.com")
+
+    @property
+    def yfinance_standin_url(self) -> str | None:
+        # yfinance has no configurable endpoint; ReferenceDataStore reads .info from here instead
+        return self._provider_url("yfinance", None)
+
     def validate_required(self):
         """Call on startup to warn about missing keys. Does not hard-fail for optional APIs."""
         import warnings
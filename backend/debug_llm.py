@@ -12,7 +12,7 @@ from services.entity_resolution_service import EntityResolutionService
 async def test_llm():
     print("Testing direct LLM connection...")
     try:
-        llm = ChatOpenAI(model=settings.openai_model, api_key=settings.openai_api_key)
+        llm = ChatOpenAI(model=settings.openai_model, api_key=settings.openai_api_key, base_url=settings.openai_base_url)
         resp = await llm.ainvoke("Hello")
         print(f"LLM Response: {resp.content}")
     except Exception as e:
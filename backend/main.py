@@ -1,9 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
-from routers import auth, portfolio, trade, analyze
+from routers import auth, portfolio, trade, analyze, quotes, metrics
+from services.http_transport import http_transport
 
-app = FastAPI(title="Robinhood AI Bridge", version="2.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled provider connections
+    await http_transport.aclose()
+
+app = FastAPI(title="Robinhood AI Bridge", version="2.0.0", lifespan=lifespan)
 
 # Validate config on startup
 settings.validate_required()
@@ -20,6 +28,8 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(portfolio.router, prefix="/api", tags=["Portfolio"])
 app.include_router(trade.router, prefix="/api", tags=["Trade"])
 app.include_router(analyze.router, prefix="/api", tags=["Analysis"])
+app.include_router(quotes.router, prefix="/api", tags=["Quotes"])
+app.include_router(metrics.router, prefix="/api", tags=["Metrics"])
 
 @app.get("/")
 def health_check():
@@ -21,6 +21,12 @@ class AnalyzeRequest(BaseModel):
     ticker: Optional[str] = None
     portfolio_context: Optional[list] = None
     conversation_history: Optional[List[ConversationMessage]] = None
+    session_id: Optional[str] = None  # server-side rolling memory; takes over from conversation_history once seen
+    # "fast": local lexicon sentiment instead of the LLM sentiment agent
+    # "express": a single LLM call on the gathered data instead of specialists + supervisor
+    mode: Literal["full", "fast", "express"] = "full"
+    bypass_cache: bool = False  # force fresh agent completions instead of cached ones
+    skip_technical_llm: bool = False  # rules-engine technical rating only, no technical LLM agent
 
 class KeyMetric(BaseModel):
     name: str
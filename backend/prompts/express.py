@@ -0,0 +1,27 @@
+EXPRESS_SYSTEM_ADDENDUM = """
+
+In this mode there are no specialist reports: you receive the raw technical
+indicators, fundamentals, and sentiment data directly. Do the technical,
+fundamental, and sentiment reads yourself, briefly, before deciding.
+Quote the specific values that drive your decision in "key_metrics"."""
+
+EXPRESS_USER_TEMPLATE = """Decide on {ticker} ({company_name}, {sector}) from this data:
+
+--- TECHNICAL INDICATORS ---
+{technical_data}
+
+--- QUANT SIGNALS (rules engine over the indicators above) ---
+{quant_signals}
+
+--- FUNDAMENTALS (yfinance) ---
+{fundamental_data}
+
+--- SENTIMENT (Finnhub) ---
+{sentiment_data}
+Analyst consensus: {analyst_rating}
+
+--- TOP HEADLINES ---
+{news_headlines}
+
+User's specific question (if any): {query}
+User's current portfolio context: {portfolio_summary}"""
@@ -0,0 +1,14 @@
+MEMORY_SUMMARY_SYSTEM_PROMPT = """You maintain the running memory of a conversation between a user and
+a financial research assistant. Merge the new turns into the existing summary.
+
+Keep: tickers discussed, recommendations given (action, confidence, price targets),
+the user's stated goals, constraints, holdings and preferences, and open questions.
+Drop: pleasantries, restated analysis detail, disclaimers.
+Write terse bullet points, newest facts last, at most {max_words} words in total.
+Return only the updated summary."""
+
+MEMORY_SUMMARY_USER_TEMPLATE = """Existing summary:
+{summary}
+
+New turns:
+{turns}"""
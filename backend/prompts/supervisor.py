@@ -23,6 +23,9 @@ SUPERVISOR_USER_TEMPLATE = """Synthesize these three analyses for {ticker}:
 --- SENTIMENT ANALYSIS ---
 {sentiment_report}
 
+--- QUANT SIGNALS (rules engine over the technical indicators) ---
+{quant_signals}
+
 User's specific question (if any): {query}
 User's current portfolio context: {portfolio_summary}
 
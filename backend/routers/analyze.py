@@ -1,8 +1,14 @@
 from fastapi import APIRouter, HTTPException, Request
 from sse_starlette.sse import EventSourceResponse
+from config import settings
 from models.schemas import AnalyzeRequest, AnalyzeResponse, HoldingsResponse, SupervisorDecision
 from agents.orchestrator import run_analysis, run_analysis_stream, run_general_chat
+from services.cancellation import CancelToken, cancel_scope
 from services.entity_resolution_service import EntityResolutionService
+from services.llm_cache import bypass_llm_cache
+from services.metrics import metrics
+from services.quota_scheduler import INTERACTIVE, priority
+from typing import Literal, Optional
 import uuid
 import time
 import json
@@ -23,52 +29,59 @@ async def analyze_portfolio(request: AnalyzeRequest):
     try:
         portfolio_context = request.portfolio_context or []
         
-        # 1. Resolve Entity & Intent (Unified Service)
-        resolution = await EntityResolutionService.resolve(request.query, portfolio_context)
-        intent = resolution["intent"]
+        # A user is waiting: everything below, including the intent fallback, draws on
+        # the quota and LLM priority reserved for interactive traffic
+        with priority(INTERACTIVE):
+            # 1. Resolve Entity & Intent (Unified Service)
+            resolution = await EntityResolutionService.resolve(request.query, portfolio_context)
+            intent = resolution["intent"]
         
-        # 2. Fast Path: Holdings Lookup
-        if intent == "HOLDINGS_LOOKUP":
-            target_ticker = resolution["ticker"]
-            target_holding = next((h for h in portfolio_context if h.get("symbol") == target_ticker), None)
+            # 2. Fast Path: Holdings Lookup
+            if intent == "HOLDINGS_LOOKUP":
+                target_ticker = resolution["ticker"]
+                target_holding = next((h for h in portfolio_context if h.get("symbol") == target_ticker), None)
             
-            if target_holding:
-                qty = float(target_holding.get("quantity", 0))
-                price = float(target_holding.get("price", 0))
-                avg_cost = float(target_holding.get("average_buy_price", 0))
+                if target_holding:
+                    qty = float(target_holding.get("quantity", 0))
+                    price = float(target_holding.get("price", 0))
+                    avg_cost = float(target_holding.get("average_buy_price", 0))
                 
-                # Use pre-calculated fields if available, else calc on fly
-                equity = float(target_holding.get("equity", qty * price))
-                pnl = float(target_holding.get("unrealized_pnl", (price - avg_cost) * qty))
-                pnl_pct = float(target_holding.get("unrealized_pnl_pct", 0.0))
+                    # Use pre-calculated fields if available, else calc on fly
+                    equity = float(target_holding.get("equity", qty * price))
+                    pnl = float(target_holding.get("unrealized_pnl", (price - avg_cost) * qty))
+                    pnl_pct = float(target_holding.get("unrealized_pnl_pct", 0.0))
                 
-                # Recalculate pnl_pct if missing/zero but we have data
-                if pnl_pct == 0.0 and avg_cost > 0 and qty > 0:
-                     pnl_pct = (pnl / (avg_cost * qty)) * 100
-
-                return HoldingsResponse(
-                    ticker=target_ticker,
-                    company_name=target_holding.get("name", target_ticker),
-                    shares_held=qty,
-                    current_price=price,
-                    total_value=equity,
-                    average_cost=avg_cost,
-                    unrealized_pl_dollars=pnl,
-                    unrealized_pl_percent=pnl_pct,
-                    purchase_value=avg_cost * qty,
-                    timestamp=datetime.now().isoformat()
-                )
+                    # Recalculate pnl_pct if missing/zero but we have data
+                    if pnl_pct == 0.0 and avg_cost > 0 and qty > 0:
+                         pnl_pct = (pnl / (avg_cost * qty)) * 100
 
-        # 3. General/Analysis Path (Orchestrator)
-        # We pass the resolution result to avoid re-resolving inside orchestrator if we update it
-        # For now, orchestrator resolves again (see next refactor step), but that's fine.
-        result = await run_analysis(
-            query=request.query,
-            ticker=request.ticker, # User might explicitly override
-            portfolio_context=portfolio_context,
-            conversation_history=request.conversation_history or [],
-            trace_id=trace_id,
-        )
+                    return HoldingsResponse(
+                        ticker=target_ticker,
+                        company_name=target_holding.get("name", target_ticker),
+                        shares_held=qty,
+                        current_price=price,
+                        total_value=equity,
+                        average_cost=avg_cost,
+                        unrealized_pl_dollars=pnl,
+                        unrealized_pl_percent=pnl_pct,
+                        purchase_value=avg_cost * qty,
+                        timestamp=datetime.now().isoformat()
+                    )
+
+            # 3. General/Analysis Path (Orchestrator)
+            # We pass the resolution result to avoid re-resolving inside orchestrator if we update it
+            # For now, orchestrator resolves again (see next refactor step), but that's fine.
+            with bypass_llm_cache(request.bypass_cache):
+                result = await run_analysis(
+                    query=request.query,
+                    ticker=request.ticker, # User might explicitly override
+                    portfolio_context=portfolio_context,
+                    conversation_history=request.conversation_history or [],
+                    trace_id=trace_id,
+                    session_id=request.session_id,
+                    mode=request.mode,
+                    skip_technical_llm=request.skip_technical_llm,
+                )
         
         # Calculate total duration
         duration = time.time() - start_time
@@ -90,4 +103,96 @@ async def analyze_portfolio(request: AnalyzeRequest):
         )
 
 
+async def _analysis_events(request: AnalyzeRequest, token: CancelToken, trace_id: str):
+    """
+    Runs the streamed analysis in its own task and relays its events.
+
+    The task feeds a bounded queue, so a client that reads slowly pauses the
+    graph between nodes instead of events piling up. When the client goes away
+    the task is cancelled and `token` is set: pending provider waits and queued
+    LLM calls abort, and agents already running in threads make no new calls.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.stream_queue_size)
+    outcome = "disconnected"
+
+    async def produce():
+        nonlocal outcome
+        try:
+            with cancel_scope(token), priority(INTERACTIVE), bypass_llm_cache(request.bypass_cache):
+                async for event in run_analysis_stream(
+                    query=request.query,
+                    ticker=request.ticker,
+                    portfolio_context=request.portfolio_context or [],
+                    trace_id=trace_id,
+                    conversation_history=request.conversation_history or [],
+                    mode=request.mode,
+                    skip_technical_llm=request.skip_technical_llm,
+                    session_id=request.session_id,
+                ):
+                    await queue.put(event)
+        except Exception as e:
+            print(f"Analysis stream error: {e}")
+            outcome = "error"
+            # Same shape /analyze returns on failure, so clients handle one kind of result
+            error = AnalyzeResponse(
+                synthesis="I encountered an internal error while processing your analysis request.",
+                errors=[str(e)],
+                trace_id=trace_id,
+            )
+            await queue.put({"event": "result", "data": error.model_dump_json()})
+            await queue.put({"event": "done", "data": "[DONE]"})
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    token.add_callback(producer.cancel)
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        if outcome != "error":
+            outcome = "completed"
+    finally:
+        if not producer.done():
+            print(f"[Stream {trace_id[:8]}] Client gone mid-analysis, cancelling")
+            token.cancel("client disconnected")
+        metrics.increment("analysis_streams", outcome=outcome)
+
+
+def _stream_response(request: AnalyzeRequest) -> EventSourceResponse:
+    trace_id = str(uuid.uuid4())
+    token = CancelToken()
+
+    async def on_disconnect(message):
+        token.cancel("client disconnected")
+
+    return EventSourceResponse(
+        _analysis_events(request, token, trace_id),
+        ping=settings.stream_heartbeat_s,
+        send_timeout=settings.stream_send_timeout_s,
+        client_close_handler_callable=on_disconnect,
+        headers={"X-Trace-Id": trace_id},
+    )
+
+
+@router.get("/analyze/stream")
+async def analyze_stream(
+    query: str,
+    ticker: Optional[str] = None,
+    session_id: Optional[str] = None,
+    mode: Literal["full", "fast", "express"] = "full",
+    bypass_cache: bool = False,
+    skip_technical_llm: bool = False,
+):
+    """
+    Stream the analysis as server-sent events (status, partial, result, done).
+    GET is for EventSource clients; use POST to send portfolio context and history.
+    """
+    return _stream_response(AnalyzeRequest(
+        query=query, ticker=ticker, session_id=session_id, mode=mode,
+        bypass_cache=bypass_cache, skip_technical_llm=skip_technical_llm,
+    ))
+
 
+@router.post("/analyze/stream")
+async def analyze_stream_post(request: AnalyzeRequest):
+    """Stream the analysis as server-sent events, with the full request body."""
+    return _stream_response(request)
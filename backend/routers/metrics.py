@@ -0,0 +1,49 @@
+from fastapi import APIRouter
+from services.llm_cache import llm_cache
+from services.llm_governor import llm_governor
+from services.metrics import metrics
+from services.model_router import model_router
+from services.quota_scheduler import quota_scheduler
+
+router = APIRouter()
+
+@router.get("/metrics/quotas")
+async def get_quota_metrics():
+    """Daily provider quota usage by priority class, with projected exhaustion times."""
+    return {"status": "success", "data": quota_scheduler.report()}
+
+@router.get("/metrics/llm-cache")
+async def get_llm_cache_metrics():
+    """Agent LLM response cache hit rates and store size."""
+    return {"status": "success", "data": llm_cache.report()}
+
+@router.get("/metrics/llm-governor")
+async def get_llm_governor_metrics():
+    """OpenAI admission control: adaptive concurrency limit, token budget use and queue wait by priority."""
+    return {"status": "success", "data": llm_governor.report()}
+
+@router.get("/metrics/models")
+async def get_model_metrics():
+    """Per-node model routing (primary, fallback, p95 vs latency budget) and per-model latency and tokens."""
+    return {"status": "success", "data": model_router.report()}
+
+@router.get("/metrics")
+async def get_metrics():
+    """Every registered counter and latency summary."""
+    return {"status": "success", "data": metrics.snapshot()}
+
+@router.get("/metrics/supervisor")
+async def get_supervisor_metrics():
+    """How often the supervisor's structured output needed repair, and what repair cost."""
+    outcomes = {dict(labels)["outcome"]: int(value) for labels, value in metrics.counters("supervisor_output").items()}
+    total = sum(outcomes.values())
+    return {"status": "success", "data": {
+        "outcomes": outcomes,
+        "local_repair_rate": round(outcomes.get("repaired", 0) / total, 3) if total else None,
+        "llm_retry_rate": round((outcomes.get("llm_retry", 0) + outcomes.get("failed", 0)) / total, 3) if total else None,
+        "added_latency_ms": {
+            stage: {"p50": metrics.quantile("supervisor_repair_ms", 0.5, stage=stage),
+                    "p95": metrics.quantile("supervisor_repair_ms", 0.95, stage=stage)}
+            for stage in ("local", "llm")
+        },
+    }}
@@ -6,3 +6,8 @@ router = APIRouter()
 @router.get("/portfolio")
 def get_portfolio():
     return {"status": "success", "data": RobinhoodService.get_portfolio()}
+
+@router.get("/portfolio/valuation")
+async def get_portfolio_valuation():
+    """Re-price current holdings with one batched quote call instead of a full holdings rebuild."""
+    return {"status": "success", "data": await RobinhoodService.get_portfolio_valuation()}
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, Query
+from services.quote_service import quote_service
+
+router = APIRouter()
+
+MAX_SYMBOLS = 250
+
+@router.get("/quotes")
+async def get_quotes(symbols: str = Query(..., description="Comma-separated tickers, e.g. AAPL,MSFT")):
+    requested = [s for s in symbols.split(",") if s.strip()]
+    if not requested:
+        raise HTTPException(status_code=400, detail="At least one symbol is required.")
+    if len(requested) > MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SYMBOLS} symbols per request.")
+    return {"status": "success", "data": await quote_service.get_quotes(requested)}
@@ -0,0 +1,95 @@
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Words, keeping inner "." and "&" so "BRK.B" and "s&p" stay single tokens
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[.&][A-Za-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+
+class AliasMatcher:
+    """
+    Aho-Corasick automaton over normalized word tokens.
+
+    Aliases are token sequences ("bank of america" is three tokens), so matches
+    always fall on whole words and a query resolves in one pass over its tokens
+    regardless of how many aliases are loaded. Single-token aliases no longer than
+    `strict_case_len` only match when written in capitals in the query, so the
+    symbol "C" matches "buy C" but not "c'mon".
+    """
+
+    def __init__(self, aliases: Dict[str, str], strict_case_len: int = 0):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (alias length in tokens, value, case-strict) for every alias ending here
+        self._out: List[List[Tuple[int, str, bool]]] = [[]]
+        self._strict_case_len = strict_case_len
+
+        for alias, value in aliases.items():
+            tokens = [t.lower() for t in tokenize(alias)]
+            if tokens:
+                self._add(tokens, value, len(tokens) == 1 and len(tokens[0]) <= strict_case_len)
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def _add(self, tokens: List[str], value: str, strict: bool):
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(tokens), value, strict))
+
+    def _link(self):
+        """Breadth-first failure links; outputs are folded along them so matching never walks the chain."""
+        # Depth-1 states fail back to the root (their default)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """Every alias occurrence as (start token, end token exclusive, value)."""
+        raw = tokenize(text)
+        matches = []
+        state = 0
+        for i, word in enumerate(raw):
+            token = word.lower()
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, value, strict in self._out[state]:
+                if strict and not raw[i].isupper():
+                    continue
+                matches.append((i + 1 - length, i + 1, value))
+        return matches
+
+    def first(self, text: str) -> Optional[str]:
+        """The leftmost match, preferring the longest alias at that position."""
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: (m[0], m[0] - m[1]))[2]
+
+
+@lru_cache(maxsize=128)
+def symbol_matcher(symbols: FrozenSet[str]) -> AliasMatcher:
+    """Matcher for a set of ticker symbols (e.g. a portfolio), built once per distinct set."""
+    return AliasMatcher({s: s for s in symbols}, strict_case_len=2)
@@ -0,0 +1,66 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional
+
+import httpx
+
+
+class RequestCancelled(httpx.TransportError):
+    """Raised instead of sending an LLM request whose caller has gone away."""
+
+
+class CancelToken:
+    """Cancellation flag for one request, visible to every task and thread it spawns."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], Any]] = []
+        self.reason = ""
+
+    def add_callback(self, callback: Callable[[], Any]):
+        """Call `callback` on cancel (immediately if already cancelled)."""
+        if self.cancelled:
+            callback()
+        else:
+            self._callbacks.append(callback)
+
+    def cancel(self, reason: str = "cancelled"):
+        if self.cancelled:
+            return
+        self.reason = reason
+        self._event.set()
+        for callback in self._callbacks:
+            callback()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+_token: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+@contextmanager
+def cancel_scope(token: CancelToken) -> Iterator[CancelToken]:
+    """Run a block under `token`; asyncio tasks and LangGraph's executor threads inherit it."""
+    reset = _token.set(token)
+    try:
+        yield token
+    finally:
+        _token.reset(reset)
+
+
+def has_cancel_scope() -> bool:
+    return _token.get() is not None
+
+
+def is_cancelled() -> bool:
+    token = _token.get()
+    return token is not None and token.cancelled
+
+
+def raise_if_cancelled():
+    token = _token.get()
+    if token is not None and token.cancelled:
+        raise RequestCancelled(f"Request cancelled ({token.reason})")
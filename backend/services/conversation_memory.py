@@ -0,0 +1,239 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage, SystemMessage
+from config import settings
+from prompts.memory import MEMORY_SUMMARY_SYSTEM_PROMPT, MEMORY_SUMMARY_USER_TEMPLATE
+from services.llm_governor import llm_clients
+from services.metrics import metrics
+from services.quota_scheduler import BACKGROUND, priority
+from services.tokens import count_tokens, fit_lines
+from services.prompt_budget import truncate_tokens
+from typing import Any, Dict, List, Optional, Tuple
+
+Turn = Tuple[str, str]  # (role, content)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def _turn(message: Any) -> Turn:
+    role = message.get("role", "user") if isinstance(message, dict) else message.role
+    content = message.get("content", "") if isinstance(message, dict) else message.content
+    return role, content or ""
+
+
+def _gist(role: str, content: str, chars: int = 200) -> str:
+    """One bullet per turn: the first sentence, clipped (markdown headers and bullets flattened)."""
+    text = " ".join(line.strip("#*- ").strip() for line in content.splitlines() if line.strip())
+    first = _SENTENCE_END.split(text, 1)[0]
+    if len(first) > chars:
+        first = first[:chars].rsplit(" ", 1)[0] + " …"
+    return f"- {role.title()}: {first}"
+
+
+@dataclass
+class MemoryContext:
+    """What a prompt gets of the conversation: a compressed summary plus the last few turns."""
+    summary: str = ""
+    turns: List[Turn] = field(default_factory=list)
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Chat-message form, the summary first as a system message."""
+        out = [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}] if self.summary else []
+        return out + [{"role": role, "content": content} for role, content in self.turns]
+
+    def as_text(self) -> str:
+        lines = [f"Summary of earlier conversation:\n{self.summary}"] if self.summary else []
+        return "\n".join(lines + [f"{role.title()}: {content}" for role, content in self.turns])
+
+
+@dataclass
+class _Session:
+    summary: str = ""
+    turns: List[Turn] = field(default_factory=list)
+    pending: List[Turn] = field(default_factory=list)  # overflowed turns not yet folded into the summary
+    folding: bool = False
+    updated: float = field(default_factory=time.time)
+
+
+class ConversationMemory:
+    """
+    Session-scoped rolling memory for every chat route.
+
+    A session keeps its last `recent_messages` turns (each clipped to
+    `turn_tokens`) and a summary of everything older (at most `summary_tokens`),
+    so prompts stay flat however long the conversation or its replies get.
+    After each reply, turns that fall out of the window are folded into the
+    summary by a background LLM call; a local extractive summary is used when
+    the call is disabled or fails. Sessions live in an in-process LRU.
+
+    Without a session id (or for a session this process hasn't seen, e.g. after
+    a restart) the client-sent history is compacted the same way, locally.
+    """
+
+    def __init__(
+        self,
+        recent_messages: int = 4,
+        turn_tokens: int = 250,
+        summary_tokens: int = 400,
+        max_sessions: int = 2000,
+        ttl_seconds: float = 86400,
+        llm_summary: bool = True,
+    ):
+        self._recent = recent_messages
+        self._turn_tokens = turn_tokens
+        self._summary_tokens = summary_tokens
+        self._max_sessions = max_sessions
+        self._ttl = ttl_seconds
+        self._llm_summary = llm_summary
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._tasks: set = set()  # in-flight folds (the loop only keeps weak references)
+
+    # --- Sessions ---
+
+    def _get_locked(self, session_id: str) -> Optional[_Session]:
+        session = self._sessions.get(session_id)
+        if session is not None and time.time() - session.updated > self._ttl:
+            del self._sessions[session_id]
+            return None
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _put_locked(self, session_id: str, session: _Session):
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self._max_sessions:
+            self._sessions.popitem(last=False)
+
+    def _seed(self, history: List[Any]) -> _Session:
+        turns = [_turn(m) for m in history or []]
+        split = max(0, len(turns) - self._recent)
+        return _Session(summary=self._extractive_fold("", turns[:split]), turns=turns[split:])
+
+    # --- Reading ---
+
+    def _clip(self, content: str) -> str:
+        return truncate_tokens(content, self._turn_tokens)
+
+    def context(self, session_id: Optional[str], history: Optional[List[Any]] = None) -> MemoryContext:
+        """Summary + recent turns for a prompt; the session's memory wins over client-sent history."""
+        with self._lock:
+            session = self._get_locked(session_id) if session_id else None
+            if session is None:
+                session = self._seed(history or [])
+                if session_id:
+                    self._put_locked(session_id, session)
+            summary = session.summary
+            if session.pending:  # still being folded: show them extractively meanwhile
+                summary = self._extractive_fold(summary, session.pending)
+            turns = list(session.turns)
+
+        context = MemoryContext(summary=summary, turns=[(role, self._clip(content)) for role, content in turns])
+        metrics.observe("memory_context_tokens", count_tokens(context.as_text()))
+        return context
+
+    # --- Writing ---
+
+    def record(self, session_id: Optional[str], query: str, reply: str):
+        """Append the exchange; turns leaving the window are folded into the summary in the background."""
+        if not session_id or not reply:
+            return
+        with self._lock:
+            session = self._get_locked(session_id) or _Session()
+            session.turns += [("user", query), ("assistant", reply)]
+            overflow = len(session.turns) - self._recent
+            if overflow > 0:
+                session.pending += session.turns[:overflow]
+                session.turns = session.turns[overflow:]
+            session.updated = time.time()
+            self._put_locked(session_id, session)
+            start = bool(session.pending) and not session.folding
+            if start:
+                session.folding = True
+        if not start:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._fold(session))
+        except RuntimeError:  # no loop (scripts, sync callers): fold locally right away
+            self._fold_locally(session)
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _take_pending(self, session: _Session) -> Tuple[str, List[Turn]]:
+        with self._lock:
+            return session.summary, list(session.pending)
+
+    def _apply(self, session: _Session, folded: List[Turn], summary: str) -> bool:
+        """Store the new summary; True if more turns overflowed meanwhile."""
+        with self._lock:
+            session.summary = truncate_tokens(summary, self._summary_tokens)
+            session.pending = session.pending[len(folded):]
+            session.folding = bool(session.pending)
+            return session.folding
+
+    def _fold_locally(self, session: _Session):
+        more = True
+        while more:
+            summary, pending = self._take_pending(session)
+            more = self._apply(session, pending, self._extractive_fold(summary, pending))
+
+    async def _fold(self, session: _Session):
+        more = True
+        while more:
+            summary, pending = self._take_pending(session)
+            start = time.perf_counter()
+            new_summary = await self._llm_fold(summary, pending) if self._llm_summary else None
+            metrics.increment("memory_folds", method="llm" if new_summary else "extractive")
+            if new_summary is None:
+                new_summary = self._extractive_fold(summary, pending)
+            metrics.observe("memory_fold_ms", (time.perf_counter() - start) * 1000)
+            more = self._apply(session, pending, new_summary)
+
+    async def _llm_fold(self, summary: str, turns: List[Turn]) -> Optional[str]:
+        try:
+            llm = ChatOpenAI(
+                model=settings.memory_summary_model,
+                temperature=0,
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                **llm_clients.for_agent("memory"),
+            )
+            transcript = "\n".join(f"{role.title()}: {self._clip(content)}" for role, content in turns)
+            # Never competes with the user's own request
+            with priority(BACKGROUND):
+                response = await llm.ainvoke([
+                    SystemMessage(content=MEMORY_SUMMARY_SYSTEM_PROMPT.format(max_words=int(self._summary_tokens * 0.6))),
+                    HumanMessage(content=MEMORY_SUMMARY_USER_TEMPLATE.format(summary=summary or "(empty)", turns=transcript)),
+                ])
+            return response.content.strip() or None
+        except Exception as e:
+            print(f"[ConversationMemory] Summary update failed, using extractive fold: {e}")
+            return None
+
+    def _extractive_fold(self, summary: str, turns: List[Turn]) -> str:
+        """Local fallback: one gist line per turn appended, oldest lines dropped past the budget."""
+        lines = [line for line in summary.splitlines() if line.strip()] + [_gist(r, c) for r, c in turns if c.strip()]
+        kept = fit_lines(reversed(lines), self._summary_tokens)
+        return "\n".join(reversed(kept))
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+# Global memory (sessions held in-process)
+conversation_memory = ConversationMemory(
+    recent_messages=settings.memory_recent_messages,
+    turn_tokens=settings.memory_turn_tokens,
+    summary_tokens=settings.memory_summary_tokens,
+    max_sessions=settings.memory_max_sessions,
+    ttl_seconds=settings.memory_ttl_hours * 3600,
+    llm_summary=settings.memory_llm_summary,
+)
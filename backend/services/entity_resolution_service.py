@@ -5,6 +5,12 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from config import settings
 from data.ticker_map import TICKER_MAP
+from services.alias_matcher import AliasMatcher, symbol_matcher
+from services.intent_classifier import intent_classifier
+from services.llm_governor import llm_clients
+
+# Company names and aliases, compiled once
+_STATIC_MATCHER = AliasMatcher(TICKER_MAP)
 
 class EntityResolutionService:
     """
@@ -12,7 +18,7 @@ class EntityResolutionService:
     1. Intent (TICKER_ANALYSIS, PORTFOLIO_QA, GENERIC_CHAT)
     2. Ticker (if applicable)
     
-    Uses a cascade: Regex -> Commands -> Portfolio -> Static Map -> LLM (optional)
+    Uses a cascade: Regex -> Commands -> Portfolio -> Static Map -> Local Classifier -> LLM (optional)
     """
 
     @staticmethod
@@ -30,7 +36,7 @@ class EntityResolutionService:
         
         # 0. Fast Holdings Lookup (Optimization for <500ms response)
         # Checks for "shares of AAPL", "my position in TSLA", etc.
-        holdings_match = EntityResolutionService._match_holdings_lookup(query_upper, portfolio_context)
+        holdings_match = EntityResolutionService._match_holdings_lookup(query, portfolio_context)
         if holdings_match:
              return {"intent": "HOLDINGS_LOOKUP", "ticker": holdings_match, "confidence": 1.0, "method": "fast_holdings_match"}
 
@@ -46,7 +52,7 @@ class EntityResolutionService:
 
         # 3. Portfolio Match
         if portfolio_context:
-            ticker = EntityResolutionService._match_portfolio(query_upper, portfolio_context)
+            ticker = EntityResolutionService._match_portfolio(query, portfolio_context)
             if ticker:
                  return {"intent": "TICKER_ANALYSIS", "ticker": ticker, "confidence": 0.85, "method": "portfolio_match"}
 
@@ -55,7 +61,14 @@ class EntityResolutionService:
         if ticker:
             return {"intent": "TICKER_ANALYSIS", "ticker": ticker, "confidence": 0.8, "method": "static_map"}
 
-        # 5. LLM Resolution (if enabled)
+        # 5. Local Intent Classifier
+        # No ticker was found above, so a TICKER_ANALYSIS guess still needs the LLM to name one
+        local = EntityResolutionService._classify_locally(query)
+        if local and (local["confidence"] >= settings.intent_classifier_threshold or not settings.ENABLE_ENTITY_RESOLUTION):
+            if local["intent"] != "TICKER_ANALYSIS":
+                return local
+
+        # 6. LLM Resolution (if enabled)
         if settings.ENABLE_ENTITY_RESOLUTION:
             return await EntityResolutionService._resolve_with_llm(query, portfolio_context)
 
@@ -85,35 +98,27 @@ class EntityResolutionService:
         return None
 
     @staticmethod
-    def _match_portfolio(query_upper: str, portfolio_context: List[Dict]) -> Optional[str]:
-        portfolio_tickers = [h.get('symbol', '').upper() for h in portfolio_context if h.get('symbol')]
-        for ticker in portfolio_tickers:
-            if ticker and ticker in query_upper:
-                return ticker
-        return None
+    def _match_portfolio(query: str, portfolio_context: List[Dict]) -> Optional[str]:
+        # Whole-word symbol match; one- and two-letter symbols must be written in capitals
+        portfolio_tickers = frozenset(h.get('symbol', '').upper() for h in portfolio_context if h.get('symbol'))
+        return symbol_matcher(portfolio_tickers).first(query) if portfolio_tickers else None
 
     @staticmethod
     def _match_static_map(query: str) -> Optional[str]:
-        # Normalize query: remove punctuation, lowercase
-        normalized = re.sub(r'[^\w\s]', '', query.lower())
-        words = normalized.split()
-        
-        # Check explicit full matches or word matches
-        for name, ticker in TICKER_MAP.items():
-            if name in normalized:
-                # Ensure it's a whole word match or significant phrase
-                pattern = rf"\b{re.escape(name)}\b"
-                if re.search(pattern, normalized):
-                    return ticker
-        return None
+        return _STATIC_MATCHER.first(query)
+
+    @staticmethod
+    def _classify_locally(query: str) -> Optional[Dict[str, Any]]:
+        if intent_classifier is None:
+            return None
+        intent, confidence = intent_classifier.predict(query)
+        return {"intent": intent, "ticker": None, "confidence": round(confidence, 3), "method": "local_classifier"}
 
     @staticmethod
     async def _resolve_with_llm(query: str, portfolio_context: List[Dict]) -> Dict[str, Any]:
         """
         Uses LLM to classify intent and extract ticker.
         """
-        llm = ChatOpenAI(model=settings.openai_model, temperature=0, api_key=settings.openai_api_key)
-        
         portfolio_tickers = [h.get('symbol', '') for h in portfolio_context]
         
         system_prompt = """You are an intent classifier for a financial assistant.
@@ -133,6 +138,8 @@ class EntityResolutionService:
         user_prompt = f"Query: {query}\nUser Portfolio Holdings: {portfolio_tickers}"
         
         try:
+            llm = ChatOpenAI(model=settings.openai_model, temperature=0, api_key=settings.openai_api_key, base_url=settings.openai_base_url,
+                             **llm_clients.for_agent("entity_resolution"))
             response = await llm.ainvoke([
                 SystemMessage(content=system_prompt),
                 HumanMessage(content=user_prompt)
@@ -146,16 +153,13 @@ class EntityResolutionService:
             return {"intent": "GENERIC_CHAT", "ticker": None, "confidence": 0.0, "method": "llm_failed"}
 
     @staticmethod
-    def _match_holdings_lookup(query_upper: str, portfolio_context: List[Dict]) -> Optional[str]:
+    def _match_holdings_lookup(query: str, portfolio_context: List[Dict]) -> Optional[str]:
         """
         Fast check for specific holdings keywords + portfolio ticker match.
         """
         holdings_keywords = ["POSITION", "HOLDING", "SHARES", "AVG COST", "AVERAGE COST", "OWN", "PRICE OF", "MY PL", "MY P&L"]
         
-        if any(k in query_upper for k in holdings_keywords):
+        if any(k in query.upper() for k in holdings_keywords):
             # Check if any portfolio ticker is mentioned
-            for holding in portfolio_context:
-                symbol = holding.get("symbol", "").upper()
-                if symbol and symbol in query_upper:
-                    return symbol
+            return EntityResolutionService._match_portfolio(query, portfolio_context)
         return None
@@ -1,81 +1,105 @@
-import requests
-import yfinance as yf
+import asyncio
+import weakref
 from config import settings
 from services.cache import data_cache
-from services.rate_limiter import rate_limiter
-from typing import Dict, Any
+from services.fundamentals_store import TABLES, fundamentals_store
+from services.http_transport import http_transport, run_sync
+from services.quota_scheduler import quota_scheduler
+from services.reference_data_service import reference_data
+from typing import Dict, Any, List, Optional
 
 class FundamentalsService:
-    """Fetches fundamental financial data from FMP and yfinance."""
+    """
+    Fundamental financial data from FMP and yfinance.
+
+    Reads come from the on-disk fundamentals store; a provider is only called
+    when its part of the snapshot is due (daily, or more often around earnings).
+    Concurrent requests for the same ticker share one refresh.
+    """
+
+    _refreshes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
 
     @staticmethod
     def get_fundamentals(ticker: str) -> Dict[str, Any]:
+        """Synchronous wrapper around aget_fundamentals."""
+        return run_sync(FundamentalsService.aget_fundamentals(ticker))
+
+    @staticmethod
+    async def aget_fundamentals(ticker: str) -> Dict[str, Any]:
         """Aggregate fundamental data from multiple sources."""
         cache_key = f"fundamentals:{ticker}"
         cached = data_cache.get(cache_key)
         if cached is not None:
             return cached
 
-        fundamentals = {}
+        snapshot = fundamentals_store.load(ticker)
+        sources = ["yfinance", "fmp"] if settings.fmp_api_key else ["yfinance"]
+        if fundamentals_store.stale_sources(snapshot, sources):
+            refreshes = FundamentalsService._refreshes.setdefault(asyncio.get_running_loop(), {})
+            task = refreshes.get(ticker)
+            if task is None:
+                task = asyncio.create_task(FundamentalsService._refresh(ticker, sources))
+                task.add_done_callback(lambda _: refreshes.pop(ticker, None))
+                refreshes[ticker] = task
+            snapshot = await asyncio.shield(task)
+
+        fundamentals = fundamentals_store.view(snapshot)
+        data_cache.set(cache_key, fundamentals)
+        return fundamentals
+
+    @staticmethod
+    async def _refresh(ticker: str, sources: List[str]) -> Optional[Dict[str, Any]]:
+        """Fetch only the stale sources and merge them into the stored snapshot."""
+        stale = fundamentals_store.stale_sources(fundamentals_store.load(ticker), sources)
 
-        try:
-            # yfinance fundamentals (always available, no API key)
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            fundamentals["yfinance"] = {
-                "revenue": info.get("totalRevenue"),
-                "revenue_growth": info.get("revenueGrowth"),
-                "gross_margins": info.get("grossMargins"),
-                "operating_margins": info.get("operatingMargins"),
-                "profit_margins": info.get("profitMargins"),
-                "net_income": info.get("netIncomeToCommon"),
-                "total_debt": info.get("totalDebt"),
-                "total_cash": info.get("totalCash"),
-                "free_cash_flow": info.get("freeCashflow"),
-                "operating_cash_flow": info.get("operatingCashflow"),
-                "debt_to_equity": info.get("debtToEquity"),
-                "current_ratio": info.get("currentRatio"),
-                "return_on_equity": info.get("returnOnEquity"),
-                "return_on_assets": info.get("returnOnAssets"),
-                "earnings_growth": info.get("earningsGrowth"),
-                "pe_ratio": info.get("trailingPE"),
-                "forward_pe": info.get("forwardPE"),
-                "peg_ratio": info.get("pegRatio"),
-                "price_to_book": info.get("priceToBook"),
-                "price_to_sales": info.get("priceToSalesTrailing12Months"),
-                "enterprise_value": info.get("enterpriseValue"),
-                "ev_to_ebitda": info.get("enterpriseToEbitda"),
-                "market_cap": info.get("marketCap"),
-            }
-        except Exception as e:
-            print(f"yfinance fundamentals error: {e}")
-            fundamentals["yfinance"] = {}
+        # yfinance fundamentals (always available, no API key) — shared with MarketDataService.
+        # Runs alongside the FMP requests below.
+        reference_task = None
+        if "yfinance" in stale:
+            reference_task = asyncio.create_task(asyncio.to_thread(reference_data.get, ticker))
 
         # FMP fundamentals (if API key available — richer data)
-        if settings.fmp_api_key and rate_limiter.can_call("fmp"):
-            try:
-                rate_limiter.record_call("fmp")
-                base = "https://financialmodelingprep.com/api/v3"
-                params = {"apikey": settings.fmp_api_key}
+        # Each of the three FMP requests counts against the daily quota
+        fmp_rows = None
+        if "fmp" in stale:
+            if await quota_scheduler.acquire("fmp", cost=3):
+                fmp_rows = await FundamentalsService._fetch_fmp(ticker)
+            else:
+                print(f"[FundamentalsService] FMP quota not available — serving stored data for {ticker}")
 
-                # Income statement
-                resp = requests.get(f"{base}/income-statement/{ticker}", params={**params, "limit": 4}, timeout=10)
-                if resp.ok:
-                    fundamentals["income_statements"] = resp.json()[:4]  # Last 4 quarters
+        yfinance = earnings_ts = None
+        if reference_task is not None:
+            reference = await reference_task
+            if reference:
+                yfinance = reference.to_fundamentals()
+                earnings_ts = reference.earnings_timestamp
 
-                # Key metrics
-                resp = requests.get(f"{base}/key-metrics/{ticker}", params={**params, "limit": 1}, timeout=10)
-                if resp.ok:
-                    data = resp.json()
-                    fundamentals["key_metrics"] = data[0] if data else {}
+        if yfinance is None and not fmp_rows:
+            # Nothing new; keep serving whatever is stored
+            return fundamentals_store.load(ticker)
+        return fundamentals_store.save(ticker, yfinance=yfinance, fmp_rows=fmp_rows or None, earnings_ts=earnings_ts)
 
-                # Financial ratios
-                resp = requests.get(f"{base}/ratios/{ticker}", params={**params, "limit": 1}, timeout=10)
-                if resp.ok:
-                    data = resp.json()
-                    fundamentals["ratios"] = data[0] if data else {}
-            except Exception as e:
-                 print(f"FMP fundamentals error: {e}")
+    @staticmethod
+    async def _fetch_fmp(ticker: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Quarterly income statements, key metrics and ratios, requested concurrently."""
+        base = f"{settings.fmp_base_url}/api/v3"
+        params = {"apikey": settings.fmp_api_key, "period": "quarter", "limit": 8}
 
-        data_cache.set(cache_key, fundamentals)
-        return fundamentals
+        results = await asyncio.gather(
+            http_transport.get(f"{base}/income-statement/{ticker}", params=params),
+            http_transport.get(f"{base}/key-metrics/{ticker}", params=params),
+            http_transport.get(f"{base}/ratios/{ticker}", params=params),
+            return_exceptions=True,
+        )
+
+        data: Dict[str, List[Dict[str, Any]]] = {}
+        for name, resp in zip(TABLES, results):
+            if isinstance(resp, Exception):
+                print(f"FMP fundamentals error ({name}): {resp}")
+                continue
+            try:
+                if resp.is_success:
+                    data[name] = list(resp.json())
+            except Exception as e:
+                print(f"FMP fundamentals error ({name}): {e}")
+        return data
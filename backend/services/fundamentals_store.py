@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from config import settings
+from typing import Any, Dict, List, Optional
+
+# FMP statements kept as quarterly history
+TABLES = ("income_statements", "key_metrics", "ratios")
+
+
+def merge_columns(columns: Dict[str, List[Any]], rows: List[Dict[str, Any]], keep: int) -> Dict[str, List[Any]]:
+    """
+    Merge period rows into a column-oriented table keyed by "date" (one entry per
+    quarter), oldest first, keeping the newest `keep` periods.
+    """
+    by_date: Dict[str, Dict[str, Any]] = {}
+    names = list(columns)
+    for i, date in enumerate(columns.get("date", [])):
+        by_date[date] = {name: columns[name][i] for name in names}
+    for row in rows:
+        if row.get("date"):
+            by_date[row["date"]] = {**by_date.get(row["date"], {}), **row}
+            names.extend(k for k in row if k not in names)
+
+    dates = sorted(by_date)[-keep:]
+    return {name: [by_date[d].get(name) for d in dates] for name in names}
+
+
+def column_rows(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Rows of a columnar table, newest period first."""
+    count = len(columns.get("date", []))
+    return [{name: values[i] for name, values in columns.items()} for i in reversed(range(count))]
+
+
+class FundamentalsStore:
+    """
+    On-disk fundamentals per ticker: the yfinance snapshot plus columnar quarterly
+    history for each FMP statement (income statements, key metrics, ratios).
+
+    Each source refreshes daily, or every few hours around an earnings date;
+    every other read is served locally. History accumulates across refreshes,
+    so multi-quarter trends come without extra provider calls.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str],
+        refresh_hours: float = 24,
+        earnings_refresh_hours: float = 6,
+        earnings_window_days: float = 2,
+        history_quarters: int = 12,
+    ):
+        self._directory = directory
+        self._refresh_s = refresh_hours * 3600
+        self._earnings_refresh_s = earnings_refresh_hours * 3600
+        self._earnings_window_s = earnings_window_days * 86400
+        self.history_quarters = history_quarters
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self._directory, f"{ticker.upper()}.json")
+
+    def load(self, ticker: str) -> Optional[Dict[str, Any]]:
+        ticker = ticker.upper()
+        with self._lock:
+            snapshot = self._snapshots.get(ticker)
+            if snapshot is None and self._directory and os.path.exists(self._path(ticker)):
+                try:
+                    with open(self._path(ticker)) as f:
+                        snapshot = self._snapshots[ticker] = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"[FundamentalsStore] Could not load {ticker}: {e}")
+            return snapshot
+
+    def stale_sources(self, snapshot: Optional[Dict[str, Any]], sources: List[str], now: Optional[float] = None) -> List[str]:
+        """Which of `sources` are due: never fetched, older than a day, or older than a few hours near earnings."""
+        now = now or time.time()
+        if not snapshot:
+            return list(sources)
+        max_age = self._refresh_s
+        earnings = snapshot.get("earnings_ts")
+        if earnings and abs(now - earnings) < self._earnings_window_s:
+            max_age = self._earnings_refresh_s
+        fetched = snapshot.get("fetched_at", {})
+        return [s for s in sources if now - fetched.get(s, 0) >= max_age]
+
+    def save(
+        self,
+        ticker: str,
+        yfinance: Optional[Dict[str, Any]] = None,
+        fmp_rows: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        earnings_ts: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Merge a refresh into the ticker's snapshot; only the sources passed are marked fresh."""
+        ticker = ticker.upper()
+        existing = self.load(ticker) or {"fetched_at": {}, "yfinance": {}, "tables": {}}
+        now = time.time()
+        snapshot = {
+            "fetched_at": dict(existing.get("fetched_at", {})),
+            "earnings_ts": earnings_ts or existing.get("earnings_ts"),
+            "yfinance": existing.get("yfinance", {}),
+            "tables": dict(existing.get("tables", {})),
+        }
+        if yfinance is not None:
+            snapshot["yfinance"] = yfinance
+            snapshot["fetched_at"]["yfinance"] = now
+        if fmp_rows is not None:
+            for name in TABLES:
+                snapshot["tables"][name] = merge_columns(
+                    snapshot["tables"].get(name, {}), fmp_rows.get(name, []), self.history_quarters
+                )
+            snapshot["fetched_at"]["fmp"] = now
+
+        with self._lock:
+            self._snapshots[ticker] = snapshot
+            if self._directory:
+                try:
+                    os.makedirs(self._directory, exist_ok=True)
+                    tmp_path = f"{self._path(ticker)}.{threading.get_ident()}.tmp"
+                    with open(tmp_path, "w") as f:
+                        json.dump(snapshot, f)
+                    os.replace(tmp_path, self._path(ticker))
+                except OSError as e:
+                    print(f"[FundamentalsStore] Could not persist {ticker}: {e}")
+        return snapshot
+
+    @staticmethod
+    def view(snapshot: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        The shape agents consume: latest four income statements, latest key
+        metrics and ratios, the yfinance block, plus per-table quarterly history.
+        """
+        if not snapshot:
+            return {}
+        tables = snapshot.get("tables", {})
+        data: Dict[str, Any] = {}
+        income = column_rows(tables.get("income_statements", {}))
+        if income:
+            data["income_statements"] = income[:4]  # Last 4 periods
+        for name in ("key_metrics", "ratios"):
+            rows = column_rows(tables.get(name, {}))
+            if rows:
+                data[name] = rows[0]
+        data["yfinance"] = snapshot.get("yfinance", {})
+        history = {name: columns for name, columns in tables.items() if columns.get("date")}
+        if history:
+            data["history"] = history
+        return data
+
+
+# Global store; one JSON file per ticker under the state directory
+fundamentals_store = FundamentalsStore(
+    os.path.join(settings.state_dir, "fundamentals"),
+    refresh_hours=settings.fundamentals_refresh_hours,
+    earnings_refresh_hours=settings.fundamentals_earnings_refresh_hours,
+)
@@ -0,0 +1,167 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+import httpx
+from config import settings
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+from urllib.parse import urlsplit
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TimeoutBudgetExceeded(Exception):
+    """Raised when a request (including its retries) runs past its overall time budget."""
+
+
+class HttpTransport:
+    """
+    Shared async HTTP transport for every external provider.
+
+    - One pooled keep-alive `httpx.AsyncClient` per event loop.
+    - Per-host concurrency limits, so one slow provider can't starve the pool.
+    - Retries on transport errors, 429 and 5xx with full-jitter exponential backoff
+      (honouring Retry-After when it fits the budget).
+    - A timeout budget that bounds the whole call, retries included.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive: int = 20,
+        per_host_limit: int = 8,
+        retries: int = 2,
+        timeout_budget: float = 15.0,
+        backoff_base: float = 0.25,
+        backoff_cap: float = 4.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self._per_host_limit = per_host_limit
+        self._retries = retries
+        self._timeout_budget = timeout_budget
+        self._backoff_base = backoff_base
+        self._backoff_cap = backoff_cap
+        self._transport = transport
+        # httpx clients and asyncio semaphores are bound to the loop they were created on
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._host_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self._limits, transport=self._transport)
+            self._clients[loop] = client
+        return client
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        per_loop = self._host_semaphores.setdefault(loop, {})
+        if host not in per_loop:
+            per_loop[host] = asyncio.Semaphore(self._per_host_limit)
+        return per_loop[host]
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self._backoff_cap, self._backoff_base * (2 ** attempt)))
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout_budget: Optional[float] = None,
+        retries: Optional[int] = None,
+    ) -> httpx.Response:
+        """
+        Issue a request within `timeout_budget` seconds.
+        Returns the last response (callers check `is_success`); raises on transport failure
+        or when the budget runs out.
+        """
+        budget = self._timeout_budget if timeout_budget is None else timeout_budget
+        max_retries = self._retries if retries is None else retries
+        deadline = time.monotonic() + budget
+        host = urlsplit(url).netloc
+        client = self._client()
+
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutBudgetExceeded(f"{method} {url} exceeded {budget:.1f}s budget")
+
+            response: Optional[httpx.Response] = None
+            error: Optional[Exception] = None
+            try:
+                async with self._semaphore(host):
+                    response = await client.request(
+                        method, url, params=params, json=json, headers=headers,
+                        timeout=httpx.Timeout(remaining),
+                    )
+            except httpx.TransportError as e:
+                error = e
+
+            retryable = error is not None or response.status_code in RETRYABLE_STATUS
+            if not retryable or attempt >= max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._backoff(attempt, response.headers.get("Retry-After") if response is not None else None)
+            if time.monotonic() + delay >= deadline:
+                # No time left for another attempt
+                if error is not None:
+                    raise error
+                return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self):
+        """Close the client bound to the current loop (called on app shutdown)."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+# Background loop so synchronous callers share pooled connections instead of
+# spinning up (and throwing away) a client per call.
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="http-transport-loop", daemon=True).start()
+        return _sync_loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a service coroutine from synchronous code (scripts, tests, sync graph nodes)."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_sync_loop()).result()
+
+
+# Global transport instance
+http_transport = HttpTransport(
+    max_connections=settings.http_max_connections,
+    per_host_limit=settings.http_per_host_limit,
+    retries=settings.http_retries,
+    timeout_budget=settings.http_timeout_budget_s,
+)
@@ -0,0 +1,91 @@
+import json
+import re
+import zlib
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LABELED_QUERIES_PATH = Path(__file__).resolve().parent.parent / "data" / "intents" / "labeled_queries.jsonl"
+
+INTENTS = ("TICKER_ANALYSIS", "PORTFOLIO_QA", "GENERIC_CHAT")
+
+_WORD_RE = re.compile(r"[a-z0-9&/']+")
+
+
+def load_labeled_queries(path: Path = LABELED_QUERIES_PATH) -> List[Dict[str, str]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class IntentClassifier:
+    """
+    Local intent classifier: hashed word uni/bigrams and character trigrams feeding
+    a softmax-regression model, trained at startup from the labeled query file.
+
+    Prediction is a few dict lookups and one small matrix sum, so callers can use
+    it ahead of the LLM and only escalate when `confidence` is low.
+    """
+
+    def __init__(self, n_features: int = 2 ** 12, epochs: int = 300, lr: float = 4.0, l2: float = 1e-4):
+        self._n_features = n_features
+        self._epochs = epochs
+        self._lr = lr
+        self._l2 = l2
+        self._weights = np.zeros((n_features, len(INTENTS)), dtype=np.float32)
+        self._bias = np.zeros(len(INTENTS), dtype=np.float32)
+
+    def _features(self, query: str) -> np.ndarray:
+        words = _WORD_RE.findall(query.lower())
+        grams = [f"w:{w}" for w in words]
+        grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f"^{w}$"
+            grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return np.unique(np.fromiter((zlib.crc32(g.encode()) % self._n_features for g in grams), dtype=np.int64, count=len(grams)))
+
+    def fit(self, queries: Sequence[str], labels: Sequence[str]) -> "IntentClassifier":
+        """Full-batch gradient descent on cross-entropy; the labeled set is small enough to train at import."""
+        X = np.zeros((len(queries), self._n_features), dtype=np.float32)
+        for row, query in enumerate(queries):
+            idx = self._features(query)
+            if len(idx):
+                X[row, idx] = 1.0 / np.sqrt(len(idx))
+        Y = np.eye(len(INTENTS), dtype=np.float32)[[INTENTS.index(label) for label in labels]]
+
+        W = np.zeros_like(self._weights)
+        b = np.zeros_like(self._bias)
+        n = max(len(queries), 1)
+        for _ in range(self._epochs):
+            logits = X @ W + b
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            grad = (probs - Y) / n
+            W -= self._lr * (X.T @ grad + self._l2 * W)
+            b -= self._lr * grad.sum(axis=0)
+        self._weights, self._bias = W, b
+        return self
+
+    def predict(self, query: str) -> Tuple[str, float]:
+        """(intent, probability of that intent)."""
+        idx = self._features(query)
+        logits = self._bias.copy()
+        if len(idx):
+            logits += self._weights[idx].sum(axis=0) / np.sqrt(len(idx))
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return INTENTS[best], float(probs[best])
+
+
+def train_default(path: Path = LABELED_QUERIES_PATH) -> Optional[IntentClassifier]:
+    try:
+        rows = load_labeled_queries(path)
+    except (OSError, ValueError) as e:
+        print(f"[IntentClassifier] Could not load labeled queries: {e}")
+        return None
+    return IntentClassifier().fit([r["query"] for r in rows], [r["intent"] for r in rows])
+
+
+# Global classifier (trained once at import from the bundled labels)
+intent_classifier = train_default()
@@ -0,0 +1,92 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_TRAILING_COMMA = re.compile(r",\s*[}\]]")
+
+
+def _strip_wrapping(text: str) -> str:
+    """Drop markdown fences and any prose before the first brace."""
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else ""
+    if cleaned.rstrip().endswith("```"):
+        cleaned = cleaned.rstrip()[:-3]
+    start = cleaned.find("{")
+    return cleaned[start:] if start >= 0 else cleaned
+
+
+def _scan(text: str) -> Tuple[List[str], bool, int, List[Tuple[int, List[str]]], List[int]]:
+    """
+    Walk the JSON text tracking open containers. Returns (stack, inside_string,
+    end_of_first_value, comma_positions_with_stack, trailing_comma_positions)
+    where end_of_first_value is -1 if the top-level object never closes.
+    Only structural commas are reported; commas inside string values never are.
+    """
+    stack: List[str] = []
+    commas: List[Tuple[int, List[str]]] = []
+    trailing: List[int] = []
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return stack, False, i + 1, commas, trailing
+        elif ch == ",":
+            commas.append((i, list(stack)))
+            if _TRAILING_COMMA.match(text, i):
+                trailing.append(i)
+    return stack, in_string, -1, commas, trailing
+
+
+def _without(text: str, positions: List[int]) -> str:
+    """`text` minus the characters at `positions` (the trailing commas `_scan` found)."""
+    drop = set(positions)
+    return "".join(ch for i, ch in enumerate(text) if i not in drop) if drop else text
+
+
+def _close(prefix: str, stack: List[str], trailing: List[int]) -> str:
+    body = _without(prefix, [pos for pos in trailing if pos < len(prefix)])
+    return body.rstrip().rstrip(",") + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """
+    Best-effort parse of slightly malformed model JSON without another LLM call:
+    markdown fences and surrounding prose, trailing commas, and output truncated
+    mid-value (open strings and containers are closed, a dangling partial member
+    is dropped). Returns None when nothing parseable can be recovered.
+    """
+    cleaned = _strip_wrapping(text)
+    stack, in_string, end, commas, trailing = _scan(cleaned)
+    if end > 0:
+        cleaned = cleaned[:end]
+    try:
+        return json.loads(_without(cleaned, trailing))
+    except ValueError:
+        pass
+    if end > 0:
+        return None
+
+    # Truncated: close what is open, else cut back to the last complete member
+    candidates = [_close(cleaned + ('"' if in_string else ""), stack, trailing)]
+    candidates += [_close(cleaned[:pos], open_stack, trailing) for pos, open_stack in reversed(commas)]
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    return None
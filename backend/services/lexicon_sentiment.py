@@ -0,0 +1,132 @@
+import json
+import re
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+LEXICON_PATH = Path(__file__).resolve().parent.parent / "data" / "lexicon" / "finance_sentiment.json"
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+# Scores within this band of zero read as neutral
+NEUTRAL_BAND = 0.15
+
+
+class LexiconSentimentScorer:
+    """
+    Local finance-lexicon sentiment over headlines and summaries — no LLM call.
+
+    Tokens are mapped to lexicon ids once; per-article sums are a single
+    `np.bincount` over the whole batch. Words shortly after a negator ("not",
+    "failed to", ...) use a sign-flipped copy of the weight table. Raw sums are
+    squashed to [-1, 1] with x / sqrt(x^2 + alpha).
+    """
+
+    def __init__(self, lexicon_path: Path = LEXICON_PATH, negation_window: int = 3, alpha: float = 4.0):
+        with open(lexicon_path) as f:
+            lexicon = json.load(f)
+        words = list(lexicon["weights"])
+        self._ids = {w: i for i, w in enumerate(words)}
+        weights = np.array([lexicon["weights"][w] for w in words], dtype=np.float64)
+        # ids >= len(words) are the negated variants
+        self._weights = np.concatenate([weights, -weights])
+        self._negators = set(lexicon.get("negators", []))
+        self._negation_window = negation_window
+        self._alpha = alpha
+
+    def _hits(self, text: str) -> List[int]:
+        hits = []
+        negate_for = 0
+        offset = len(self._ids)
+        for token in _TOKEN_RE.findall(text.lower()):
+            if token in self._negators:
+                negate_for = self._negation_window
+                continue
+            idx = self._ids.get(token)
+            if idx is not None:
+                hits.append(idx + offset if negate_for else idx)
+            negate_for = max(0, negate_for - 1)
+        return hits
+
+    def score_texts(self, texts: List[str]) -> np.ndarray:
+        """Score in [-1, 1] per text."""
+        if not texts:
+            return np.zeros(0)
+        per_doc = [self._hits(t) for t in texts]
+        doc_ids = np.repeat(np.arange(len(texts)), [len(h) for h in per_doc])
+        term_ids = np.fromiter((i for h in per_doc for i in h), dtype=np.int64, count=len(doc_ids))
+        raw = np.bincount(doc_ids, weights=self._weights[term_ids], minlength=len(texts))
+        return raw / np.sqrt(raw * raw + self._alpha)
+
+    def score_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Per-article scores plus the aggregate rating."""
+        texts = [f"{a.get('headline', '')}. {a.get('summary') or ''}" for a in articles]
+        scores = self.score_texts(texts)
+        labels = np.where(scores > NEUTRAL_BAND, "POSITIVE", np.where(scores < -NEUTRAL_BAND, "NEGATIVE", "NEUTRAL"))
+        aggregate = float(scores.mean()) if len(scores) else 0.0
+        counts = {label: int((labels == label).sum()) for label in ("POSITIVE", "NEUTRAL", "NEGATIVE")}
+        return {
+            "articles": [
+                {"headline": a.get("headline", ""), "score": round(float(s), 3), "label": str(l)}
+                for a, s, l in zip(articles, scores, labels)
+            ],
+            "aggregate": round(aggregate, 3),
+            "rating": rating_for(aggregate),
+            "counts": counts,
+        }
+
+    def build_report(self, ticker: str, articles: List[Dict[str, Any]], sentiment: Dict[str, Any],
+                     analyst_rating: Optional[Any] = None) -> str:
+        """A sentiment report in the same sections the LLM agent writes, for the supervisor."""
+        result = self.score_articles(articles[:15])
+        counts = result["counts"]
+        scored = [a for a in result["articles"] if a["label"] != "NEUTRAL"]
+        strongest = sorted(scored, key=lambda a: abs(a["score"]), reverse=True)[:3]
+        themes = "; ".join(f"\"{a['headline']}\" ({a['label'].lower()})" for a in strongest) or "No strongly worded coverage."
+
+        bullish = sentiment.get("bullish_percent")
+        sector = sentiment.get("sector_average_bullish")
+        positioning = f"Lexicon score {result['aggregate']:+.2f} across {len(result['articles'])} articles " \
+                      f"({counts['POSITIVE']} positive / {counts['NEUTRAL']} neutral / {counts['NEGATIVE']} negative)."
+        if bullish is not None:
+            positioning += f" Finnhub bullish share {bullish}% vs sector {sector if sector is not None else 'N/A'}%."
+
+        extreme = abs(result["aggregate"]) > 0.6 and len(result["articles"]) >= 5
+        buzz = "N/A"
+        if sentiment.get("articles_in_last_week") is not None and sentiment.get("weekly_average"):
+            ratio = sentiment["articles_in_last_week"] / sentiment["weekly_average"]
+            buzz = "HIGH" if ratio > 1.5 else "LOW" if ratio < 0.5 else "NORMAL"
+        confidence = "MEDIUM" if len(result["articles"]) >= 5 and counts[result["rating"]] >= len(result["articles"]) / 2 else "LOW"
+
+        return "\n".join([
+            "## NEWS THEMES",
+            themes,
+            "",
+            "## SENTIMENT POSITIONING",
+            positioning,
+            "",
+            "## ANALYST VIEW",
+            f"Consensus rating: {analyst_rating if analyst_rating is not None else 'N/A'}.",
+            "",
+            "## CONTRARIAN SIGNALS",
+            "Coverage is one-sided enough to watch for a reversal." if extreme else "No extreme reading.",
+            "",
+            "## SENTIMENT RATING",
+            f"Rating: {result['rating']}",
+            f"Confidence: {confidence}",
+            f"Buzz level: {buzz} (vs weekly average)",
+            f"Key narrative: {strongest[0]['headline'] if strongest else 'No dominant theme.'}",
+            "(Fast mode: scored locally with the finance lexicon, no LLM pass.)",
+        ])
+
+
+def rating_for(score: float) -> str:
+    if score > NEUTRAL_BAND:
+        return "POSITIVE"
+    if score < -NEUTRAL_BAND:
+        return "NEGATIVE"
+    return "NEUTRAL"
+
+
+# Global scorer (lexicon loaded once)
+lexicon_sentiment = LexiconSentimentScorer()
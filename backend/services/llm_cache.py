@@ -0,0 +1,206 @@
+import contextlib
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from config import settings
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from services.metrics import metrics
+from typing import Any, Dict, Optional, Sequence
+
+# Set for a request that must not be served from the cache (fresh completions are still stored)
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+# Key of the most recent lookup in this context, so a caller can drop a completion it rejected
+_last_key: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_cache_last_key", default=None)
+
+
+@contextlib.contextmanager
+def bypass_llm_cache(enabled: bool = True):
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class LLMResponseStore:
+    """
+    Disk-backed completion store in SQLite, content-addressed by a hash of the
+    LLM configuration string (model, temperature, ...) and the rendered messages.
+
+    Entries expire after `ttl_seconds`; when the stored payload exceeds
+    `max_bytes`, least recently used entries are evicted. The database is
+    opened on first use, so importing an agent touches no disk state.
+    """
+
+    def __init__(self, path: Optional[str], ttl_seconds: int = 21600, max_bytes: int = 64 * 1024 * 1024):
+        self._path = path
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The connection, opened (and the schema created) on first use; callers hold `_lock`."""
+        if self._db is None:
+            if self._path:
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path or ":memory:", check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+            conn.commit()
+            self._db = conn
+        return self._db
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self._ttl:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM completions WHERE created <= ?", (now - self._ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        excess = total - self._max_bytes
+        freed = 0
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY accessed"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self._max_bytes, "ttl_seconds": self._ttl}
+
+
+class AgentLLMCache(BaseCache):
+    """LangChain cache view over the shared store; hits and misses are counted per agent."""
+
+    def __init__(self, store: LLMResponseStore, agent: str):
+        self._store = store
+        self._agent = agent
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        key = LLMResponseStore.key(prompt, llm_string)
+        _last_key.set(key)
+        if _bypass.get():
+            metrics.increment("llm_cache_requests", agent=self._agent, outcome="bypass")
+            return None
+        value = self._store.get(key)
+        if value is not None:
+            try:
+                generations = loads(value, allowed_objects="core")
+                metrics.increment("llm_cache_requests", agent=self._agent, outcome="hit")
+                return generations
+            except Exception as e:
+                print(f"[LLMCache] Dropping unreadable entry for {self._agent}: {e}")
+        metrics.increment("llm_cache_requests", agent=self._agent, outcome="miss")
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        self._store.put(LLMResponseStore.key(prompt, llm_string), dumps(list(return_val)))
+
+    # SQLite lookups are sub-millisecond; running them inline (rather than in an executor)
+    # keeps the lookup key in the caller's context for forget_last()
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        self.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self._store.clear()
+
+
+class LLMCache:
+    """Entry point for agents: `ChatOpenAI(..., cache=llm_cache.for_agent("technical"))`."""
+
+    def __init__(self, store: Optional[LLMResponseStore]):
+        self._store = store
+        self._views: Dict[str, AgentLLMCache] = {}
+
+    def for_agent(self, agent: str) -> Optional[BaseCache]:
+        """The agent's cache view, or None (no caching) when the cache is disabled."""
+        if self._store is None:
+            return None
+        view = self._views.get(agent)
+        if view is None:
+            view = self._views[agent] = AgentLLMCache(self._store, agent)
+        return view
+
+    def forget_last(self):
+        """Drop the completion behind the most recent call in this context (e.g. it failed to parse)."""
+        key = _last_key.get()
+        if self._store is not None and key:
+            self._store.delete(key)
+
+    def report(self) -> Dict[str, Any]:
+        """Hit rate per agent (bypassed lookups excluded), plus store size."""
+        agents: Dict[str, Dict[str, Any]] = {}
+        for labels, value in metrics.counters("llm_cache_requests").items():
+            labels = dict(labels)
+            agents.setdefault(labels["agent"], {"hit": 0, "miss": 0, "bypass": 0})[labels["outcome"]] = int(value)
+        for counts in agents.values():
+            looked_up = counts["hit"] + counts["miss"]
+            counts["hit_rate"] = round(counts["hit"] / looked_up, 3) if looked_up else None
+        return {
+            "enabled": self._store is not None,
+            "agents": agents,
+            "store": self._store.stats() if self._store is not None else None,
+        }
+
+
+# Global cache (completions persisted under the state directory)
+llm_cache = LLMCache(
+    LLMResponseStore(
+        os.path.join(settings.state_dir, "llm_cache.sqlite"),
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        max_bytes=settings.llm_cache_max_mb * 1024 * 1024,
+    ) if settings.llm_cache_enabled else None
+)
@@ -0,0 +1,481 @@
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+import weakref
+import httpx
+from collections import deque
+from config import settings
+from services.cancellation import RequestCancelled, has_cancel_scope, is_cancelled, raise_if_cancelled
+from services.metrics import metrics
+from services.quota_scheduler import PRIORITIES, current_priority
+from services.tokens import count_tokens
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+THROTTLE_STATUS = {429}
+# Transient failures the OpenAI SDK retried before it handed retries to the governed transport
+RETRY_STATUS = {408, 409, 500, 502, 503, 504}
+
+
+class _Waiter:
+    """A queued admission: woken with `grant()` from whichever thread frees capacity."""
+
+    def __init__(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.tokens = tokens
+        self.granted = False
+        self._loop = loop
+        self._event = threading.Event() if loop is None else None
+        self._future: Optional[asyncio.Future] = loop.create_future() if loop is not None else None
+
+    def grant(self):
+        self.granted = True
+        if self._event is not None:
+            self._event.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(lambda: self._future.done() or self._future.set_result(None))
+
+
+class LLMGovernor:
+    """
+    Process-wide admission control for OpenAI calls (every agent, chat, entity
+    resolution and news digests), shared across threads and event loops.
+
+    - Concurrency limit adapted AIMD-style: +1 per window of on-target calls,
+      halved on a 429, trimmed when latency runs over `latency_target_s`.
+    - Tokens-per-minute budget over a sliding 60s window, charged with the
+      request's estimated prompt + completion tokens at admission.
+    - Waiters are admitted in priority-class order (interactive, background,
+      batch), FIFO within a class; a 429 pauses admissions for its Retry-After.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        initial_concurrency: Optional[int] = None,
+        tokens_per_minute: int = 200_000,
+        latency_target_s: float = 30.0,
+        decrease_factor: float = 0.5,
+        queue_timeout_s: float = 120.0,
+    ):
+        self._max = max_concurrency
+        self._min = min_concurrency
+        self._limit = float(initial_concurrency or max(min_concurrency, max_concurrency // 2))
+        self._tpm = tokens_per_minute
+        self._latency_target = latency_target_s
+        self._decrease = decrease_factor
+        self._queue_timeout = queue_timeout_s
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._window: Deque[Tuple[float, int]] = deque()  # (admitted at, tokens)
+        self._window_tokens = 0
+        self._paused_until = 0.0
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+
+    # --- Admission ---
+
+    def _expire_locked(self, now: float):
+        while self._window and now - self._window[0][0] >= 60:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _fits_locked(self, tokens: int, now: float) -> bool:
+        if now < self._paused_until or self._in_flight >= int(self._limit):
+            return False
+        # An oversized request still goes through on its own
+        return self._window_tokens + tokens <= self._tpm or not self._window
+
+    def _admit_locked(self, tokens: int, now: float):
+        self._in_flight += 1
+        self._window.append((now, tokens))
+        self._window_tokens += tokens
+
+    def _dispatch_locked(self, now: float):
+        """Admit queued waiters in priority order while capacity lasts (head-of-line: no skipping)."""
+        self._expire_locked(now)
+        while self._queue:
+            waiter = self._queue[0][2]
+            if not self._fits_locked(waiter.tokens, now):
+                break
+            heapq.heappop(self._queue)
+            self._admit_locked(waiter.tokens, now)
+            waiter.grant()
+
+    def _next_check_locked(self, now: float) -> float:
+        """Seconds until capacity can free up without a release (TPM expiry or end of a pause)."""
+        candidates = [0.5]
+        if self._paused_until > now:
+            candidates.append(self._paused_until - now)
+        if self._window:
+            candidates.append(max(0.01, 60 - (now - self._window[0][0])))
+        return min(candidates)
+
+    def _enqueue_locked(self, tokens: int, level: str, loop=None) -> Optional[_Waiter]:
+        """None when admitted right away, else the queued waiter (which may already be granted)."""
+        now = time.monotonic()
+        self._expire_locked(now)
+        if not self._queue and self._fits_locked(tokens, now):
+            self._admit_locked(tokens, now)
+            return None
+        waiter = _Waiter(tokens, loop)
+        heapq.heappush(self._queue, (PRIORITIES.index(level), next(self._seq), waiter))
+        self._dispatch_locked(now)
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Drop a waiter that timed out; False if it was granted in the meantime."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+            heapq.heapify(self._queue)
+            return True
+
+    def _admitted(self, level: str, started: float):
+        metrics.observe("llm_queue_wait_ms", (time.monotonic() - started) * 1000, priority=level)
+
+    def acquire(self, tokens: int, level: Optional[str] = None):
+        """Block until a slot and token budget are available (sync callers)."""
+        level = level or current_priority()
+        started = time.monotonic()
+        raise_if_cancelled()
+        cancellable = has_cancel_scope()
+        with self._lock:
+            waiter = self._enqueue_locked(tokens, level)
+        while waiter is not None and not waiter.granted:
+            with self._lock:
+                wait = self._next_check_locked(time.monotonic())
+            # Poll often enough to notice the caller going away (a disconnected stream)
+            waiter._event.wait(min(wait, 0.25) if cancellable else wait)
+            with self._lock:
+                self._dispatch_locked(time.monotonic())
+            if cancellable and is_cancelled():
+                if not self._abandon(waiter):
+                    self.release(0.0)
+                metrics.increment("llm_governor_requests", outcome="cancelled", priority=level)
+                raise_if_cancelled()
+            if not waiter.granted and time.monotonic() - started > self._queue_timeout and self._abandon(waiter):
+                metrics.increment("llm_governor_requests", outcome="queue_timeout", priority=level)
+                raise httpx.PoolTimeout(f"LLM governor queue wait exceeded {self._queue_timeout:.0f}s")
+        self._admitted(level, started)
+
+    async def acquire_async(self, tokens: int, level: Optional[str] = None):
+        """Wait until a slot and token budget are available (async callers)."""
+        level = level or current_priority()
+        started = time.monotonic()
+        with self._lock:
+            waiter = self._enqueue_locked(tokens, level, loop=asyncio.get_running_loop())
+        while waiter is not None and not waiter.granted:
+            with self._lock:
+                wait = self._next_check_locked(time.monotonic())
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter._future), wait)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                if not self._abandon(waiter):
+                    self.release(0.0)  # granted as we were cancelled: hand the slot back
+                raise
+            with self._lock:
+                self._dispatch_locked(time.monotonic())
+            if not waiter.granted and time.monotonic() - started > self._queue_timeout and self._abandon(waiter):
+                metrics.increment("llm_governor_requests", outcome="queue_timeout", priority=level)
+                raise httpx.PoolTimeout(f"LLM governor queue wait exceeded {self._queue_timeout:.0f}s")
+        self._admitted(level, started)
+
+    # --- Feedback ---
+
+    def release(self, latency_s: float, throttled: bool = False, retry_after: Optional[float] = None):
+        """Free a slot and adapt the limit from the call's outcome."""
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if throttled:
+                self._limit = max(self._min, self._limit * self._decrease)
+                self._paused_until = max(self._paused_until, now + (1.0 if retry_after is None else retry_after))
+            elif latency_s > self._latency_target:
+                self._limit = max(self._min, self._limit * 0.9)
+            elif latency_s > 0:
+                self._limit = min(self._max, self._limit + 1 / self._limit)
+            self._dispatch_locked(now)
+
+    def report(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire_locked(now)
+            state = {
+                "concurrency_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "tokens_last_minute": self._window_tokens,
+                "tokens_per_minute": self._tpm,
+                "paused_for_s": round(max(0.0, self._paused_until - now), 2),
+            }
+        state["queue_wait_ms"] = {
+            level: {"p50": metrics.quantile("llm_queue_wait_ms", 0.5, priority=level),
+                    "p95": metrics.quantile("llm_queue_wait_ms", 0.95, priority=level)}
+            for level in PRIORITIES
+        }
+        state["requests"] = [
+            {**dict(labels), "count": int(value)} for labels, value in metrics.counters("llm_governor_requests").items()
+        ]
+        return state
+
+
+def describe_request(body: bytes, default_completion: int = 512) -> Tuple[Optional[str], int]:
+    """Model of a chat-completions body, and its prompt tokens plus completion allowance."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return None, count_tokens(body.decode("utf-8", "ignore")) + default_completion
+    prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []) if isinstance(m, dict))
+    completion = payload.get("max_completion_tokens") or payload.get("max_tokens") or default_completion
+    return payload.get("model"), count_tokens(prompt) + 4 * len(payload.get("messages", [])) + int(completion)
+
+
+def _usage(body: bytes) -> Dict[str, int]:
+    try:
+        usage = json.loads(body).get("usage") or {}
+    except (ValueError, AttributeError):
+        return {}
+    return {kind: int(usage[f"{kind}_tokens"]) for kind in ("prompt", "completion") if usage.get(f"{kind}_tokens") is not None}
+
+
+class _GovernedCall:
+    """Retry/feedback bookkeeping shared by the sync and async transports."""
+
+    def __init__(self, governor: LLMGovernor, agent: str, max_retries: int):
+        self.governor = governor
+        self.agent = agent
+        self.max_retries = max_retries
+
+    @staticmethod
+    def retry_after(response: httpx.Response, attempt: int) -> float:
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return random.uniform(0.5, min(20.0, 2.0 ** (attempt + 1)))
+
+    @staticmethod
+    def backoff(attempt: int) -> float:
+        """Jittered exponential wait before retrying a connection error or 5xx."""
+        return random.uniform(0.5, min(8.0, 2.0 ** (attempt + 1)))
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return self.backoff(attempt)
+
+    def retryable(self, error: Exception, attempt: int, level: str) -> bool:
+        """A connection error or timeout worth another attempt (never a cancellation)."""
+        if isinstance(error, RequestCancelled) or not isinstance(error, httpx.TransportError) or attempt >= self.max_retries:
+            return False
+        metrics.increment("llm_governor_requests", agent=self.agent, priority=level, outcome="connection_error")
+        return True
+
+    def outcome(self, status: int, level: str):
+        metrics.increment("llm_governor_requests", agent=self.agent, priority=level,
+                          outcome="throttled" if status in THROTTLE_STATUS else "ok" if status < 400 else "error")
+
+    def finisher(self, model: Optional[str], status: int, started: float):
+        """Release callback for a returned response: frees the slot and records per-model latency and tokens."""
+        done = []
+
+        def finish(body: bytes = b""):
+            if done:
+                return
+            done.append(True)
+            latency = time.monotonic() - started
+            self.governor.release(latency, throttled=status in THROTTLE_STATUS)
+            if status >= 400 or not model:
+                return
+            metrics.observe("llm_latency_ms", latency * 1000, model=model)
+            metrics.observe("llm_node_latency_ms", latency * 1000, agent=self.agent, model=model)
+            for kind, tokens in _usage(body).items():
+                metrics.increment("llm_tokens", tokens, model=model, kind=kind)
+        return finish
+
+
+def _collects(response: httpx.Response) -> bool:
+    # JSON bodies are kept for their usage block; event streams pass through untouched
+    return response.headers.get("content-type", "").startswith("application/json")
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream, on_close, collect: bool):
+        self._stream, self._on_close = stream, on_close
+        self._chunks: Optional[List[bytes]] = [] if collect else None
+
+    def __iter__(self):
+        for chunk in self._stream:
+            if self._chunks is not None:
+                self._chunks.append(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._on_close(b"".join(self._chunks or ()))
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, on_close, collect: bool):
+        self._stream, self._on_close = stream, on_close
+        self._chunks: Optional[List[bytes]] = [] if collect else None
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            if self._chunks is not None:
+                self._chunks.append(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close(b"".join(self._chunks or ()))
+
+
+class GovernedTransport(httpx.BaseTransport):
+    """httpx transport that admits each OpenAI request through the governor; the slot is held until the body is consumed."""
+
+    def __init__(self, inner: httpx.BaseTransport, call: _GovernedCall):
+        self._inner = inner
+        self._call = call
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        governor, level = self._call.governor, current_priority()
+        model, tokens = describe_request(request.read())
+        attempt = 0
+        while True:
+            raise_if_cancelled()  # the node's thread outlives its cancelled task; don't start new calls
+            governor.acquire(tokens, level)
+            started = time.monotonic()
+            try:
+                response = self._inner.handle_request(request)
+            except Exception as e:
+                governor.release(0.0)
+                if not self._call.retryable(e, attempt, level):
+                    raise
+                time.sleep(self._call.backoff(attempt))
+                attempt += 1
+                continue
+            self._call.outcome(response.status_code, level)
+            if response.status_code in THROTTLE_STATUS and attempt < self._call.max_retries:
+                response.close()
+                governor.release(time.monotonic() - started, throttled=True,
+                                 retry_after=self._call.retry_after(response, attempt))
+                attempt += 1
+                continue
+            if response.status_code in RETRY_STATUS and attempt < self._call.max_retries:
+                # Server-side trouble: back off this call only, without pausing the others
+                response.close()
+                governor.release(time.monotonic() - started)
+                time.sleep(self._call.retry_delay(response, attempt))
+                attempt += 1
+                continue
+            finish = self._call.finisher(model, response.status_code, started)
+            return httpx.Response(response.status_code, headers=response.headers, extensions=response.extensions,
+                                  stream=_ReleasingStream(response.stream, finish, _collects(response)))
+
+    def close(self):
+        self._inner.close()
+
+
+class AsyncGovernedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, call: _GovernedCall):
+        self._inner = inner
+        self._call = call
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        governor, level = self._call.governor, current_priority()
+        model, tokens = describe_request(await request.aread())
+        attempt = 0
+        while True:
+            raise_if_cancelled()
+            await governor.acquire_async(tokens, level)
+            started = time.monotonic()
+            try:
+                response = await self._inner.handle_async_request(request)
+            except BaseException as e:
+                governor.release(0.0)
+                if not self._call.retryable(e, attempt, level):
+                    raise
+                await asyncio.sleep(self._call.backoff(attempt))
+                attempt += 1
+                continue
+            self._call.outcome(response.status_code, level)
+            if response.status_code in THROTTLE_STATUS and attempt < self._call.max_retries:
+                await response.aclose()
+                governor.release(time.monotonic() - started, throttled=True,
+                                 retry_after=self._call.retry_after(response, attempt))
+                attempt += 1
+                continue
+            if response.status_code in RETRY_STATUS and attempt < self._call.max_retries:
+                await response.aclose()
+                governor.release(time.monotonic() - started)
+                await asyncio.sleep(self._call.retry_delay(response, attempt))
+                attempt += 1
+                continue
+            finish = self._call.finisher(model, response.status_code, started)
+            return httpx.Response(response.status_code, headers=response.headers, extensions=response.extensions,
+                                  stream=_AsyncReleasingStream(response.stream, finish, _collects(response)))
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+class LLMClients:
+    """
+    Entry point for agents: `ChatOpenAI(..., **llm_clients.for_agent("technical"))`.
+    Supplies governed httpx clients and turns off the OpenAI SDK's own retries.
+    The transport retries what the SDK did: 429s under the governor, and 408/409,
+    5xx and connection errors with a per-call backoff.
+    """
+
+    def __init__(self, governor: LLMGovernor, max_retries: int = 3):
+        self.governor = governor
+        self._max_retries = max_retries
+        self._lock = threading.Lock()
+        self._pool = httpx.HTTPTransport()
+        self._sync: Dict[str, httpx.Client] = {}
+        # Async connection pools are bound to the loop they were created on
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+        self._async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+
+    def _call(self, agent: str) -> _GovernedCall:
+        return _GovernedCall(self.governor, agent, self._max_retries)
+
+    def for_agent(self, agent: str) -> Dict[str, Any]:
+        with self._lock:
+            client = self._sync.get(agent)
+            if client is None:
+                client = self._sync[agent] = httpx.Client(transport=GovernedTransport(self._pool, self._call(agent)))
+            options: Dict[str, Any] = {"http_client": client, "max_retries": 0}
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return options  # sync caller (graph node thread): the async client is never used
+            per_loop = self._async.setdefault(loop, {})
+            if agent not in per_loop:
+                pool = self._async_pools.get(loop)
+                if pool is None:
+                    pool = self._async_pools[loop] = httpx.AsyncHTTPTransport()
+                per_loop[agent] = httpx.AsyncClient(transport=AsyncGovernedTransport(pool, self._call(agent)))
+            options["http_async_client"] = per_loop[agent]
+            return options
+
+
+# Global governor and client factory
+llm_governor = LLMGovernor(
+    max_concurrency=settings.llm_max_concurrency,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    latency_target_s=settings.llm_latency_target_s,
+    queue_timeout_s=settings.llm_queue_timeout_s,
+)
+llm_clients = LLMClients(llm_governor, max_retries=settings.llm_max_retries)
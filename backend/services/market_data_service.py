@@ -5,6 +5,7 @@ import datetime
 from massive import RESTClient
 from config import settings
 from services.cache import data_cache
+from services.reference_data_service import reference_data
 from typing import Dict, Any, Optional
 
 class MarketDataService:
@@ -18,7 +19,7 @@ class MarketDataService:
     @classmethod
     def _get_massive_client(cls):
         if cls._massive_client is None and settings.massive_api_key:
-            cls._massive_client = RESTClient(settings.massive_api_key)
+            cls._massive_client = RESTClient(settings.massive_api_key, base=settings.massive_base_url)
         return cls._massive_client
 
     @staticmethod
@@ -190,23 +191,10 @@ class MarketDataService:
     @staticmethod
     def get_stock_info(ticker: str) -> Dict[str, Any]:
         """
-        Get basic stock info. 
-        Tries Massive Reference API first, fails back to yfinance.
+        Get basic stock info from the shared reference-data store.
+        The underlying yfinance `.info` payload is fetched once and reused by FundamentalsService.
         """
-        # Note: Implementing basic yfinance fallback for now to keep it simple, 
-        # as FundamentalsService will handle the heavy lifting for stock details.
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            return {
-                "name": info.get("longName", ticker),
-                "sector": info.get("sector", "Unknown"),
-                "industry": info.get("industry", "Unknown"),
-                "market_cap": info.get("marketCap"),
-                "beta": info.get("beta"),
-                "pe_ratio": info.get("trailingPE"),
-                "forward_pe": info.get("forwardPE"),
-                "dividend_yield": info.get("dividendYield"),
-            }
-        except Exception:
+        reference = reference_data.get(ticker)
+        if reference is None:
             return {"name": ticker}
+        return reference.to_stock_info()
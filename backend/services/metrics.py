@@ -0,0 +1,93 @@
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """
+    In-process counters and latency summaries, labelled like Prometheus series.
+
+    Summaries keep the most recent `window` observations per series for quantiles,
+    plus a running count and sum. Not persisted — a process restart resets them.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self._samples: Dict[str, Dict[LabelKey, Deque[float]]] = defaultdict(dict)
+        self._totals: Dict[str, Dict[LabelKey, Tuple[int, float]]] = defaultdict(dict)
+
+    def increment(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._counters[name][_labels(labels)] += value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            samples = self._samples[name].get(key)
+            if samples is None:
+                samples = self._samples[name][key] = deque(maxlen=self._window)
+            samples.append(value)
+            count, total = self._totals[name].get(key, (0, 0.0))
+            self._totals[name][key] = (count + 1, total + value)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters[name].get(_labels(labels), 0.0)
+
+    def counters(self, name: str) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._counters[name])
+
+    def quantile(self, name: str, q: float, recent: int | None = None, **labels) -> float | None:
+        """Quantile over the recent window (or only its last `recent` samples), or None with no observations."""
+        with self._lock:
+            samples = list(self._samples[name].get(_labels(labels), ()))
+        samples = sorted(samples[-recent:] if recent else samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def count(self, name: str, **labels) -> int:
+        """Observations recorded for a summary series (all time, not just the window)."""
+        with self._lock:
+            return self._totals[name].get(_labels(labels), (0, 0.0))[0]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All series as plain dicts, for the metrics endpoint."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            summaries = {}
+            for name, series in self._samples.items():
+                summaries[name] = []
+                for key, samples in series.items():
+                    ordered = sorted(samples)
+                    count, total = self._totals[name][key]
+                    summaries[name].append({
+                        "labels": dict(key),
+                        "count": count,
+                        "mean": round(total / count, 4) if count else None,
+                        "p50": ordered[len(ordered) // 2] if ordered else None,
+                        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] if ordered else None,
+                    })
+        return {"counters": counters, "summaries": summaries}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+            self._totals.clear()
+
+
+# Global registry
+metrics = MetricsRegistry()
@@ -0,0 +1,137 @@
+import threading
+from collections import defaultdict
+from config import settings
+from services.metrics import metrics
+from typing import Any, Dict, Optional, Tuple
+
+
+class _NodeRoute:
+    """Routing state for one node; `baseline` is the primary's sample count when the state last changed."""
+
+    def __init__(self):
+        self.downgraded = False
+        self.baseline = 0
+        self.calls = 0
+
+
+class ModelRouter:
+    """
+    Picks the OpenAI model for each graph node.
+
+    Each node has a primary model (`node_models`, else the default). When a node
+    has a latency budget and its primary model's recent p95 on that node (as
+    measured by the LLM governor's transport) runs over it, calls downgrade to
+    the fallback model. Every `probe_every`-th downgraded call still goes to the
+    primary, and recovery is decided from those probes alone: once the last
+    `recovery_probes` of them are within budget the node routes back to its
+    primary, judged afresh on samples recorded after that.
+    """
+
+    def __init__(
+        self,
+        node_models: Dict[str, str],
+        default_model: str,
+        fallback_model: Optional[str],
+        latency_budgets_s: Dict[str, float],
+        recent: int = 50,
+        min_samples: int = 5,
+        probe_every: int = 10,
+        recovery_probes: int = 2,
+    ):
+        self._models = node_models
+        self._default = default_model
+        self._fallback = fallback_model
+        self._budgets = latency_budgets_s
+        self._recent = recent
+        self._min_samples = min_samples
+        self._probe_every = probe_every
+        self._recovery_probes = recovery_probes
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _NodeRoute] = defaultdict(_NodeRoute)
+
+    def primary(self, node: str) -> str:
+        return self._models.get(node, self._default)
+
+    @staticmethod
+    def _p95_since(node: str, model: str, baseline: int, limit: int) -> Tuple[int, Optional[float]]:
+        """(samples, p95) over the primary's latencies recorded after `baseline`, at most the last `limit`."""
+        n = min(limit, metrics.count("llm_node_latency_ms", agent=node, model=model) - baseline)
+        if n <= 0:
+            return 0, None
+        return n, metrics.quantile("llm_node_latency_ms", 0.95, recent=n, agent=node, model=model)
+
+    def _downgraded(self, node: str, primary: str) -> bool:
+        """Update and return the node's routing state; callers hold `_lock`."""
+        budget = self._budgets.get(node)
+        route = self._routes[node]
+        if not budget or not self._fallback or self._fallback == primary:
+            route.downgraded = False
+            return False
+        if route.downgraded:
+            # Only probes reach the primary while downgraded, so these are probe latencies
+            n, p95 = self._p95_since(node, primary, route.baseline, self._recovery_probes)
+            recovered = n >= self._recovery_probes and p95 <= budget * 1000
+        else:
+            n, p95 = self._p95_since(node, primary, route.baseline, self._recent)
+            recovered = not (n >= self._min_samples and p95 > budget * 1000)
+        if recovered == route.downgraded:  # state change: later decisions ignore earlier samples
+            route.downgraded = not recovered
+            route.baseline = metrics.count("llm_node_latency_ms", agent=node, model=primary)
+            route.calls = 0
+        return route.downgraded
+
+    def model_for(self, node: str) -> str:
+        primary = self.primary(node)
+        with self._lock:
+            downgraded = self._downgraded(node, primary)
+            if downgraded:
+                self._routes[node].calls += 1
+                probe = self._routes[node].calls % self._probe_every == 0
+        if not downgraded:
+            metrics.increment("model_route", node=node, route="primary")
+            return primary
+        if probe:
+            metrics.increment("model_route", node=node, route="probe")
+            return primary
+        metrics.increment("model_route", node=node, route="fallback")
+        return self._fallback
+
+    def report(self) -> Dict[str, Any]:
+        """Routing state per node, plus latency and token totals per model."""
+        nodes = {}
+        for node in sorted(set(self._models) | set(self._budgets)):
+            primary = self.primary(node)
+            p95 = metrics.quantile("llm_node_latency_ms", 0.95, recent=self._recent, agent=node, model=primary)
+            nodes[node] = {
+                "primary": primary,
+                "fallback": self._fallback,
+                "latency_budget_s": self._budgets.get(node),
+                "primary_p95_ms": round(p95, 1) if p95 is not None else None,
+                "downgraded": self._routes[node].downgraded if node in self._routes else False,
+            }
+        routes: Dict[str, Dict[str, int]] = {}
+        for labels, value in metrics.counters("model_route").items():
+            labels = dict(labels)
+            routes.setdefault(labels["node"], {})[labels["route"]] = int(value)
+        for node, counts in routes.items():
+            nodes.setdefault(node, {"primary": self.primary(node)})["routes"] = counts
+
+        models: Dict[str, Dict[str, Any]] = {}
+        for labels, value in metrics.counters("llm_tokens").items():
+            labels = dict(labels)
+            models.setdefault(labels["model"], {})[f"{labels['kind']}_tokens"] = int(value)
+        for summary in metrics.snapshot()["summaries"].get("llm_latency_ms", []):
+            model = summary["labels"]["model"]
+            models.setdefault(model, {}).update(
+                calls=summary["count"], latency_ms={k: summary[k] for k in ("mean", "p50", "p95")}
+            )
+        return {"nodes": nodes, "models": models}
+
+
+# Global router (routes from settings)
+model_router = ModelRouter(
+    node_models=settings.node_models,
+    default_model=settings.openai_model,
+    fallback_model=settings.llm_fallback_model,
+    latency_budgets_s=settings.node_latency_budgets_s,
+)
@@ -0,0 +1,202 @@
+import json
+import os
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from config import settings
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Universal hashing mod a 32-bit prime keeps every product inside uint64
+_PRIME = np.uint64((1 << 32) - 5)
+
+
+def _shingles(text: str) -> List[int]:
+    """Word unigrams and bigrams, hashed to 32 bits."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return [zlib.crc32(text.strip().lower().encode())]
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return [zlib.crc32(g.encode()) for g in set(grams)]
+
+
+def article_text(article: Dict[str, Any], summary_words: int = 40) -> str:
+    """Headline plus the start of the summary: enough to tell stories apart, short enough to stay cheap."""
+    summary = " ".join((article.get("summary") or "").split()[:summary_words])
+    return f"{article.get('headline', '')} {summary}"
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """Stable identity for the seen-index: the URL, else the normalized headline."""
+    return article.get("url") or "".join(_TOKEN_RE.findall(article.get("headline", "").lower()))
+
+
+class MinHasher:
+    """MinHash signatures for a batch of texts, computed in one vectorized pass."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), num_perm) uint32 signatures."""
+        if not texts:
+            return np.empty((0, self.num_perm), dtype=np.uint32)
+        per_doc = [_shingles(t) for t in texts]
+        hashes = np.fromiter((h for doc in per_doc for h in doc), dtype=np.uint64)
+        starts = np.cumsum([0] + [len(doc) for doc in per_doc[:-1]])
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return np.minimum.reduceat(permuted, starts, axis=1).T.astype(np.uint32)
+
+
+class SeenIndex:
+    """
+    Per-ticker record of articles already fingerprinted: key -> (first_seen, signature).
+    Persisted as JSON under the state directory so repeat fetches skip re-hashing.
+    """
+
+    def __init__(self, directory: Optional[str], max_entries: int = 500, max_age_days: int = 30):
+        self._directory = directory
+        self._max_entries = max_entries
+        self._max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Tuple[float, str]]] = {}
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self._directory, f"{ticker.upper()}.json")
+
+    def _load_locked(self, ticker: str) -> Dict[str, Tuple[float, str]]:
+        entries = self._entries.get(ticker)
+        if entries is None:
+            entries = {}
+            if self._directory and os.path.exists(self._path(ticker)):
+                try:
+                    with open(self._path(ticker)) as f:
+                        entries = {k: tuple(v) for k, v in json.load(f).items()}
+                except (OSError, ValueError) as e:
+                    print(f"[NewsDedup] Could not load seen-index for {ticker}: {e}")
+            self._entries[ticker] = entries
+        return entries
+
+    def lookup(self, ticker: str, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            entries = self._load_locked(ticker)
+            return {
+                k: np.frombuffer(bytes.fromhex(entries[k][1]), dtype=np.uint32)
+                for k in keys if k in entries
+            }
+
+    def add(self, ticker: str, signatures: Dict[str, np.ndarray]):
+        if not signatures:
+            return
+        now = time.time()
+        with self._lock:
+            entries = self._load_locked(ticker)
+            for key, sig in signatures.items():
+                entries[key] = (now, sig.astype(np.uint32).tobytes().hex())
+            # Drop stale stories, then the oldest beyond the cap
+            fresh = sorted(
+                ((k, v) for k, v in entries.items() if now - v[0] < self._max_age),
+                key=lambda kv: kv[1][0],
+            )[-self._max_entries:]
+            self._entries[ticker] = entries = dict(fresh)
+            snapshot = dict(entries)
+        self._save(ticker, snapshot)
+
+    def _save(self, ticker: str, snapshot: Dict[str, Tuple[float, str]]):
+        if not self._directory:
+            return
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            tmp_path = f"{self._path(ticker)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self._path(ticker))
+        except OSError as e:
+            print(f"[NewsDedup] Could not persist seen-index for {ticker}: {e}")
+
+
+class NewsDeduplicator:
+    """
+    Near-duplicate detection for news batches.
+
+    Each article gets a MinHash signature over word shingles of its headline and
+    summary; an LSH index (bands x rows) finds candidate pairs, which count as
+    duplicates when their estimated Jaccard similarity reaches `threshold`.
+    Reworded syndications collapse to the first copy, while headlines that merely
+    share a prefix stay apart. Signatures of articles seen before come from the
+    per-ticker seen-index instead of being recomputed.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.5,
+                 state_dir: Optional[str] = None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self._hasher = MinHasher(num_perm)
+        self._bands = bands
+        self._threshold = threshold
+        self.seen = SeenIndex(state_dir)
+
+    def signatures(self, ticker: str, articles: List[Dict[str, Any]]) -> np.ndarray:
+        keys = [article_key(a) for a in articles]
+        known = self.seen.lookup(ticker, keys)
+        new_idx = [i for i, k in enumerate(keys) if k not in known]
+        new_sigs = self._hasher.signatures([article_text(articles[i]) for i in new_idx])
+
+        sigs = np.empty((len(articles), self._hasher.num_perm), dtype=np.uint32)
+        for i, k in enumerate(keys):
+            if k in known:
+                sigs[i] = known[k]
+        if new_idx:
+            sigs[new_idx] = new_sigs
+        self.seen.add(ticker, {keys[i]: new_sigs[j] for j, i in enumerate(new_idx)})
+        return sigs
+
+    def session(self, ticker: str) -> "DedupSession":
+        """An incremental merge: feed batches as providers answer, get back only new stories."""
+        return DedupSession(self, ticker)
+
+    def dedupe(self, ticker: str, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the first article of every near-duplicate cluster, in input order."""
+        return self.session(ticker).add(articles)
+
+
+class DedupSession:
+    """LSH buckets that persist across batches, so later arrivals dedupe against earlier ones."""
+
+    def __init__(self, dedup: NewsDeduplicator, ticker: str):
+        self._dedup = dedup
+        self._ticker = ticker
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._sigs: List[np.ndarray] = []
+        self.articles: List[Dict[str, Any]] = []
+
+    def add(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge a batch; returns the articles that weren't duplicates."""
+        articles = [a for a in articles if a.get("headline")]
+        if not articles:
+            return []
+        sigs = self._dedup.signatures(self._ticker, articles)
+        bands = sigs.reshape(len(articles), self._dedup._bands, -1)
+
+        added = []
+        for i, article in enumerate(articles):
+            band_keys = [(b, bands[i, b].tobytes()) for b in range(self._dedup._bands)]
+            candidates = {j for key in band_keys for j in self._buckets.get(key, ())}
+            if any(np.mean(sigs[i] == self._sigs[j]) >= self._dedup._threshold for j in candidates):
+                continue
+            for key in band_keys:
+                self._buckets.setdefault(key, []).append(len(self._sigs))
+            self._sigs.append(sigs[i])
+            self.articles.append(article)
+            added.append(article)
+        return added
+
+
+# Global deduplicator; seen-indexes live under the state directory
+news_deduplicator = NewsDeduplicator(state_dir=os.path.join(settings.state_dir, "news_seen"))
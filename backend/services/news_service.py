@@ -1,18 +1,49 @@
+import asyncio
+import time
 import finnhub
-import requests
 from config import settings
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from services.quota_scheduler import quota_scheduler
 from services.rate_limiter import rate_limiter
 from services.cache import data_cache
-from typing import List, Dict, Any
+from services.news_dedup import news_deduplicator
+from services.news_store import news_store
+from services.http_transport import http_transport, run_sync
+from typing import AsyncIterator, List, Dict, Any, Optional
+
+# Articles handed to the agents per ticker (newest first)
+NEWS_VIEW_LIMIT = 25
 
 class NewsService:
     """Aggregates news and sentiment from multiple sources."""
 
+    _shared_finnhub_client: Optional[finnhub.Client] = None
+
     def __init__(self):
-        self.finnhub_client = finnhub.Client(api_key=settings.finnhub_api_key) if settings.finnhub_api_key else None
+        self.finnhub_client = NewsService._get_finnhub_client()
+
+    @classmethod
+    def _get_finnhub_client(cls) -> Optional[finnhub.Client]:
+        # One client (and one keep-alive requests session) for every NewsService instance
+        if cls._shared_finnhub_client is None and settings.finnhub_api_key:
+            cls._shared_finnhub_client = finnhub.Client(api_key=settings.finnhub_api_key)
+            cls._shared_finnhub_client.API_URL = settings.finnhub_base_url
+        return cls._shared_finnhub_client
+
+    @staticmethod
+    async def _acquire(source: str, ticker: str) -> bool:
+        """Wait for provider capacity; log instead of silently skipping when there is none."""
+        if await quota_scheduler.acquire(source):
+            return True
+        print(f"[NewsService] {source} unavailable — skipping for {ticker} "
+              f"(capacity in {rate_limiter.wait_time(source):.0f}s)")
+        return False
 
     def get_company_news(self, ticker: str, days_back: int = 7) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around aget_company_news."""
+        return run_sync(self.aget_company_news(ticker, days_back))
+
+    async def aget_company_news(self, ticker: str, days_back: int = 7) -> List[Dict[str, Any]]:
         """Fetch recent news articles for a ticker. Respects rate limits, uses cache."""
         cache_key = f"news:{ticker}:{days_back}"
         cached = data_cache.get(cache_key)
@@ -20,90 +51,135 @@ class NewsService:
             return cached
 
         articles = []
+        complete = True
+        async for batch in self.astream_company_news(ticker, days_back):
+            if batch is None:
+                complete = False
+            else:
+                articles.extend(batch)
+        articles.sort(key=lambda a: a.get("ts", 0), reverse=True)
+        articles = articles[:NEWS_VIEW_LIMIT]
 
-        # Finnhub news
-        if self.finnhub_client and rate_limiter.can_call("finnhub"):
-            try:
-                rate_limiter.record_call("finnhub")
-                from_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
-                to_date = datetime.now().strftime("%Y-%m-%d")
-                finnhub_news = self.finnhub_client.company_news(ticker, _from=from_date, to=to_date)
-                for article in finnhub_news[:15]:  # Cap at 15
-                    articles.append({
-                        "source": article.get("source", ""),
-                        "headline": article.get("headline", ""),
-                        "summary": article.get("summary", ""),
-                        "datetime": article.get("datetime", 0),
-                        "url": article.get("url", ""),
-                        "provider": "finnhub"
-                    })
-            except Exception as e:
-                print(f"Finnhub news error: {e}")
-
-        # NewsAPI (check rate limit before calling)
-        if settings.newsapi_api_key and rate_limiter.can_call("newsapi"):
-            try:
-                rate_limiter.record_call("newsapi")
-                resp = requests.get(
-                    "https://newsapi.org/v2/everything",
-                    params={
-                        "q": ticker,
-                        "language": "en",
-                        "sortBy": "publishedAt",
-                        "pageSize": 10,
-                        "apiKey": settings.newsapi_api_key,
-                    },
-                    timeout=10,
-                )
-                if resp.ok:
-                    for article in resp.json().get("articles", []):
-                        articles.append({
-                            "source": article.get("source", {}).get("name", ""),
-                            "headline": article.get("title", ""),
-                            "summary": article.get("description", ""),
-                            "datetime": article.get("publishedAt", ""),
-                            "url": article.get("url", ""),
-                            "provider": "newsapi"
-                        })
-            except Exception as e:
-                print(f"NewsAPI error: {e}")
-
-        # Deduplicate articles
-        unique_articles = []
-        seen_headlines = set()
-
-        for article in articles:
-            # Normalize headline for dedup: lowercase, alphanumeric only, first 30 chars
-            import re
-            headline = article.get("headline", "")
-            if not headline:
-                continue
-                
-            # Create a simple hash/fingerprint
-            normalized = re.sub(r'[^a-z0-9]', '', headline.lower())[:30]
-            
-            # Also consider date to avoid deduping same headline from different days (unlikely but possible)
-            # But usually same headline = same news.
-            if normalized not in seen_headlines:
-                seen_headlines.add(normalized)
-                unique_articles.append(article)
-        
-        data_cache.set(cache_key, unique_articles)
-        return unique_articles
+        # A provider that missed its deadline shouldn't hide its articles for the whole cache TTL
+        if complete:
+            data_cache.set(cache_key, articles)
+        return articles
+
+    async def astream_company_news(self, ticker: str, days_back: int = 7) -> AsyncIterator[Optional[List[Dict[str, Any]]]]:
+        """
+        Yield the stored articles for the window first, then each provider's new
+        (de-duplicated) articles as soon as it answers. Providers are queried
+        concurrently and only for articles newer than the latest stored one.
+        A provider that fails or misses its deadline yields None, so callers
+        never wait on the slowest source.
+        """
+        since = time.time() - days_back * 86400
+        session = news_deduplicator.session(ticker)
+        stored = news_store.window(ticker, since)
+        if stored:
+            yield session.add(stored)
+
+        providers = []
+        if self.finnhub_client:
+            providers.append(("finnhub", self._fetch_finnhub, settings.news_finnhub_deadline_s))
+        if settings.newsapi_api_key:
+            providers.append(("newsapi", self._fetch_newsapi, settings.news_newsapi_deadline_s))
+
+        async def refresh(name, fetch, deadline):
+            fetch_from = news_store.fetch_since(ticker, name, since)
+            batch = await NewsService._with_deadline(name, fetch(ticker, fetch_from), deadline)
+            if batch is None:
+                return None
+            return news_store.append(ticker, name, batch, fetch_from)
+
+        for next_result in asyncio.as_completed([refresh(*p) for p in providers]):
+            added = await next_result
+            # Collapse reworded syndications of the same story, across providers too
+            yield None if added is None else session.add([a for a in added if a["ts"] >= since])
+
+    @staticmethod
+    async def _with_deadline(name: str, coro, deadline: float) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return await asyncio.wait_for(coro, timeout=deadline)
+        except asyncio.TimeoutError:
+            print(f"[NewsService] {name} missed its {deadline:.1f}s deadline — continuing without it")
+            return None
+
+    async def _fetch_finnhub(self, ticker: str, since: float) -> Optional[List[Dict[str, Any]]]:
+        """Articles published since `since` (Finnhub filters by day). None if unavailable."""
+        if not await NewsService._acquire("finnhub", ticker):
+            return None
+        try:
+            from_date = datetime.fromtimestamp(since).strftime("%Y-%m-%d")
+            to_date = datetime.now().strftime("%Y-%m-%d")
+            finnhub_news = await asyncio.to_thread(
+                self.finnhub_client.company_news, ticker, _from=from_date, to=to_date
+            )
+            return [
+                {
+                    "source": article.get("source", ""),
+                    "headline": article.get("headline", ""),
+                    "summary": article.get("summary", ""),
+                    "datetime": article.get("datetime", 0),
+                    "url": article.get("url", ""),
+                    "provider": "finnhub"
+                }
+                for article in finnhub_news[:15]  # Cap at 15
+            ]
+        except Exception as e:
+            print(f"Finnhub news error: {e}")
+            return None
+
+    async def _fetch_newsapi(self, ticker: str, since: float) -> Optional[List[Dict[str, Any]]]:
+        """Articles published since `since`. None if unavailable."""
+        if not await NewsService._acquire("newsapi", ticker):
+            return None
+        try:
+            resp = await http_transport.get(
+                f"{settings.newsapi_base_url}/v2/everything",
+                params={
+                    "q": ticker,
+                    "language": "en",
+                    "sortBy": "publishedAt",
+                    "pageSize": 10,
+                    "from": datetime.fromtimestamp(since, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+                    "apiKey": settings.newsapi_api_key,
+                },
+                timeout_budget=settings.news_newsapi_deadline_s,
+            )
+            if not resp.is_success:
+                return None
+            return [
+                {
+                    "source": article.get("source", {}).get("name", ""),
+                    "headline": article.get("title", ""),
+                    "summary": article.get("description", ""),
+                    "datetime": article.get("publishedAt", ""),
+                    "url": article.get("url", ""),
+                    "provider": "newsapi"
+                }
+                for article in resp.json().get("articles", [])
+            ]
+        except Exception as e:
+            print(f"NewsAPI error: {e}")
+            return None
 
     def get_sentiment_score(self, ticker: str) -> Dict[str, Any]:
+        """Synchronous wrapper around aget_sentiment_score."""
+        return run_sync(self.aget_sentiment_score(ticker))
+
+    async def aget_sentiment_score(self, ticker: str) -> Dict[str, Any]:
         """Get aggregate sentiment from Finnhub. Cached, rate-limited."""
         cache_key = f"sentiment:{ticker}"
         cached = data_cache.get(cache_key)
         if cached is not None:
             return cached
             
-        if not self.finnhub_client or not rate_limiter.can_call("finnhub"):
+        if not self.finnhub_client or not await NewsService._acquire("finnhub", ticker):
             return {"score": None, "buzz": None}
             
         try:
-            rate_limiter.record_call("finnhub")
-            data = self.finnhub_client.news_sentiment(ticker)
+            data = await asyncio.to_thread(self.finnhub_client.news_sentiment, ticker)
             sentiment = data.get("sentiment", {})
             buzz = data.get("buzz", {})
             result = {
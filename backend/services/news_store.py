@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+from config import settings
+from services.news_dedup import article_key
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def published_ts(article: Dict[str, Any]) -> float:
+    """Publish time as epoch seconds (Finnhub sends epoch ints, NewsAPI ISO-8601 strings)."""
+    value = article.get("datetime")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return 0.0
+
+
+class _TickerLog:
+    """In-memory index over one ticker's log: articles sorted by publish time, keys for dedup."""
+
+    def __init__(self):
+        self.by_time: List[Tuple[float, int]] = []
+        self.articles: List[Dict[str, Any]] = []
+        self.keys: set = set()
+        # provider -> (earliest publish time covered by fetches, latest stored publish time)
+        self.coverage: Dict[str, Dict[str, float]] = {}
+
+
+class NewsStore:
+    """
+    Append-only per-ticker article store.
+
+    Each ticker is a JSONL file of articles (plus coverage records per provider),
+    indexed in memory by publish time and fingerprint. Refreshes ask providers
+    only for articles newer than the latest one stored, and the N-day view is
+    read back from the store. Entries past the retention are dropped when the
+    log is compacted on load.
+    """
+
+    def __init__(self, directory: Optional[str], retention_days: int = 30):
+        self._directory = directory
+        self._retention = retention_days * 86400
+        self._lock = threading.Lock()
+        self._logs: Dict[str, _TickerLog] = {}
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self._directory, f"{ticker.upper()}.jsonl")
+
+    def _log_locked(self, ticker: str) -> _TickerLog:
+        log = self._logs.get(ticker)
+        if log is not None:
+            return log
+        log = self._logs[ticker] = _TickerLog()
+        if not self._directory or not os.path.exists(self._path(ticker)):
+            return log
+
+        cutoff = time.time() - self._retention
+        stale = 0
+        try:
+            with open(self._path(ticker)) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        stale += 1  # torn write from a crash
+                        continue
+                    if "coverage" in record:
+                        stale += record["provider"] in log.coverage  # superseded
+                        log.coverage[record["provider"]] = record["coverage"]
+                    elif record.get("ts", 0) >= cutoff:
+                        self._index_locked(log, record)
+                    else:
+                        stale += 1
+        except OSError as e:
+            print(f"[NewsStore] Could not load {ticker}: {e}")
+            return log
+        if stale > len(log.articles):
+            self._compact_locked(ticker, log)
+        return log
+
+    @staticmethod
+    def _index_locked(log: _TickerLog, record: Dict[str, Any]):
+        insort(log.by_time, (record["ts"], len(log.articles)))
+        log.articles.append(record)
+        log.keys.add(record["key"])
+
+    def _write_locked(self, ticker: str, records: List[Dict[str, Any]], mode: str = "a"):
+        if not self._directory or not records:
+            return
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            path = self._path(ticker)
+            target = f"{path}.tmp" if mode == "w" else path
+            with open(target, mode) as f:
+                f.writelines(json.dumps(r) + "\n" for r in records)
+            if mode == "w":
+                os.replace(target, path)
+        except OSError as e:
+            print(f"[NewsStore] Could not write {ticker}: {e}")
+
+    def _compact_locked(self, ticker: str, log: _TickerLog):
+        records = [{"provider": p, "coverage": c} for p, c in log.coverage.items()]
+        records += [log.articles[i] for _, i in log.by_time]
+        self._write_locked(ticker, records, mode="w")
+
+    def fetch_since(self, ticker: str, provider: str, since: float) -> float:
+        """
+        Earliest publish time a provider must be asked for so the store covers
+        everything from `since` on: just past the latest stored article, unless
+        earlier history was never fetched.
+        """
+        with self._lock:
+            coverage = self._log_locked(ticker).coverage.get(provider)
+        if coverage is None or coverage["from"] > since:
+            return since
+        return max(since, coverage["latest"])
+
+    def append(self, ticker: str, provider: str, articles: List[Dict[str, Any]], fetched_from: float) -> List[Dict[str, Any]]:
+        """Store articles not seen before; returns them. Records what range the fetch covered."""
+        with self._lock:
+            log = self._log_locked(ticker)
+            added = []
+            for article in articles:
+                key = article_key(article)
+                if not key or key in log.keys:
+                    continue
+                record = {**article, "ts": published_ts(article), "key": key}
+                self._index_locked(log, record)
+                added.append(record)
+
+            previous = log.coverage.get(provider)
+            latest = max([previous["latest"] if previous else fetched_from] + [r["ts"] for r in added])
+            covered_from = min(previous["from"], fetched_from) if previous else fetched_from
+            log.coverage[provider] = {"from": covered_from, "latest": latest}
+            self._write_locked(ticker, added + [{"provider": provider, "coverage": log.coverage[provider]}])
+        return added
+
+    def window(self, ticker: str, since: float) -> List[Dict[str, Any]]:
+        """Stored articles published at or after `since`, newest first."""
+        with self._lock:
+            log = self._log_locked(ticker)
+            start = bisect_left(log.by_time, (since, -1))
+            return [log.articles[i] for _, i in reversed(log.by_time[start:])]
+
+
+# Global store; per-ticker logs live under the state directory
+news_store = NewsStore(os.path.join(settings.state_dir, "news"))
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import threading
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage, SystemMessage
+from config import settings
+from prompts.news_summary import NEWS_SUMMARY_SYSTEM_PROMPT, NEWS_SUMMARY_USER_TEMPLATE
+from services.llm_governor import llm_clients
+from services.news_dedup import article_key
+from typing import Any, Dict, List, Optional
+
+
+class NewsSummaryService:
+    """
+    Condenses news articles into one-sentence, fact-dense digests for the sentiment agent.
+
+    - Several articles go out per LLM call; batches run concurrently.
+    - Digests are cached by article fingerprint in an append-only JSONL file, so each
+      story is summarized once across all users and requests (and restarts).
+    - Failures never block analysis: articles without a digest fall back to the headline.
+    """
+
+    def __init__(self, path: Optional[str], batch_size: int = 8, summary_chars: int = 600):
+        self._path = path
+        self._batch_size = batch_size
+        self._summary_chars = summary_chars
+        self._lock = threading.Lock()
+        self._digests: Optional[Dict[str, str]] = None
+
+    def _load_locked(self) -> Dict[str, str]:
+        if self._digests is None:
+            self._digests = {}
+            if self._path and os.path.exists(self._path):
+                try:
+                    with open(self._path) as f:
+                        for line in f:
+                            try:
+                                record = json.loads(line)
+                                self._digests[record["key"]] = record["digest"]
+                            except (ValueError, KeyError):
+                                continue
+                except OSError as e:
+                    print(f"[NewsSummary] Could not load digest cache: {e}")
+        return self._digests
+
+    def cached(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._load_locked().get(key)
+
+    def _store(self, digests: Dict[str, str]):
+        if not digests:
+            return
+        with self._lock:
+            self._load_locked().update(digests)
+            if not self._path:
+                return
+            try:
+                os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+                with open(self._path, "a") as f:
+                    f.writelines(json.dumps({"key": k, "digest": d}) + "\n" for k, d in digests.items())
+            except OSError as e:
+                print(f"[NewsSummary] Could not persist digests: {e}")
+
+    async def attach(self, articles: List[Dict[str, Any]], limit: int = 15) -> List[Dict[str, Any]]:
+        """Copies of the first `limit` articles with a "digest" field where one is available."""
+        head = articles[:limit]
+        try:
+            digests = await self.summarize(head)
+        except Exception as e:
+            print(f"[NewsSummary] Summarization failed, using headlines: {e}")
+            digests = {}
+        enriched = [
+            {**a, "digest": digests[article_key(a)]} if article_key(a) in digests else a
+            for a in head
+        ]
+        return enriched + articles[limit:]
+
+    async def summarize(self, articles: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Digest per article key; only uncached articles reach the LLM."""
+        digests: Dict[str, str] = {}
+        missing: Dict[str, Dict[str, Any]] = {}
+        for article in articles:
+            key = article_key(article)
+            if not key:
+                continue
+            cached = self.cached(key)
+            if cached is not None:
+                digests[key] = cached
+            elif article.get("headline"):
+                missing[key] = article
+
+        if missing:
+            items = list(missing.items())
+            batches = [items[i:i + self._batch_size] for i in range(0, len(items), self._batch_size)]
+            results = await asyncio.gather(*(self._summarize_batch(b) for b in batches), return_exceptions=True)
+            fresh: Dict[str, str] = {}
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"[NewsSummary] Batch failed: {result}")
+                else:
+                    fresh.update(result)
+            self._store(fresh)
+            digests.update(fresh)
+        return digests
+
+    async def _summarize_batch(self, batch: List[tuple]) -> Dict[str, str]:
+        lines = []
+        for i, (_, article) in enumerate(batch, 1):
+            text = (article.get("summary") or "")[:self._summary_chars]
+            lines.append(f"[{i}] {article.get('headline', '')}\n{text}".strip())
+
+        llm = ChatOpenAI(
+            model=settings.news_summary_model,
+            temperature=0,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            model_kwargs={"response_format": {"type": "json_object"}},
+            **llm_clients.for_agent("news_summary"),
+        )
+        response = await llm.ainvoke([
+            SystemMessage(content=NEWS_SUMMARY_SYSTEM_PROMPT),
+            HumanMessage(content=NEWS_SUMMARY_USER_TEMPLATE.format(articles="\n\n".join(lines))),
+        ])
+
+        digests: Dict[str, str] = {}
+        for entry in json.loads(response.content).get("summaries", []):
+            try:
+                index = int(entry["id"]) - 1
+                summary = str(entry["summary"]).strip()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= index < len(batch) and summary:
+                digests[batch[index][0]] = summary
+        return digests
+
+
+# Global digest cache shared by every request
+news_summaries = NewsSummaryService(os.path.join(settings.state_dir, "news_digests.jsonl"))
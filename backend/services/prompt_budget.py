@@ -0,0 +1,145 @@
+import math
+import re
+import time
+from config import settings
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+from services.alias_matcher import AliasMatcher, tokenize
+from services.metrics import metrics
+from services.news_store import published_ts
+from services.tokens import count_tokens, fit_lines
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# (applies from, divisor, suffix)
+_SUFFIXES = ((1e12, 1e12, "T"), (1e9, 1e9, "B"), (1e6, 1e6, "M"), (1e4, 1e3, "K"))
+
+
+def compact_number(value: Any, sig: int = 4) -> str:
+    """
+    Prompt-friendly number: `sig` significant digits, K/M/B/T above ten thousand.
+    63.12345678 -> "63.12", 391035000000 -> "391B", None -> "N/A". Non-numbers pass through.
+    """
+    if value is None:
+        return "N/A"
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return "N/A"
+    for threshold, divisor, suffix in _SUFFIXES:
+        if abs(value) >= threshold:
+            return f"{value / divisor:.{sig}g}{suffix}"
+    if isinstance(value, int):
+        return str(value)
+    text = f"{value:.{sig}g}"
+    if "e" in text:  # tiny magnitudes: fixed notation reads better than 1.2e-05
+        text = f"{value:.{sig + 2}f}".rstrip("0").rstrip(".")
+    return text
+
+
+def compact_fields(values: Dict[str, Any], sig: int = 4) -> Dict[str, str]:
+    return {key: compact_number(value, sig) for key, value in values.items()}
+
+
+# Leading words of company names too generic to identify it in a headline ("The Trade Desk")
+_NAME_STOPWORDS = {"the", "a", "an", "first", "american", "united", "general", "national", "international", "global"}
+
+
+def _mentions(ticker: str, company_name: Optional[str]) -> Callable[[str], bool]:
+    """
+    Headline predicate: does it name the company? Whole tokens only. The ticker
+    must appear in capitals, and a one-letter ticker (F, T, V) only counts as
+    a cashtag or in parentheses, since "A" or "T" in a title-case headline says nothing.
+    """
+    cashtag = re.compile(rf"[$(]{re.escape(ticker.upper())}\b")
+    symbol = AliasMatcher({ticker: ticker}, strict_case_len=len(ticker)) if len(ticker) > 1 else None
+    # "Apple Inc." -> "Apple", "The Walt Disney Company" -> "Walt"
+    words = [w for w in tokenize(company_name or "") if len(w) > 1 and w.lower() not in _NAME_STOPWORDS]
+    name = AliasMatcher({words[0]: words[0]}) if words else None
+
+    def mentions(headline: str) -> bool:
+        return bool(cashtag.search(headline)
+                    or (symbol is not None and symbol.first(headline))
+                    or (name is not None and name.first(headline)))
+    return mentions
+
+
+def rank_headlines(articles: List[Dict[str, Any]], ticker: str, company_name: Optional[str] = None,
+                   half_life_hours: float = 48, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Articles ordered by usefulness to the sentiment prompt: recency (exponential
+    decay), a boost when the headline names the company, and one for a digest.
+    """
+    now = now or time.time()
+    mentions = _mentions(ticker, company_name)
+
+    def score(article: Dict[str, Any]) -> float:
+        age_hours = max(0.0, now - published_ts(article)) / 3600
+        return (
+            0.5 ** (age_hours / half_life_hours)
+            + (0.5 if mentions(article.get("headline") or "") else 0.0)
+            + (0.3 if article.get("digest") else 0.0)
+        )
+
+    return sorted(articles, key=score, reverse=True)
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Leading lines (then characters) of `text` within `budget` tokens."""
+    if count_tokens(text) <= budget:
+        return text
+    lines = text.split("\n")
+    fitted = fit_lines(lines, budget)
+    kept = "\n".join(fitted)
+    # Fill what's left with the start of the next line rather than dropping it whole
+    if len(fitted) < len(lines) and count_tokens(kept) < budget - 8:
+        kept += "\n" + lines[len(fitted)]
+    while kept and count_tokens(kept) > budget:
+        kept = kept[: int(len(kept) * 0.9)]
+    return kept.rstrip() + " …"
+
+
+def count_message_tokens(messages: Iterable[BaseMessage]) -> int:
+    # ~4 tokens of chat framing per message
+    return sum(count_tokens(str(m.content)) + 4 for m in messages)
+
+
+class PromptBudget:
+    """
+    Per-agent prompt token ceilings, measured with the local tokenizer before a
+    request is sent. Over the ceiling, the named shrinkable variables (free text
+    such as upstream reports) are trimmed in proportion to their size.
+    """
+
+    def __init__(self, ceilings: Dict[str, int]):
+        self._ceilings = ceilings
+
+    def ceiling(self, agent: str) -> Optional[int]:
+        return self._ceilings.get(agent)
+
+    def render(self, agent: str, prompt: ChatPromptTemplate, variables: Dict[str, Any],
+               shrink: Iterable[str] = ()) -> List[BaseMessage]:
+        messages = prompt.format_messages(**variables)
+        used = count_message_tokens(messages)
+        ceiling = self.ceiling(agent)
+
+        if ceiling and used > ceiling:
+            sizes = {key: count_tokens(str(variables.get(key, ""))) for key in shrink}
+            shrinkable = sum(sizes.values())
+            if shrinkable:
+                over = used - ceiling
+                trimmed = dict(variables)
+                for key, size in sizes.items():
+                    trimmed[key] = truncate_tokens(str(variables[key]), max(0, size - math.ceil(over * size / shrinkable)))
+                messages = prompt.format_messages(**trimmed)
+                used = count_message_tokens(messages)
+                metrics.increment("prompt_trimmed", agent=agent)
+            if used > ceiling:
+                metrics.increment("prompt_over_ceiling", agent=agent)
+                print(f"[PromptBudget] {agent} prompt is {used} tokens, over its {ceiling} ceiling")
+
+        metrics.observe("prompt_tokens", used, agent=agent)
+        return messages
+
+
+# Global budget (ceilings from settings)
+prompt_budget = PromptBudget(settings.prompt_token_ceilings)
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, time as dtime, timedelta, timezone
+from config import settings
+from services.rate_limiter import PERSISTED_WINDOW_SECONDS, RateLimiter, rate_limiter
+from typing import Any, Deque, Dict, Iterator, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+    MARKET_TZ = ZoneInfo("America/New_York")
+except Exception:  # no tz database installed
+    MARKET_TZ = timezone(timedelta(hours=-5))
+
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+# Priority classes, highest first
+INTERACTIVE = "interactive"  # a user waiting on /api/analyze
+BACKGROUND = "background"    # default for anything else (refreshes, warmers)
+BATCH = "batch"              # scripts and bulk runs
+PRIORITIES = (INTERACTIVE, BACKGROUND, BATCH)
+
+_priority: ContextVar[str] = ContextVar("quota_priority", default=BACKGROUND)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: str) -> Iterator[None]:
+    """Run a block (and the tasks/threads it spawns) under a quota priority class."""
+    if level not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{level}'")
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class QuotaScheduler:
+    """
+    Admission control for scarce daily provider quotas (FMP, NewsAPI).
+
+    - Interactive calls may use the whole remaining quota.
+    - Background calls must leave `interactive_reserve` of the quota untouched,
+      batch calls `batch_reserve`.
+    - Non-interactive consumption is paced across the trading day: by a given
+      time only that fraction of the unreserved quota (plus a small burst) may
+      have been used since the session opened. From the close until the next
+      open the full surplus is available.
+
+    Sources with short windows (e.g. Finnhub per-minute) aren't scarce and pass
+    straight through to the rate limiter, which waits for capacity.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        interactive_reserve: float = 0.3,
+        batch_reserve: float = 0.5,
+        pace_burst: int = 5,
+    ):
+        self._limiter = limiter
+        self._reserves = {INTERACTIVE: 0.0, BACKGROUND: interactive_reserve, BATCH: max(batch_reserve, interactive_reserve)}
+        self._pace_burst = pace_burst
+        self._lock = threading.Lock()
+        # (source, priority) -> timestamps of admitted / denied calls, for reporting
+        self._admitted: Dict[str, Deque[float]] = {}
+        self._denied: Dict[str, Deque[float]] = {}
+
+    def _is_scarce(self, source: str) -> bool:
+        return self._limiter.limit(source)[1] >= PERSISTED_WINDOW_SECONDS
+
+    @staticmethod
+    def session_open(now: Optional[datetime] = None) -> datetime:
+        """Open of the current session: today's once the bell has rung, else the previous weekday's."""
+        local = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+        day = local.date()
+        while True:
+            open_dt = datetime.combine(day, MARKET_OPEN, tzinfo=local.tzinfo)
+            if day.weekday() < 5 and open_dt <= local:
+                return open_dt
+            day -= timedelta(days=1)
+
+    @classmethod
+    def trading_day_elapsed(cls, now: Optional[datetime] = None) -> float:
+        """
+        Fraction of the current session that has passed. From the close until the
+        next open (overnight, pre-open, weekends) it's the previous session's
+        post-close: 1.0.
+        """
+        local = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+        open_dt = cls.session_open(local)
+        close_dt = datetime.combine(open_dt.date(), MARKET_CLOSE, tzinfo=open_dt.tzinfo)
+        if local >= close_dt:
+            return 1.0
+        return (local - open_dt) / (close_dt - open_dt)
+
+    def _headroom(self, source: str, level: str, now: Optional[datetime] = None) -> int:
+        """Quota slots that must stay free after a call at this priority."""
+        if level == INTERACTIVE:
+            return 0
+        max_calls, _ = self._limiter.limit(source)
+        reserve = int(max_calls * self._reserves[level])
+        paced = int((max_calls - reserve) * self.trading_day_elapsed(now) + self._pace_burst)
+        # Pacing counts calls since the session opened; earlier ones still in the quota
+        # window only count against the reserve
+        since_open = ((now or datetime.now(timezone.utc)) - self.session_open(now)).total_seconds()
+        before_open = self._limiter.usage(source)["used"] - self._limiter.recent_calls(source, since_open)
+        return max(reserve, max_calls - paced - before_open)
+
+    def _record(self, book: Dict[str, Deque[float]], source: str, level: str):
+        book.setdefault(f"{source}:{level}", deque(maxlen=10_000)).append(time.time())
+
+    async def acquire(self, source: str, cost: int = 1, level: Optional[str] = None) -> bool:
+        """Admit `cost` calls for `source` at the caller's priority; False means skip the provider."""
+        level = level or current_priority()
+        if not self._is_scarce(source):
+            return await self._limiter.acquire(source, cost=cost)
+
+        # Waiting can't help a daily quota, so admission is decided immediately.
+        # The headroom check and the record are one atomic step in the limiter's store.
+        admitted = self._limiter.try_acquire(source, cost, headroom=self._headroom(source, level))
+        with self._lock:
+            self._record(self._admitted if admitted else self._denied, source, level)
+        if not admitted:
+            print(f"[QuotaScheduler] {source} call denied for {level} work (budget reserved or paced)")
+        return admitted
+
+    def projected_exhaustion(self, source: str, rate_window_s: float = 3600) -> Optional[str]:
+        """When the quota runs out at the recent call rate (ISO time), or None if it won't today."""
+        remaining = self._limiter.usage(source)["remaining"]
+        if remaining <= 0:
+            return datetime.now(timezone.utc).isoformat()
+        recent = self._limiter.recent_calls(source, rate_window_s)
+        if not recent:
+            return None
+        seconds_left = remaining / (recent / rate_window_s)
+        exhausted_at = datetime.now(timezone.utc) + timedelta(seconds=seconds_left)
+        end_of_day = datetime.combine(
+            datetime.now(MARKET_TZ).date() + timedelta(days=1), dtime(0), tzinfo=MARKET_TZ
+        )
+        return exhausted_at.isoformat() if exhausted_at < end_of_day else None
+
+    def report(self) -> Dict[str, Any]:
+        """Per-source quota usage, reservations and projected exhaustion."""
+        cutoff = time.time() - 86400
+        elapsed = self.trading_day_elapsed()
+        sources = {}
+        for source in ("fmp", "newsapi"):
+            usage = self._limiter.usage(source)
+            with self._lock:
+                by_priority = {
+                    level: {
+                        "admitted": sum(1 for t in self._admitted.get(f"{source}:{level}", ()) if t > cutoff),
+                        "denied": sum(1 for t in self._denied.get(f"{source}:{level}", ()) if t > cutoff),
+                    }
+                    for level in PRIORITIES
+                }
+            sources[source] = {
+                **usage,
+                "reserved_for_interactive": int(usage["limit"] * self._reserves[BACKGROUND]),
+                "background_allowance_now": usage["limit"] - self._headroom(source, BACKGROUND),
+                "by_priority": by_priority,
+                "projected_exhaustion": self.projected_exhaustion(source),
+            }
+        return {"trading_day_elapsed": round(elapsed, 3), "sources": sources}
+
+
+# Global scheduler over the shared provider rate limiter
+quota_scheduler = QuotaScheduler(
+    rate_limiter,
+    interactive_reserve=settings.quota_interactive_reserve,
+    batch_reserve=settings.quota_batch_reserve,
+    pace_burst=settings.quota_pace_burst,
+)
@@ -0,0 +1,152 @@
+import asyncio
+import time
+import weakref
+import robin_stocks.robinhood as rh
+from massive import RESTClient
+from config import settings
+from services.cache import SimpleCache
+from typing import Dict, Any, Iterable, List, Optional
+
+
+class _LoopState:
+    """Per-event-loop batching state (futures can only be awaited on their own loop)."""
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.pending: List[str] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class QuoteService:
+    """
+    Live last-trade quotes.
+
+    - Micro-cache: last-trade prices are reused for a sub-second TTL.
+    - Coalescing: concurrent callers asking for the same symbol share one in-flight lookup.
+    - Batching: symbols requested within a short window go out as one provider call
+      (Massive snapshot, falling back to Robinhood latest prices).
+    """
+
+    _massive_client: Optional[RESTClient] = None
+
+    def __init__(self, ttl_seconds: float = 0.5, batch_window_ms: float = 5, max_batch: int = 250):
+        self._cache = SimpleCache(ttl_seconds=ttl_seconds)
+        self._batch_window = batch_window_ms / 1000
+        self._max_batch = max_batch
+        self._loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def _get_massive_client(cls) -> Optional[RESTClient]:
+        if cls._massive_client is None and settings.massive_api_key:
+            cls._massive_client = RESTClient(settings.massive_api_key, base=settings.massive_base_url)
+        return cls._massive_client
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = self._loop_states[loop] = _LoopState()
+        return state
+
+    async def get_quotes(self, symbols: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Return {symbol: quote or None} for every requested symbol."""
+        wanted = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        state = self._state()
+        loop = asyncio.get_running_loop()
+
+        for symbol in wanted:
+            cached = self._cache.get(symbol)
+            if cached is not None:
+                results[symbol] = cached
+                continue
+            future = state.in_flight.get(symbol)
+            if future is None:
+                future = loop.create_future()
+                state.in_flight[symbol] = future
+                state.pending.append(symbol)
+            waiting[symbol] = future
+
+        if state.pending:
+            if len(state.pending) >= self._max_batch:
+                self._flush(state)
+            elif state.flush_handle is None:
+                state.flush_handle = loop.call_later(self._batch_window, self._flush, state)
+
+        for symbol, future in waiting.items():
+            results[symbol] = await asyncio.shield(future)
+        return {symbol: results.get(symbol) for symbol in wanted}
+
+    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return (await self.get_quotes([symbol])).get(symbol.upper())
+
+    def _flush(self, state: _LoopState):
+        if state.flush_handle is not None:
+            state.flush_handle.cancel()
+            state.flush_handle = None
+        batch, state.pending = state.pending[:self._max_batch], state.pending[self._max_batch:]
+        if state.pending:
+            state.flush_handle = asyncio.get_running_loop().call_later(self._batch_window, self._flush, state)
+        if batch:
+            asyncio.get_running_loop().create_task(self._resolve_batch(state, batch))
+
+    async def _resolve_batch(self, state: _LoopState, batch: List[str]):
+        try:
+            quotes = await asyncio.to_thread(self._fetch_batch, batch)
+        except Exception as e:
+            print(f"[QuoteService] Batch quote lookup failed: {e}")
+            quotes = {}
+
+        for symbol in batch:
+            quote = quotes.get(symbol)
+            if quote is not None:
+                self._cache.set(symbol, quote)
+            future = state.in_flight.pop(symbol, None)
+            if future is not None and not future.done():
+                future.set_result(quote)
+
+    def _fetch_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """One provider round-trip for the whole batch."""
+        quotes: Dict[str, Dict[str, Any]] = {}
+
+        client = QuoteService._get_massive_client()
+        if client:
+            try:
+                for snap in client.get_snapshot_all("stocks", tickers=symbols):
+                    trade = snap.last_trade
+                    if snap.ticker and trade and trade.price:
+                        quotes[snap.ticker] = {
+                            "symbol": snap.ticker,
+                            "price": float(trade.price),
+                            "size": trade.size,
+                            "timestamp": trade.sip_timestamp,
+                            "change_percent": snap.todays_change_percent,
+                            "provider": "massive",
+                        }
+            except Exception as e:
+                print(f"[QuoteService] Massive snapshot failed: {e}")
+
+        missing = [s for s in symbols if s not in quotes]
+        if missing:
+            try:
+                prices = rh.stocks.get_latest_price(missing, includeExtendedHours=True) or []
+                now_ns = time.time_ns()
+                for symbol, price in zip(missing, prices):
+                    if price:
+                        quotes[symbol] = {
+                            "symbol": symbol,
+                            "price": float(price),
+                            "size": None,
+                            "timestamp": now_ns,
+                            "change_percent": None,
+                            "provider": "robinhood",
+                        }
+            except Exception as e:
+                print(f"[QuoteService] Robinhood latest price failed: {e}")
+
+        return quotes
+
+
+# Global quote service (500 ms last-trade micro-cache)
+quote_service = QuoteService(ttl_seconds=settings.quote_cache_ttl_seconds)
@@ -1,26 +1,332 @@
+import asyncio
+import json
+import mmap
+import os
+import struct
+import threading
 import time
-from collections import defaultdict
-from typing import Dict, List, Tuple
+from collections import deque
+from config import settings
+from typing import Deque, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, the mmap backend falls back to local state
+    fcntl = None
+
+# Windows at least this long are upstream daily quotas and survive restarts
+PERSISTED_WINDOW_SECONDS = 3600
+
+
+def _wait_for(oldest_needed: Optional[float], window: int, now: float) -> float:
+    if oldest_needed is None:
+        return 0.0
+    return max(0.0, oldest_needed + window - now)
+
+
+class LocalWindowStore:
+    """In-process timestamp windows: one deque per source, capped at max_calls."""
+
+    shared = False
 
-class RateLimiter:
-    """Simple sliding-window rate limiter per API source."""
     def __init__(self):
-        self._calls: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Deque[float]] = {}
+
+    def _window(self, source: str, max_calls: int) -> Deque[float]:
+        calls = self._calls.get(source)
+        if calls is None or calls.maxlen != max_calls:
+            calls = self._calls[source] = deque(calls or (), maxlen=max_calls)
+        return calls
+
+    def check(self, source: str, max_calls: int, window: int, need: int, record: int, now: float) -> float:
+        """
+        Seconds until `need` slots are free (0 if now). When they are free, `record`
+        calls are stored at `now` in the same locked step.
+        """
+        with self._lock:
+            calls = self._window(source, max_calls)
+            free = max_calls - len(calls)
+            # The (need - free)th oldest call must leave the window before we fit
+            wait = _wait_for(calls[need - free - 1] if need > free else None, window, now)
+            if wait == 0 and record:
+                calls.extend([now] * record)
+            return wait
+
+    def record(self, source: str, max_calls: int, now: float):
+        with self._lock:
+            self._window(source, max_calls).append(now)
+
+    def timestamps(self, source: str, max_calls: int) -> List[float]:
+        with self._lock:
+            return list(self._window(source, max_calls))
+
+    def load(self, source: str, max_calls: int, timestamps: List[float]):
+        with self._lock:
+            self._window(source, max_calls).extend(sorted(timestamps))
+
+
+class _RingFile:
+    """
+    A fixed-size ring of float64 timestamps in a memory-mapped file.
+
+    Layout: magic, capacity, head, count (little-endian u32s) then `capacity` slots.
+    Callers hold the file lock while touching it.
+    """
+
+    HEADER = struct.Struct("<4sIII")
+    MAGIC = b"RLW1"
+    SLOT = struct.Struct("<d")
+
+    def __init__(self, path: str, capacity: int):
+        self.capacity = capacity
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = self.HEADER.size + capacity * self.SLOT.size
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            carried = self._read_existing()
+            if os.fstat(self.fd).st_size != size:
+                os.ftruncate(self.fd, size)
+            self.mm = mmap.mmap(self.fd, size)
+            if carried is not None:
+                self._reset(carried)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _read_existing(self) -> Optional[List[float]]:
+        """None if the file is a valid ring of our capacity, else the timestamps to carry over."""
+        raw = os.pread(self.fd, os.fstat(self.fd).st_size, 0)
+        if len(raw) < self.HEADER.size:
+            return []
+        magic, capacity, head, count = self.HEADER.unpack_from(raw)
+        if magic != self.MAGIC or len(raw) < self.HEADER.size + capacity * self.SLOT.size:
+            return []
+        if capacity == self.capacity:
+            return None
+        # Limit changed: carry the newest calls over into a resized ring
+        slots = [self.SLOT.unpack_from(raw, self.HEADER.size + ((head + i) % capacity) * self.SLOT.size)[0]
+                 for i in range(min(count, capacity))]
+        return slots[-self.capacity:]
+
+    def _reset(self, timestamps: List[float]):
+        self.HEADER.pack_into(self.mm, 0, self.MAGIC, self.capacity, 0, 0)
+        for t in timestamps:
+            self.append(t)
+
+    def _state(self) -> Tuple[int, int]:
+        _, _, head, count = self.HEADER.unpack_from(self.mm)
+        return head, count
+
+    def slot(self, offset: int) -> float:
+        """The `offset`th oldest timestamp."""
+        head, _ = self._state()
+        return self.SLOT.unpack_from(self.mm, self.HEADER.size + ((head + offset) % self.capacity) * self.SLOT.size)[0]
+
+    def count(self) -> int:
+        return self._state()[1]
+
+    def append(self, t: float):
+        head, count = self._state()
+        if count < self.capacity:
+            index, count = (head + count) % self.capacity, count + 1
+        else:
+            index, head = head, (head + 1) % self.capacity
+        self.SLOT.pack_into(self.mm, self.HEADER.size + index * self.SLOT.size, t)
+        self.HEADER.pack_into(self.mm, 0, self.MAGIC, self.capacity, head, count)
+
+    def all(self) -> List[float]:
+        return [self.slot(i) for i in range(self.count())]
+
+
+class MmapWindowStore:
+    """
+    Timestamp windows shared by every worker process on the node.
+
+    Each source is a ring file under `directory`; a check takes an flock on it,
+    reads the one slot that decides admission and appends in place. The files
+    outlive the processes, so daily quotas also survive restarts.
+    All workers must run with the same limits.
+    """
+
+    shared = True
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._lock = threading.Lock()  # flock doesn't exclude threads sharing the fd
+        self._rings: Dict[str, _RingFile] = {}
+
+    def _ring(self, source: str, max_calls: int) -> _RingFile:
+        ring = self._rings.get(source)
+        if ring is None or ring.capacity != max_calls:
+            ring = self._rings[source] = _RingFile(os.path.join(self._directory, f"{source}.ring"), max_calls)
+        return ring
+
+    def _locked(self, source: str, max_calls: int, fn):
+        with self._lock:
+            ring = self._ring(source, max_calls)
+            fcntl.flock(ring.fd, fcntl.LOCK_EX)
+            try:
+                return fn(ring)
+            finally:
+                fcntl.flock(ring.fd, fcntl.LOCK_UN)
+
+    def check(self, source: str, max_calls: int, window: int, need: int, record: int, now: float) -> float:
+        def step(ring: _RingFile) -> float:
+            free = max_calls - ring.count()
+            wait = _wait_for(ring.slot(need - free - 1) if need > free else None, window, now)
+            if wait == 0:
+                for _ in range(record):
+                    ring.append(now)
+            return wait
+        return self._locked(source, max_calls, step)
+
+    def record(self, source: str, max_calls: int, now: float):
+        self._locked(source, max_calls, lambda ring: ring.append(now))
+
+    def timestamps(self, source: str, max_calls: int) -> List[float]:
+        return self._locked(source, max_calls, lambda ring: ring.all())
+
+    def load(self, source: str, max_calls: int, timestamps: List[float]):
+        pass  # already durable
+
+
+def create_store(backend: str, state_dir: str):
+    """Window store for the configured RATE_LIMIT_BACKEND ("local" or "mmap")."""
+    if backend == "mmap":
+        if fcntl is not None:
+            return MmapWindowStore(os.path.join(state_dir, "rate_limits"))
+        print("[RateLimiter] mmap backend needs fcntl; falling back to per-process limits")
+    elif backend != "local":
+        print(f"[RateLimiter] Unknown backend '{backend}'; using local")
+    return LocalWindowStore()
+
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter per API source.
+
+    Each source keeps at most `max_calls` timestamps: a call is allowed when there's
+    room or the oldest entry has left the window, so every check is O(1).
+    Check-and-record is a single atomic step, and `acquire()` waits for capacity
+    instead of skipping the provider.
+
+    Timestamps live in a pluggable store: per-process deques (daily quotas persisted
+    to JSON) or mmap'd ring files shared by every worker on the node.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        state_path: Optional[str] = None,
+        store=None,
+    ):
+        self._save_lock = threading.Lock()
         # Limits: (max_calls, window_seconds)
-        self._limits: Dict[str, Tuple[int, int]] = {
+        self._limits: Dict[str, Tuple[int, int]] = limits or {
             "finnhub": (60, 60),      # 60 calls per minute
             "fmp": (250, 86400),      # 250 calls per day
             "newsapi": (100, 86400),  # 100 calls per day
         }
+        self._store = store or LocalWindowStore()
+        self._state_path = None if self._store.shared else state_path
+        self._load()
+
+    def limit(self, source: str) -> Tuple[int, int]:
+        """(max_calls, window_seconds) for a source."""
+        return self._limits.get(source, (100, 60))
+
+    def _wait(self, source: str, cost: int, headroom: int, record: bool) -> float:
+        max_calls, window = self.limit(source)
+        if cost + headroom > max_calls:
+            return float("inf")
+        return self._store.check(source, max_calls, window, cost + headroom, cost if record else 0, time.time())
+
+    def try_acquire(self, source: str, cost: int = 1, headroom: int = 0) -> bool:
+        """
+        Atomically check capacity and record `cost` calls. Never blocks.
+        `headroom` slots must still be free afterwards (used to hold quota back).
+        """
+        if self._wait(source, cost, headroom, record=True) > 0:
+            return False
+        self._persist(source)
+        return True
+
+    async def acquire(self, source: str, timeout: Optional[float] = None, cost: int = 1) -> bool:
+        """
+        Wait up to `timeout` seconds for capacity, then record the call(s).
+        Returns False without sleeping when capacity can't free up in time
+        (e.g. an exhausted daily quota).
+        """
+        timeout = settings.rate_limit_wait_s if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.try_acquire(source, cost):
+                return True
+            wait = self.wait_time(source, cost)
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                return False
+            await asyncio.sleep(max(wait, 0.001))
+
+    def wait_time(self, source: str, cost: int = 1) -> float:
+        """Seconds until `cost` calls would be admitted (0 if now, inf if never)."""
+        return self._wait(source, cost, 0, record=False)
 
     def can_call(self, source: str) -> bool:
-        max_calls, window = self._limits.get(source, (100, 60))
-        now = time.time()
-        # Filter out timestamps older than the window
-        self._calls[source] = [t for t in self._calls[source] if now - t < window]
-        return len(self._calls[source]) < max_calls
+        return self.wait_time(source) == 0
 
     def record_call(self, source: str):
-        self._calls[source].append(time.time())
+        self._store.record(source, self.limit(source)[0], time.time())
+        self._persist(source)
+
+    def recent_calls(self, source: str, seconds: float) -> int:
+        """Calls recorded in the last `seconds` (O(n); for reporting only)."""
+        cutoff = time.time() - seconds
+        return sum(1 for t in self._store.timestamps(source, self.limit(source)[0]) if t > cutoff)
+
+    def usage(self, source: str) -> Dict[str, float]:
+        """Calls used within the current window (O(n); for reporting only)."""
+        max_calls, window = self.limit(source)
+        used = self.recent_calls(source, window)
+        return {"used": used, "limit": max_calls, "window_seconds": window, "remaining": max_calls - used}
+
+    # --- Persistence of daily quotas (local store only) ---
+
+    def _load(self):
+        if not self._state_path or not os.path.exists(self._state_path):
+            return
+        try:
+            with open(self._state_path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[RateLimiter] Could not load quota state: {e}")
+            return
+        now = time.time()
+        for source, timestamps in saved.items():
+            max_calls, window = self.limit(source)
+            self._store.load(source, max_calls, [t for t in timestamps if now - t < window])
+
+    def _persist(self, source: str):
+        if not self._state_path or self.limit(source)[1] < PERSISTED_WINDOW_SECONDS:
+            return
+        snapshot = {
+            name: self._store.timestamps(name, max_calls)
+            for name, (max_calls, window) in self._limits.items()
+            if window >= PERSISTED_WINDOW_SECONDS
+        }
+        try:
+            with self._save_lock:
+                os.makedirs(os.path.dirname(self._state_path) or ".", exist_ok=True)
+                tmp_path = f"{self._state_path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self._state_path)
+        except OSError as e:
+            print(f"[RateLimiter] Could not persist quota state: {e}")
+
 
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(
+    state_path=os.path.join(settings.state_dir, "rate_limits.json"),
+    store=create_store(settings.rate_limit_backend, settings.state_dir),
+)
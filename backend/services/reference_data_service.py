@@ -0,0 +1,217 @@
+import threading
+import time
+import requests
+import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel
+from config import settings
+from services.cache import SimpleCache
+from typing import Dict, Any, Iterable, Optional
+
+
+def _num(value: Any) -> Optional[float]:
+    """yfinance occasionally returns strings such as 'Infinity' for numeric fields."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value and abs(value) != float("inf") else None
+    return None
+
+
+def _text(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) and value else None
+
+
+class TickerReference(BaseModel):
+    """
+    Normalized view of yfinance `.info` for a single ticker.
+    Both MarketDataService (stock_info) and FundamentalsService read from this record.
+    """
+    symbol: str
+    name: str
+    sector: str = "Unknown"
+    industry: str = "Unknown"
+    exchange: Optional[str] = None
+    quote_type: Optional[str] = None
+    currency: Optional[str] = None
+
+    # Quote-level reference values
+    market_cap: Optional[float] = None
+    beta: Optional[float] = None
+    dividend_yield: Optional[float] = None
+    avg_analyst_rating: Optional[str] = None
+
+    # Fundamentals
+    revenue: Optional[float] = None
+    revenue_growth: Optional[float] = None
+    gross_margins: Optional[float] = None
+    operating_margins: Optional[float] = None
+    profit_margins: Optional[float] = None
+    net_income: Optional[float] = None
+    total_debt: Optional[float] = None
+    total_cash: Optional[float] = None
+    free_cash_flow: Optional[float] = None
+    operating_cash_flow: Optional[float] = None
+    debt_to_equity: Optional[float] = None
+    current_ratio: Optional[float] = None
+    return_on_equity: Optional[float] = None
+    return_on_assets: Optional[float] = None
+    earnings_growth: Optional[float] = None
+    pe_ratio: Optional[float] = None
+    forward_pe: Optional[float] = None
+    peg_ratio: Optional[float] = None
+    price_to_book: Optional[float] = None
+    price_to_sales: Optional[float] = None
+    enterprise_value: Optional[float] = None
+    ev_to_ebitda: Optional[float] = None
+    earnings_timestamp: Optional[float] = None  # next (or most recent) earnings date, epoch seconds
+
+    fetched_at: float = 0.0
+
+    @classmethod
+    def from_info(cls, ticker: str, info: Dict[str, Any]) -> "TickerReference":
+        return cls(
+            symbol=ticker,
+            name=info.get("longName") or info.get("shortName") or ticker,
+            sector=info.get("sector") or "Unknown",
+            industry=info.get("industry") or "Unknown",
+            exchange=_text(info.get("exchange")),
+            quote_type=_text(info.get("quoteType")),
+            currency=_text(info.get("currency")),
+            market_cap=_num(info.get("marketCap")),
+            beta=_num(info.get("beta")),
+            dividend_yield=_num(info.get("dividendYield")),
+            avg_analyst_rating=_text(info.get("averageAnalystRating")),
+            revenue=_num(info.get("totalRevenue")),
+            revenue_growth=_num(info.get("revenueGrowth")),
+            gross_margins=_num(info.get("grossMargins")),
+            operating_margins=_num(info.get("operatingMargins")),
+            profit_margins=_num(info.get("profitMargins")),
+            net_income=_num(info.get("netIncomeToCommon")),
+            total_debt=_num(info.get("totalDebt")),
+            total_cash=_num(info.get("totalCash")),
+            free_cash_flow=_num(info.get("freeCashflow")),
+            operating_cash_flow=_num(info.get("operatingCashflow")),
+            debt_to_equity=_num(info.get("debtToEquity")),
+            current_ratio=_num(info.get("currentRatio")),
+            return_on_equity=_num(info.get("returnOnEquity")),
+            return_on_assets=_num(info.get("returnOnAssets")),
+            earnings_growth=_num(info.get("earningsGrowth")),
+            pe_ratio=_num(info.get("trailingPE")),
+            forward_pe=_num(info.get("forwardPE")),
+            peg_ratio=_num(info.get("pegRatio")),
+            price_to_book=_num(info.get("priceToBook")),
+            price_to_sales=_num(info.get("priceToSalesTrailing12Months")),
+            enterprise_value=_num(info.get("enterpriseValue")),
+            ev_to_ebitda=_num(info.get("enterpriseToEbitda")),
+            earnings_timestamp=_num(info.get("earningsTimestampStart") or info.get("earningsTimestamp")),
+            fetched_at=time.time(),
+        )
+
+    def to_stock_info(self) -> Dict[str, Any]:
+        """Shape consumed by AnalysisState['stock_info']."""
+        return {
+            "name": self.name,
+            "sector": self.sector,
+            "industry": self.industry,
+            "market_cap": self.market_cap,
+            "beta": self.beta,
+            "pe_ratio": self.pe_ratio,
+            "forward_pe": self.forward_pe,
+            "dividend_yield": self.dividend_yield,
+            "avg_analyst_rating": self.avg_analyst_rating,
+        }
+
+    def to_fundamentals(self) -> Dict[str, Any]:
+        """Shape consumed by AnalysisState['fundamentals']['yfinance']."""
+        return {
+            "revenue": self.revenue,
+            "revenue_growth": self.revenue_growth,
+            "gross_margins": self.gross_margins,
+            "operating_margins": self.operating_margins,
+            "profit_margins": self.profit_margins,
+            "net_income": self.net_income,
+            "total_debt": self.total_debt,
+            "total_cash": self.total_cash,
+            "free_cash_flow": self.free_cash_flow,
+            "operating_cash_flow": self.operating_cash_flow,
+            "debt_to_equity": self.debt_to_equity,
+            "current_ratio": self.current_ratio,
+            "return_on_equity": self.return_on_equity,
+            "return_on_assets": self.return_on_assets,
+            "earnings_growth": self.earnings_growth,
+            "pe_ratio": self.pe_ratio,
+            "forward_pe": self.forward_pe,
+            "peg_ratio": self.peg_ratio,
+            "price_to_book": self.price_to_book,
+            "price_to_sales": self.price_to_sales,
+            "enterprise_value": self.enterprise_value,
+            "ev_to_ebitda": self.ev_to_ebitda,
+            "market_cap": self.market_cap,
+        }
+
+
+class ReferenceDataStore:
+    """
+    Single owner of yfinance `.info` fetches.
+    Each ticker's payload is downloaded once per TTL and shared by every service;
+    concurrent callers for the same ticker wait on one in-flight fetch.
+    """
+
+    def __init__(self, ttl_seconds: int = 21600, max_workers: int = 8):
+        self._cache = SimpleCache(ttl_seconds=ttl_seconds)
+        self._max_workers = max_workers
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def get(self, ticker: str) -> Optional[TickerReference]:
+        """Return the cached record, fetching `.info` at most once per TTL. None if the fetch fails."""
+        ticker = ticker.upper()
+        cached = self._cache.get(ticker)
+        if cached is not None:
+            return cached
+
+        with self._lock_for(ticker):
+            # Another caller may have filled the cache while we waited
+            cached = self._cache.get(ticker)
+            if cached is not None:
+                return cached
+            return self._fetch(ticker)
+
+    def refresh(self, tickers: Iterable[str]) -> Dict[str, TickerReference]:
+        """Force a re-fetch for many tickers in parallel. Returns the records that succeeded."""
+        symbols = sorted({t.upper() for t in tickers if t})
+        if not symbols:
+            return {}
+
+        def _refresh_one(ticker: str) -> Optional[TickerReference]:
+            with self._lock_for(ticker):
+                return self._fetch(ticker)
+
+        with ThreadPoolExecutor(max_workers=min(self._max_workers, len(symbols))) as pool:
+            results = pool.map(_refresh_one, symbols)
+        return {t: ref for t, ref in zip(symbols, results) if ref is not None}
+
+    def _fetch(self, ticker: str) -> Optional[TickerReference]:
+        try:
+            if settings.yfinance_standin_url:
+                resp = requests.get(f"{settings.yfinance_standin_url}/info/{ticker}", timeout=10)
+                resp.raise_for_status()
+                info = resp.json()
+            else:
+                info = yf.Ticker(ticker).info or {}
+        except Exception as e:
+            print(f"[ReferenceDataStore] yfinance .info failed for {ticker}: {e}")
+            return None
+
+        record = TickerReference.from_info(ticker, info)
+        self._cache.set(ticker, record)
+        return record
+
+
+# Global reference store (default 6 hour TTL)
+reference_data = ReferenceDataStore(ttl_seconds=settings.reference_data_ttl_seconds)
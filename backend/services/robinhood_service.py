@@ -1,12 +1,15 @@
+import asyncio
 import robin_stocks.robinhood as rh
 import builtins
 from typing import Optional, List, Dict, Any
 from fastapi import HTTPException
+from services.quote_service import quote_service
 
 class RobinhoodService:
     """Wraps robin_stocks with error handling and session management."""
 
     _logged_in: bool = False
+    _holdings_snapshot: Optional[List[Dict[str, Any]]] = None
 
     @classmethod
     def login(cls, username: str, password: str, mfa_code: Optional[str] = None) -> Dict[str, Any]:
@@ -54,7 +57,8 @@ class RobinhoodService:
     def get_portfolio(cls) -> List[Dict[str, Any]]:
         """
         Fetch stock + crypto holdings.
-        Returns list of dicts with keys: symbol, name, price, quantity, value, change, average_buy_price.
+        Returns list of dicts with keys: symbol, name, price, quantity, value, change, average_buy_price,
+        asset_type ("stock" | "crypto").
         Raises HTTPException(401) if not logged in.
         """
         try:
@@ -75,6 +79,7 @@ class RobinhoodService:
                     "value": float(data["equity"]),
                     "change": float(data["percent_change"]),
                     "average_buy_price": float(data["average_buy_price"]),
+                    "asset_type": "stock",
                 })
 
             # Crypto
@@ -92,24 +97,12 @@ class RobinhoodService:
                         "quantity": qty,
                         "value": qty * price,
                         "change": 0.0,
+                        "asset_type": "crypto",
                     })
 
-            # Calculate Total Equity for Allocation %
-            total_equity = sum(item["value"] for item in portfolio)
-            
-            # Enrich with calculated fields
-            for item in portfolio:
-                item["equity"] = item["value"]  # Standardize key
-                item["allocation_pct"] = (item["value"] / total_equity * 100) if total_equity > 0 else 0
-                
-                # Check if we have averages to calc P&L
-                if item.get("average_buy_price") and item.get("quantity"):
-                    cost_basis = item["average_buy_price"] * item["quantity"]
-                    item["unrealized_pnl"] = item["value"] - cost_basis
-                    item["unrealized_pnl_pct"] = (item["unrealized_pnl"] / cost_basis * 100) if cost_basis > 0 else 0
-                else:
-                    item["unrealized_pnl"] = 0.0
-                    item["unrealized_pnl_pct"] = 0.0
+            cls._enrich(portfolio)
+            # Keep the holdings snapshot so valuation refreshes only need fresh prices
+            cls._holdings_snapshot = portfolio
 
             return portfolio
 
@@ -119,6 +112,72 @@ class RobinhoodService:
             print(f"Error fetching portfolio: {e}")
             raise HTTPException(status_code=401, detail="Failed to fetch portfolio. Ensure you are logged in.")
 
+    @staticmethod
+    def _enrich(portfolio: List[Dict[str, Any]]):
+        """Add equity, allocation % and unrealized P&L to each holding in place."""
+        # Calculate Total Equity for Allocation %
+        total_equity = sum(item["value"] for item in portfolio)
+
+        # Enrich with calculated fields
+        for item in portfolio:
+            item["equity"] = item["value"]  # Standardize key
+            item["allocation_pct"] = (item["value"] / total_equity * 100) if total_equity > 0 else 0
+
+            # Check if we have averages to calc P&L
+            if item.get("average_buy_price") and item.get("quantity"):
+                cost_basis = item["average_buy_price"] * item["quantity"]
+                item["unrealized_pnl"] = item["value"] - cost_basis
+                item["unrealized_pnl_pct"] = (item["unrealized_pnl"] / cost_basis * 100) if cost_basis > 0 else 0
+            else:
+                item["unrealized_pnl"] = 0.0
+                item["unrealized_pnl_pct"] = 0.0
+
+    @staticmethod
+    def _crypto_price(code: str) -> Optional[float]:
+        try:
+            return float(rh.get_crypto_quote(code)["mark_price"])
+        except Exception as e:
+            print(f"Crypto quote failed for {code}: {e}")
+            return None
+
+    @classmethod
+    async def get_portfolio_valuation(cls) -> List[Dict[str, Any]]:
+        """
+        Re-price the last holdings snapshot: stocks with one batched quote lookup,
+        crypto with Robinhood crypto quotes (crypto codes like BTC collide with
+        listed tickers, so they never go through the stock quote path).
+        Falls back to a full holdings rebuild when no snapshot exists yet.
+        """
+        if not cls._holdings_snapshot:
+            return await asyncio.to_thread(cls.get_portfolio)
+
+        stocks = [item["symbol"] for item in cls._holdings_snapshot if item.get("asset_type", "stock") == "stock"]
+        crypto = [item["symbol"] for item in cls._holdings_snapshot if item.get("asset_type") == "crypto"]
+        quotes, crypto_prices = await asyncio.gather(
+            quote_service.get_quotes(stocks) if stocks else asyncio.sleep(0, {}),
+            asyncio.gather(*(asyncio.to_thread(cls._crypto_price, code) for code in crypto)),
+        )
+        prices = {symbol.upper(): quote["price"] for symbol, quote in quotes.items() if quote}
+        prices.update({code.upper(): price for code, price in zip(crypto, crypto_prices) if price is not None})
+
+        portfolio = []
+        for item in cls._holdings_snapshot:
+            price = prices.get(item["symbol"].upper(), item["price"])
+            change = item["change"]
+            # Same definition as the holdings build: percent change against the average buy price
+            if item.get("average_buy_price"):
+                change = (price - item["average_buy_price"]) / item["average_buy_price"] * 100
+            portfolio.append({
+                **item,
+                "price": price,
+                "value": price * item["quantity"],
+                "change": change,
+            })
+
+        cls._enrich(portfolio)
+        cls._holdings_snapshot = portfolio
+        return portfolio
+
     @classmethod
     def execute_trade(cls, symbol: str, action: str, quantity: float, order_type: str = "market") -> Dict[str, Any]:
         """
@@ -0,0 +1,122 @@
+import asyncio
+import csv
+import difflib
+from pathlib import Path
+from pydantic import BaseModel
+from config import settings
+from services.cache import SimpleCache
+from services.reference_data_service import reference_data
+from typing import Dict, List, Optional
+
+SYMBOL_MASTER_PATH = Path(__file__).resolve().parent.parent / "data" / "symbols" / "symbol_master.csv"
+
+
+class SymbolRecord(BaseModel):
+    symbol: str
+    name: str
+    exchange: Optional[str] = None
+    asset_type: str = "equity"
+    aliases: List[str] = []
+
+
+class SymbolValidation(BaseModel):
+    symbol: str
+    valid: bool
+    record: Optional[SymbolRecord] = None
+    suggestions: List[SymbolRecord] = []
+    source: str  # master | provider | negative_cache | unverified
+
+    def message(self) -> str:
+        """User-facing explanation for a rejected symbol."""
+        text = f"I couldn't find a listed security with the ticker \"{self.symbol}\"."
+        if self.suggestions:
+            options = ", ".join(f"{s.symbol} ({s.name})" for s in self.suggestions)
+            text += f" Did you mean {options}?"
+        return text
+
+
+class SymbolMaster:
+    """
+    Bundled symbol master (symbol, name, exchange, asset type, aliases) used to
+    validate tickers before any provider is called.
+
+    Symbols missing from the file get one reference-data lookup (the same cached
+    `.info` record the data-gathering step uses). Confirmed symbols are
+    remembered; rejected ones are negatively cached, so asking about the same
+    typo again costs no provider calls.
+    """
+
+    def __init__(self, path: Path = SYMBOL_MASTER_PATH, negative_ttl_seconds: int = 86400, strict: bool = False):
+        self._by_symbol: Dict[str, SymbolRecord] = {}
+        self._by_alias: Dict[str, str] = {}
+        self._negative = SimpleCache(ttl_seconds=negative_ttl_seconds)
+        self._strict = strict
+        try:
+            with open(path, newline="") as f:
+                for row in csv.DictReader(f):
+                    record = SymbolRecord(
+                        symbol=row["symbol"].upper(),
+                        name=row["name"],
+                        exchange=row.get("exchange") or None,
+                        asset_type=row.get("asset_type") or "equity",
+                        aliases=[a for a in (row.get("aliases") or "").split("|") if a],
+                    )
+                    self._by_symbol[record.symbol] = record
+                    for alias in record.aliases:
+                        self._by_alias.setdefault(alias.upper(), record.symbol)
+        except OSError as e:
+            print(f"[SymbolMaster] Could not load symbol master: {e}")
+        self._known = sorted(self._by_symbol)
+
+    def __len__(self) -> int:
+        return len(self._by_symbol)
+
+    def lookup(self, symbol: str) -> Optional[SymbolRecord]:
+        """Exact symbol, or an alternate form such as BRK-B or a former ticker."""
+        symbol = symbol.strip().lstrip("$").upper()
+        record = self._by_symbol.get(symbol)
+        if record is None and symbol in self._by_alias:
+            record = self._by_symbol[self._by_alias[symbol]]
+        return record
+
+    def suggest(self, symbol: str, n: int = 3) -> List[SymbolRecord]:
+        """Closest listed symbols; typos usually keep the length and the first letter."""
+        symbol = symbol.upper()
+        candidates = difflib.get_close_matches(symbol, self._known, n=10, cutoff=0.6)
+        ranked = sorted(candidates, key=lambda c: (
+            abs(len(c) - len(symbol)),
+            c[:1] != symbol[:1],
+            -difflib.SequenceMatcher(None, symbol, c).ratio(),
+        ))
+        return [self._by_symbol[m] for m in ranked[:n]]
+
+    async def validate(self, symbol: str) -> SymbolValidation:
+        symbol = symbol.strip().lstrip("$").upper()
+        record = self.lookup(symbol)
+        if record is not None:
+            return SymbolValidation(symbol=record.symbol, valid=True, record=record, source="master")
+
+        if self._negative.get(symbol):
+            return SymbolValidation(symbol=symbol, valid=False, suggestions=self.suggest(symbol), source="negative_cache")
+
+        if not self._strict:
+            reference = await asyncio.to_thread(reference_data.get, symbol)
+            if reference is None:
+                # Lookup failed (provider down), not a verdict on the symbol — let it through
+                return SymbolValidation(symbol=symbol, valid=True, source="unverified")
+            if reference.quote_type:
+                record = SymbolRecord(symbol=symbol, name=reference.name, exchange=reference.exchange,
+                                      asset_type=reference.quote_type.lower())
+                self._by_symbol[symbol] = record
+                return SymbolValidation(symbol=symbol, valid=True, record=record, source="provider")
+
+        self._negative.set(symbol, True)
+        return SymbolValidation(symbol=symbol, valid=False, suggestions=self.suggest(symbol),
+                                source="master" if self._strict else "provider")
+
+
+# Global symbol master (bundled file loaded once)
+symbol_master = SymbolMaster(
+    negative_ttl_seconds=settings.symbol_negative_ttl_seconds,
+    strict=settings.symbol_master_strict,
+)
@@ -0,0 +1,184 @@
+import math
+from services.prompt_budget import compact_number
+from typing import Any, Dict, List, Optional
+
+# Composite at or beyond this magnitude reads as a directional rating
+RATING_BAND = 0.25
+
+
+def _clamp(value: float, limit: float = 1.0) -> float:
+    return max(-limit, min(limit, value))
+
+
+def _sign(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """+1 if a > b, -1 if a < b, None if either is missing."""
+    if a is None or b is None:
+        return None
+    return 1.0 if a > b else -1.0 if a < b else 0.0
+
+
+def _mean(values: List[Optional[float]]) -> Optional[float]:
+    present = [v for v in values if v is not None]
+    return sum(present) / len(present) if present else None
+
+
+class TechnicalSignalEngine:
+    """
+    Mechanical reading of the `technical_indicators` dict — no LLM call.
+
+    Each regime is scored in [-1, 1] from the textbook rules the technical
+    prompt describes (price vs moving averages and the Ichimoku cloud, DI+/DI-,
+    RSI / Stoch RSI / MACD / Williams %R, Chaikin money flow, pivots). Trend is
+    damped when ADX says the market is choppy. The composite is a weighted sum
+    of the regime scores, minus a penalty when momentum is overextended.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self._weights = weights or {"trend": 0.4, "momentum": 0.3, "volume": 0.2, "levels": 0.1}
+
+    def evaluate(self, indicators: Dict[str, Any]) -> Dict[str, Any]:
+        """Regime scores, labels and the composite rating; {} if there are no indicators."""
+        # NaN/inf (short histories, flat Stoch RSI) count as missing, not as a reading
+        ind = {k: float(v) for k, v in indicators.items()
+               if isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)}
+        price = ind.get("current_price")
+        if price is None:
+            return {}
+        signals: List[str] = []
+
+        # --- Trend: structure and direction, damped by ADX strength ---
+        cloud_top = max(ind["ichimoku_span_a"], ind["ichimoku_span_b"]) if "ichimoku_span_b" in ind and "ichimoku_span_a" in ind else None
+        cloud_bottom = min(ind["ichimoku_span_a"], ind["ichimoku_span_b"]) if cloud_top is not None else None
+        cloud = None
+        if cloud_top is not None:
+            cloud = 1.0 if price > cloud_top else -1.0 if price < cloud_bottom else 0.0
+        direction = _mean([
+            _sign(price, ind.get("sma_50")),
+            _sign(ind.get("sma_50"), ind.get("sma_200")),
+            cloud,
+            _sign(ind.get("ichimoku_conv"), ind.get("ichimoku_base")),
+            _sign(ind.get("adx_pos"), ind.get("adx_neg")),
+        ])
+        adx = ind.get("adx")
+        strength = "TRENDING" if adx is not None and adx >= 25 else "CHOPPY" if adx is not None and adx < 20 else "DEVELOPING"
+        trend = None
+        if direction is not None:
+            trend = direction * {"TRENDING": 1.0, "DEVELOPING": 0.75, "CHOPPY": 0.5}[strength]
+        if _sign(ind.get("sma_50"), ind.get("sma_200")) == 1.0:
+            signals.append("SMA50 above SMA200")
+        elif _sign(ind.get("sma_50"), ind.get("sma_200")) == -1.0:
+            signals.append("SMA50 below SMA200")
+        if cloud is not None:
+            signals.append({1.0: "price above cloud", -1.0: "price below cloud", 0.0: "price inside cloud"}[cloud])
+        if adx is not None:
+            signals.append(f"ADX {adx:.0f} ({strength.lower()})")
+
+        # --- Momentum: oscillators, with an overextension flag ---
+        rsi, stoch_k, williams = ind.get("rsi"), ind.get("stoch_k"), ind.get("williams_r")
+        momentum = _mean([
+            _clamp((rsi - 50) / 20) if rsi is not None else None,
+            _clamp((stoch_k - 0.5) * 2) if stoch_k is not None else None,
+            _sign(ind.get("macd_hist"), 0.0),
+            _clamp((williams + 50) / 30) if williams is not None else None,
+        ])
+        extension = "NONE"
+        if rsi is not None and rsi >= 70 and (stoch_k is None or stoch_k >= 0.8):
+            extension = "OVERBOUGHT"
+        elif rsi is not None and rsi <= 30 and (stoch_k is None or stoch_k <= 0.2):
+            extension = "OVERSOLD"
+        if rsi is not None:
+            signals.append(f"RSI {rsi:.0f}" + (f" ({extension.lower()})" if extension != "NONE" else ""))
+        if ind.get("macd_hist") is not None:
+            signals.append("MACD histogram " + ("positive" if ind["macd_hist"] > 0 else "negative"))
+
+        # --- Volatility: squeeze / expansion regime (direction-neutral) ---
+        volatility = "NORMAL"
+        if ind.get("bb_upper") is not None and ind.get("kc_upper") is not None and ind["bb_upper"] < ind["kc_upper"] \
+                and (ind.get("bb_lower") is None or ind.get("kc_lower") is None or ind["bb_lower"] > ind["kc_lower"]):
+            volatility = "SQUEEZE"
+        elif (ind.get("bb_upper") is not None and price > ind["bb_upper"]) or (ind.get("bb_lower") is not None and price < ind["bb_lower"]):
+            volatility = "EXPANSION"
+        atr_pct = ind["atr"] / price * 100 if ind.get("atr") is not None and price else None
+        if volatility != "NORMAL":
+            signals.append(f"volatility {volatility.lower()}")
+
+        # --- Volume: money flow ---
+        cmf = ind.get("cmf")
+        volume = _clamp(cmf / 0.15) if cmf is not None else None
+        if cmf is not None and abs(cmf) >= 0.05:
+            signals.append("accumulation (CMF > 0)" if cmf > 0 else "distribution (CMF < 0)")
+
+        # --- Levels: where price sits against the pivots ---
+        levels = None
+        if ind.get("pivot_point") is not None:
+            levels = _sign(price, ind["pivot_point"])
+            if ind.get("r1") is not None and price > ind["r1"]:
+                signals.append("above R1")
+            elif ind.get("s1") is not None and price < ind["s1"]:
+                signals.append("below S1")
+
+        scores = {"trend": trend, "momentum": momentum, "volume": volume, "levels": levels}
+        weighted = [(self._weights[k], v) for k, v in scores.items() if v is not None]
+        total_weight = sum(w for w, _ in weighted)
+        composite = sum(w * v for w, v in weighted) / total_weight if total_weight else 0.0
+        # Stretched oscillators argue against chasing the move
+        if extension == "OVERBOUGHT" and composite > 0:
+            composite -= 0.15
+        elif extension == "OVERSOLD" and composite < 0:
+            composite += 0.15
+
+        rating = "BULLISH" if composite >= RATING_BAND else "BEARISH" if composite <= -RATING_BAND else "NEUTRAL"
+        aligned = trend is not None and momentum is not None and trend * momentum > 0
+        conviction = "HIGH" if abs(composite) >= 0.5 and aligned else "MEDIUM" if abs(composite) >= RATING_BAND else "LOW"
+
+        return {
+            "scores": {k: round(v, 2) if v is not None else None for k, v in scores.items()},
+            "trend_strength": strength,
+            "momentum_extension": extension,
+            "volatility_regime": volatility,
+            "atr_pct": round(atr_pct, 2) if atr_pct is not None else None,
+            "composite": round(composite, 2),
+            "rating": rating,
+            "conviction": conviction,
+            "key_levels": {k: ind.get(k) for k in ("s1", "pivot_point", "r1")},
+            "signals": signals,
+        }
+
+    @staticmethod
+    def summary_block(result: Dict[str, Any]) -> str:
+        """Compact block for the supervisor prompt."""
+        if not result:
+            return "Unavailable."
+        scores = result["scores"]
+        levels = result["key_levels"]
+        score_text = " | ".join(f"{k}={'N/A' if v is None else f'{v:+.2f}'}" for k, v in scores.items())
+        return "\n".join([
+            f"Rating: {result['rating']} (composite {result['composite']:+.2f}, conviction {result['conviction']})",
+            f"Scores: {score_text}",
+            f"Regimes: trend {result['trend_strength']} | momentum extension {result['momentum_extension']} | "
+            f"volatility {result['volatility_regime']} (ATR {compact_number(result['atr_pct'])}% of price)",
+            f"Levels: S1={compact_number(levels['s1'])} | Pivot={compact_number(levels['pivot_point'])} | R1={compact_number(levels['r1'])}",
+            f"Signals: {'; '.join(result['signals']) or 'none'}",
+        ])
+
+    def build_report(self, ticker: str, indicators: Dict[str, Any]) -> str:
+        """A technical report in the same sections the LLM agent writes, for the supervisor."""
+        result = self.evaluate(indicators)
+        if not result:
+            return "Insufficient price data for technical analysis."
+        trigger_level = result["key_levels"]["r1"] if result["rating"] != "BEARISH" else result["key_levels"]["s1"]
+        trigger = f"Close {'above R1' if result['rating'] != 'BEARISH' else 'below S1'} at ${compact_number(trigger_level)}"
+        return "\n".join([
+            f"Rules-based technical read for {ticker}:",
+            self.summary_block(result),
+            "",
+            "## TECHNICAL VERDICT",
+            f"*   **Primary Signal**: {result['rating']}",
+            f"*   **Conviction**: {result['conviction']}",
+            f"*   **Key Trigger**: {trigger}",
+            "(Scored locally by the technical rules engine, no LLM pass.)",
+        ])
+
+
+# Global engine
+technical_signals = TechnicalSignalEngine()
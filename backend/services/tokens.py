@@ -0,0 +1,44 @@
+import threading
+from typing import Iterable, List, Optional
+
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken's o200k_base (gpt-4o family), loaded once. None if it can't be loaded (e.g. offline)."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    print(f"[Tokens] tiktoken encoding unavailable, estimating by length: {e}")
+                    _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count for prompt budgeting (~4 characters per token when tiktoken is unavailable)."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def fit_lines(lines: Iterable[str], budget: int, joiner: str = "\n") -> List[str]:
+    """The leading lines that fit within `budget` tokens (always at least one if any)."""
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        cost = count_tokens(line + joiner)
+        if kept and used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return kept
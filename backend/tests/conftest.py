@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Global stores (LLM cache, quota counters, news indexes) persist under settings.state_dir.
+# Point it at a throwaway directory before any app module reads the settings, so a test
+# run never writes into the working tree's .state/.
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="sentinel-test-state-")
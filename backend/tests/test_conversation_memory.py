@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from services.conversation_memory import ConversationMemory
+from services.tokens import count_tokens
+
+LONG_REPLY = "## RECOMMENDATION\nAction: BUY. " + "Margins expanded while revenue growth re-accelerated. " * 60
+
+
+def test_prompt_size_stays_flat_as_the_conversation_grows():
+    memory = ConversationMemory(recent_messages=4, turn_tokens=120, summary_tokens=200, llm_summary=False)
+    sizes = []
+    for i in range(30):
+        memory.record("s1", f"Question {i}: what about ticker number {i}?", LONG_REPLY)
+        sizes.append(count_tokens(memory.context("s1").as_text()))
+
+    assert max(sizes) <= 4 * 125 + 220
+    assert sizes[-1] <= sizes[10] * 1.1  # summary budget full by then: no further growth
+    context = memory.context("s1")
+    assert [role for role, _ in context.turns] == ["user", "assistant", "user", "assistant"]
+    assert "Question 29" in context.turns[-2][1]
+    assert "Question 25" in context.summary  # older turns survive as summary lines
+
+
+def test_client_history_seeds_a_session_once():
+    memory = ConversationMemory(recent_messages=2, llm_summary=False)
+    history = [{"role": "user", "content": "Analyze AAPL"}, {"role": "assistant", "content": "BUY. Strong services."},
+               {"role": "user", "content": "And MSFT?"}, {"role": "assistant", "content": "HOLD. Priced in."}]
+
+    stateless = memory.context(None, history)
+    assert stateless.summary.startswith("- User: Analyze AAPL") and len(stateless.turns) == 2
+
+    memory.context("s2", history)
+    memory.record("s2", "What about NVDA?", "BUY. Data center demand.")
+    # The session's own memory now wins over whatever the client sends
+    context = memory.context("s2", [])
+    assert context.turns[-1] == ("assistant", "BUY. Data center demand.")
+    assert "And MSFT?" in context.summary
+
+
+@pytest.mark.asyncio
+async def test_overflow_is_folded_by_the_llm_in_the_background():
+    memory = ConversationMemory(recent_messages=2)
+    with patch("services.conversation_memory.ChatOpenAI") as MockLLM:
+        MockLLM.return_value.ainvoke = AsyncMock(return_value=type("R", (), {"content": "- User holds AAPL; was told BUY"})())
+        memory.record("s3", "Analyze AAPL", LONG_REPLY)
+        memory.record("s3", "Should I add more?", "Yes, scale in.")
+        await asyncio.gather(*memory._tasks)
+
+    assert MockLLM.return_value.ainvoke.await_count == 1
+    context = memory.context("s3")
+    assert context.summary == "- User holds AAPL; was told BUY"
+    assert context.turns == [("user", "Should I add more?"), ("assistant", "Yes, scale in.")]
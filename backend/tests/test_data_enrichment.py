@@ -1,9 +1,20 @@
+import asyncio
+import time
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from services.robinhood_service import RobinhoodService
 from services.news_service import NewsService
+from services.news_dedup import NewsDeduplicator
+from services.news_store import NewsStore
 from services.fundamentals_service import FundamentalsService
 
+@pytest.fixture
+def seen_index(tmp_path):
+    """Keep the dedup seen-index out of the working tree's .state/."""
+    with patch("services.news_service.news_deduplicator", NewsDeduplicator(state_dir=str(tmp_path / "news_seen"))):
+        yield tmp_path / "news_seen"
+
+
 @patch("services.robinhood_service.rh")
 def test_portfolio_enrichment(mock_rh):
     """Test allocation % and P&L calculations."""
@@ -50,26 +61,29 @@ def test_portfolio_enrichment(mock_rh):
     assert round(googl["unrealized_pnl_pct"], 2) == -4.76
 
 
+@patch("services.news_service.news_store", NewsStore(None))
 @patch("services.news_service.settings")
 @patch("services.news_service.data_cache")
-@patch("services.news_service.rate_limiter")
-def test_news_deduplication(mock_limiter, mock_cache, mock_settings):
+@patch("services.news_service.quota_scheduler")
+def test_news_deduplication(mock_scheduler, mock_cache, mock_settings, seen_index):
     """Test news deduplication logic."""
     service = NewsService()
     service.finnhub_client = MagicMock()
     
     # Mock Finnhub response with duplicates
+    now = int(time.time())
     mock_news = [
-        {"headline": "Market Crash!", "datetime": 100},
-        {"headline": "market crash!", "datetime": 101}, # Duplicate (normalized)
-        {"headline": "Market Rebound", "datetime": 102}
+        {"headline": "Market Crash!", "datetime": now - 300},
+        {"headline": "market crash!", "datetime": now - 200}, # Duplicate (normalized)
+        {"headline": "Market Rebound", "datetime": now - 100}
     ]
     service.finnhub_client.company_news.return_value = mock_news
     
     # Mock dependencies
     mock_cache.get.return_value = None
-    mock_limiter.can_call.return_value = True
+    mock_scheduler.acquire = AsyncMock(return_value=True)
     mock_settings.newsapi_api_key = None # Skip NewsAPI
+    mock_settings.news_finnhub_deadline_s = 5
     
     articles = service.get_company_news("AAPL")
     
@@ -79,12 +93,40 @@ def test_news_deduplication(mock_limiter, mock_cache, mock_settings):
     assert "Market Rebound" in headlines
     # The duplicate "market crash!" should be filtered out
 
+@patch("services.news_service.news_store", NewsStore(None))
+@patch("services.news_service.settings")
+@patch("services.news_service.data_cache")
+@patch("services.news_service.quota_scheduler")
+def test_news_slow_provider_misses_deadline(mock_scheduler, mock_cache, mock_settings, seen_index):
+    """A provider past its deadline is dropped; the others' articles still come back, uncached."""
+    service = NewsService()
+    service.finnhub_client = MagicMock()
+    service.finnhub_client.company_news.return_value = [{"headline": "Market Rebound", "datetime": int(time.time())}]
+
+    async def slow_newsapi(ticker, since):
+        await asyncio.sleep(5)
+        return [{"headline": "Late story"}]
+
+    service._fetch_newsapi = slow_newsapi
+    mock_cache.get.return_value = None
+    mock_scheduler.acquire = AsyncMock(return_value=True)
+    mock_settings.newsapi_api_key = "key"
+    mock_settings.news_finnhub_deadline_s = 5
+    mock_settings.news_newsapi_deadline_s = 0.2
+
+    start = time.monotonic()
+    articles = service.get_company_news("AAPL")
+
+    assert [a["headline"] for a in articles] == ["Market Rebound"]
+    assert time.monotonic() - start < 2
+    mock_cache.set.assert_not_called()
+
 @patch("services.fundamentals_service.data_cache")
-@patch("services.fundamentals_service.yf.Ticker")
-def test_fundamentals_caching(mock_ticker, mock_cache):
+@patch("services.fundamentals_service.reference_data")
+def test_fundamentals_caching(mock_reference, mock_cache):
     """Test caching in FundamentalsService."""
     mock_cache.get.return_value = {"cached": "data"}
     
     result = FundamentalsService.get_fundamentals("AAPL")
     assert result == {"cached": "data"}
-    mock_ticker.assert_not_called()
+    mock_reference.get.assert_not_called()
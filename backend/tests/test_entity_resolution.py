@@ -1,4 +1,6 @@
 import pytest
+from unittest.mock import AsyncMock, patch
+from config import settings
 from services.entity_resolution_service import EntityResolutionService
 
 @pytest.mark.asyncio
@@ -42,3 +44,50 @@ async def test_resolve_generic_chat():
     assert res["ticker"] is None
     # intent might be GENERIC_CHAT (if LLM is disabled/skipped) or fallback
     assert res["intent"] == "GENERIC_CHAT"
+
+@pytest.mark.asyncio
+async def test_short_symbols_need_capitals_and_whole_words():
+    """One-letter holdings only match as a capitalized standalone word."""
+    portfolio = [{"symbol": "C"}, {"symbol": "V"}, {"symbol": "AMD"}]
+    assert EntityResolutionService._match_portfolio("can you cover the volatility outlook?", portfolio) is None
+    assert (await EntityResolutionService.resolve("how many shares of V do I have", portfolio))["ticker"] == "V"
+    res = await EntityResolutionService.resolve("should I trim amd here?", portfolio)
+    assert res["ticker"] == "AMD"
+    assert res["method"] == "portfolio_match"
+
+def test_alias_matcher_prefers_leftmost_longest():
+    from services.alias_matcher import AliasMatcher
+    matcher = AliasMatcher({"bank": "X", "bank of america": "BAC", "america": "Y", "s&p": "SPY", "berkshire": "BRK.B"})
+    assert matcher.first("Is Bank of America cheap?") == "BAC"
+    assert matcher.first("the S&P vs Berkshire") == "SPY"
+    assert matcher.first("banking stocks in south america") == "Y"
+    assert [m[2] for m in matcher.find_all("bank of america")] == ["X", "BAC", "Y"]
+
+@pytest.mark.asyncio
+async def test_confident_local_intent_skips_llm():
+    with patch.object(EntityResolutionService, "_resolve_with_llm", AsyncMock()) as mock_llm:
+        res = await EntityResolutionService.resolve("which of my positions are down the most?", [])
+    mock_llm.assert_not_awaited()
+    assert res["intent"] == "PORTFOLIO_QA"
+    assert res["method"] == "local_classifier"
+    assert res["confidence"] >= settings.intent_classifier_threshold
+
+@pytest.mark.asyncio
+async def test_low_confidence_or_missing_ticker_escalates_to_llm():
+    llm_result = {"intent": "TICKER_ANALYSIS", "ticker": "RIVN", "confidence": 0.9, "method": "llm"}
+    with patch.object(EntityResolutionService, "_resolve_with_llm", AsyncMock(return_value=llm_result)) as mock_llm, \
+         patch("services.entity_resolution_service.intent_classifier") as mock_classifier:
+        mock_classifier.predict.return_value = ("TICKER_ANALYSIS", 0.95)
+        assert (await EntityResolutionService.resolve("thoughts on rivian?", []))["ticker"] == "RIVN"
+        mock_classifier.predict.return_value = ("GENERIC_CHAT", 0.4)
+        await EntityResolutionService.resolve("hmm", [])
+    assert mock_llm.await_count == 2
+
+def test_intent_classifier_holdout_accuracy():
+    """Trained on four fifths of the labeled queries, it should place most of the rest."""
+    from services.intent_classifier import IntentClassifier, load_labeled_queries
+    rows = load_labeled_queries()
+    train, test = [r for i, r in enumerate(rows) if i % 5], rows[::5]
+    model = IntentClassifier().fit([r["query"] for r in train], [r["intent"] for r in train])
+    correct = sum(model.predict(r["query"])[0] == r["intent"] for r in test)
+    assert correct / len(test) >= 0.8
@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import patch
+from agents.express_agent import express_analysis_node
+from agents.orchestrator import express_graph
+
+DECISION_JSON = (
+    '{"action": "BUY", "confidence": "HIGH", "thesis": "Momentum and margins align.",'
+    ' "risks": ["Valuation"], "catalysts": ["Product cycle"]}'
+)
+
+
+@pytest.fixture
+def gathered_state():
+    return {
+        "ticker": "AAPL",
+        "query": "quick take on AAPL",
+        "portfolio_context": [{"symbol": "AAPL", "quantity": 10, "price": 190.0}],
+        "technical_indicators": {"current_price": 190.123456, "rsi": 61.98765, "obv": 1_234_567_890},
+        "fundamentals": {"yfinance": {"pe_ratio": 29.4, "market_cap": 2_950_000_000_000, "history": {"revenue": []}}},
+        "sentiment_scores": {"bullish_percent": 72.5},
+        "news_articles": [{"source": "Reuters", "headline": "Apple unveils new chips", "datetime": 1_700_000_000}],
+        "stock_info": {"name": "Apple Inc.", "sector": "Technology", "avg_analyst_rating": "1.9 - Buy"},
+        "errors": [],
+    }
+
+
+def test_express_node_makes_one_call_and_emits_a_decision(gathered_state):
+    with patch("agents.express_agent.ChatOpenAI") as MockLLM:
+        MockLLM.return_value.invoke.return_value.content = DECISION_JSON
+        result = express_analysis_node(gathered_state)
+
+        assert MockLLM.return_value.invoke.call_count == 1
+        prompt = MockLLM.return_value.invoke.call_args[0][0][1].content
+        assert "- rsi: 61.99" in prompt and "- market_cap: 2.95T" in prompt
+        assert "history" not in prompt
+        assert "Apple unveils new chips" in prompt
+
+    assert result["recommendation"] == "BUY"
+    assert result["decision"]["confidence"] == "HIGH"
+
+
+def test_express_graph_skips_the_specialists():
+    assert set(express_graph.get_graph().nodes) == {"__start__", "gather_data", "express", "__end__"}
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+from services.fundamentals_service import FundamentalsService
+from services.fundamentals_store import FundamentalsStore
+
+
+def _quarters(*dates, revenue=100):
+    return [{"date": d, "revenue": revenue + i} for i, d in enumerate(dates)]
+
+
+def test_history_accumulates_as_columns(tmp_path):
+    store = FundamentalsStore(str(tmp_path), history_quarters=3)
+
+    store.save("AAPL", fmp_rows={"income_statements": _quarters("2025-06-28", "2025-03-29")})
+    store.save("AAPL", fmp_rows={"income_statements": _quarters("2025-09-27", "2025-06-28", revenue=200)})
+    store.save("AAPL", fmp_rows={"income_statements": _quarters("2025-12-27")})
+
+    reloaded = FundamentalsStore(str(tmp_path), history_quarters=3)
+    history = reloaded.load("aapl")["tables"]["income_statements"]
+    assert history["date"] == ["2025-06-28", "2025-09-27", "2025-12-27"]
+    assert history["revenue"] == [201, 200, 100]  # restated quarter takes the newer value
+
+    view = FundamentalsStore.view(reloaded.load("AAPL"))
+    assert [row["date"] for row in view["income_statements"]] == ["2025-12-27", "2025-09-27", "2025-06-28"]
+    assert view["history"]["income_statements"]["revenue"] == [201, 200, 100]
+
+
+def test_refresh_is_daily_and_tighter_near_earnings():
+    store = FundamentalsStore(None, refresh_hours=24, earnings_refresh_hours=6, earnings_window_days=2)
+    now = time.time()
+    snapshot = {"fetched_at": {"yfinance": now - 8 * 3600, "fmp": now - 2 * 3600}, "earnings_ts": now + 10 * 86400}
+
+    assert store.stale_sources(None, ["yfinance", "fmp"]) == ["yfinance", "fmp"]
+    assert store.stale_sources(snapshot, ["yfinance", "fmp"], now=now) == []
+    assert store.stale_sources({**snapshot, "earnings_ts": now + 86400}, ["yfinance", "fmp"], now=now) == ["yfinance"]
+    assert store.stale_sources(snapshot, ["yfinance", "fmp"], now=now + 86400) == ["yfinance", "fmp"]
+
+
+@pytest.mark.asyncio
+@patch("services.fundamentals_service.data_cache")
+@patch("services.fundamentals_service.settings")
+@patch("services.fundamentals_service.reference_data")
+async def test_concurrent_requests_share_one_refresh(mock_reference, mock_settings, mock_cache, tmp_path):
+    mock_cache.get.return_value = None
+    mock_settings.fmp_api_key = ""
+    reference = MagicMock(earnings_timestamp=None)
+    reference.to_fundamentals.return_value = {"pe_ratio": 30.0}
+    mock_reference.get.return_value = reference
+
+    with patch("services.fundamentals_service.fundamentals_store", FundamentalsStore(str(tmp_path))):
+        results = await asyncio.gather(*[FundamentalsService.aget_fundamentals("AAPL") for _ in range(3)])
+        later = await FundamentalsService.aget_fundamentals("AAPL")
+
+    assert all(r["yfinance"] == {"pe_ratio": 30.0} for r in [*results, later])
+    assert mock_reference.get.call_count == 1
+
+
+@pytest.mark.asyncio
+@patch("services.fundamentals_service.data_cache")
+@patch("services.fundamentals_service.settings")
+@patch("services.fundamentals_service.quota_scheduler")
+@patch("services.fundamentals_service.reference_data")
+async def test_only_stale_sources_are_fetched(mock_reference, mock_scheduler, mock_settings, mock_cache):
+    mock_cache.get.return_value = None
+    mock_settings.fmp_api_key = "key"
+    mock_scheduler.acquire = AsyncMock(return_value=True)
+    store = FundamentalsStore(None)
+    store.save("MSFT", yfinance={"pe_ratio": 35.0})
+    store._snapshots["MSFT"]["fetched_at"]["yfinance"] = time.time() - 3600
+
+    with patch("services.fundamentals_service.fundamentals_store", store), \
+         patch.object(FundamentalsService, "_fetch_fmp", AsyncMock(return_value={"ratios": _quarters("2025-09-30")})):
+        result = await FundamentalsService.aget_fundamentals("MSFT")
+
+    mock_reference.get.assert_not_called()
+    mock_scheduler.acquire.assert_awaited_once_with("fmp", cost=3)
+    assert result["yfinance"] == {"pe_ratio": 35.0}
+    assert result["ratios"]["date"] == "2025-09-30"
@@ -0,0 +1,76 @@
+import asyncio
+import httpx
+import pytest
+from services.http_transport import HttpTransport, TimeoutBudgetExceeded
+
+
+def _transport(handler, **kwargs) -> HttpTransport:
+    return HttpTransport(transport=httpx.MockTransport(handler), backoff_base=0.001, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_retries_retryable_status_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    resp = await _transport(handler, retries=2).get("https://api.example.com/data")
+
+    assert resp.status_code == 200
+    assert resp.json() == {"ok": True}
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_returns_last_response_when_retries_exhausted():
+    resp = await _transport(lambda r: httpx.Response(500), retries=1).get("https://api.example.com/data")
+    assert resp.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_status_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        return httpx.Response(404)
+
+    resp = await _transport(handler, retries=3).get("https://api.example.com/missing")
+    assert resp.status_code == 404
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_budget_covers_retries():
+    def handler(request):
+        return httpx.Response(429, headers={"Retry-After": "5"})
+
+    transport = _transport(handler, retries=5)
+    # Retry-After exceeds the remaining budget, so the 429 is returned without sleeping
+    resp = await asyncio.wait_for(transport.get("https://api.example.com/data", timeout_budget=0.5), timeout=2)
+    assert resp.status_code == 429
+
+    with pytest.raises(TimeoutBudgetExceeded):
+        await transport.get("https://api.example.com/data", timeout_budget=0)
+
+
+@pytest.mark.asyncio
+async def test_per_host_concurrency_limit():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    transport = _transport(handler, per_host_limit=2)
+    await asyncio.gather(*(transport.get("https://api.example.com/x") for _ in range(6)))
+    assert peak == 2
@@ -0,0 +1,55 @@
+from unittest.mock import patch
+import numpy as np
+from agents.sentiment_agent import sentiment_analysis_node
+from services.lexicon_sentiment import lexicon_sentiment
+
+
+def test_scores_polarity_and_negation():
+    scores = lexicon_sentiment.score_texts([
+        "Apple beats estimates as iPhone sales surge to a record",
+        "Tesla shares plunge after recall and downgrade",
+        "Company holds annual meeting in Cupertino",
+        "Results did not beat expectations",
+    ])
+
+    assert scores[0] > 0.5
+    assert scores[1] < -0.5
+    assert scores[2] == 0
+    assert scores[3] < 0
+
+
+def test_batch_matches_single_scoring():
+    texts = ["Profit growth accelerates", "Shares fall on weak guidance", ""]
+
+    batch = lexicon_sentiment.score_texts(texts)
+
+    assert np.allclose(batch, [lexicon_sentiment.score_texts([t])[0] for t in texts])
+
+
+def test_aggregate_rating():
+    result = lexicon_sentiment.score_articles([
+        {"headline": "Record revenue and strong demand", "summary": "Margins expand."},
+        {"headline": "Analysts upgrade the stock", "summary": ""},
+        {"headline": "Minor supply concerns", "summary": ""},
+    ])
+
+    assert result["rating"] == "POSITIVE"
+    assert result["counts"]["POSITIVE"] == 2
+    assert len(result["articles"]) == 3
+
+
+@patch("agents.sentiment_agent.ChatOpenAI")
+def test_fast_mode_skips_llm(mock_chat):
+    state = {
+        "ticker": "AAPL",
+        "mode": "fast",
+        "sentiment_scores": {"bullish_percent": 70, "sector_average_bullish": 55},
+        "news_articles": [{"headline": "Apple shares jump after record quarter", "source": "Reuters"}],
+        "stock_info": {"avg_analyst_rating": "1.9 - Buy"},
+    }
+
+    report = sentiment_analysis_node(state)["sentiment_report"]
+
+    mock_chat.assert_not_called()
+    assert "Rating: POSITIVE" in report
+    assert "## NEWS THEMES" in report
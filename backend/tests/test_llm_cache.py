@@ -0,0 +1,60 @@
+import time
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from services.llm_cache import LLMCache, LLMResponseStore, bypass_llm_cache
+from services.metrics import metrics
+
+
+def _model(cache, responses=("first", "second", "third")):
+    return FakeListChatModel(responses=list(responses), cache=cache)
+
+
+def test_identical_prompts_are_served_from_cache(tmp_path):
+    metrics.reset()
+    cache = LLMCache(LLMResponseStore(str(tmp_path / "llm.sqlite")))
+    llm = _model(cache.for_agent("technical"))
+
+    assert llm.invoke("Analyze AAPL").content == "first"
+    assert llm.invoke("Analyze AAPL").content == "first"
+    assert llm.invoke("Analyze MSFT").content == "second"
+
+    # A restarted process reads the same store
+    restarted = _model(LLMCache(LLMResponseStore(str(tmp_path / "llm.sqlite"))).for_agent("technical"))
+    assert restarted.invoke("Analyze AAPL").content == "first"
+
+    report = cache.report()["agents"]["technical"]
+    assert (report["hit"], report["miss"], report["hit_rate"]) == (2, 2, 0.5)
+
+
+def test_bypass_refreshes_the_entry():
+    metrics.reset()
+    cache = LLMCache(LLMResponseStore(None))
+    llm = _model(cache.for_agent("sentiment"))
+
+    llm.invoke("Summarize TSLA news")
+    with bypass_llm_cache():
+        assert llm.invoke("Summarize TSLA news").content == "second"
+    assert llm.invoke("Summarize TSLA news").content == "second"
+    assert cache.report()["agents"]["sentiment"]["bypass"] == 1
+
+
+def test_ttl_and_size_eviction():
+    store = LLMResponseStore(None, ttl_seconds=60, max_bytes=250)
+    store.put("old", "x" * 100)
+    store.put("recent", "y" * 100)
+    store.get("old")  # touch: "recent" is now least recently used
+    store.put("new", "z" * 100)
+
+    assert store.get("recent") is None
+    assert store.get("old") and store.get("new")
+
+    store._ttl = 0
+    assert store.get("new") is None
+
+
+def test_forget_last_drops_a_rejected_completion():
+    cache = LLMCache(LLMResponseStore(None))
+    llm = _model(cache.for_agent("supervisor"), ["not json", '{"ok": true}'])
+
+    assert llm.invoke("Decide on NVDA").content == "not json"
+    cache.forget_last()
+    assert llm.invoke("Decide on NVDA").content == '{"ok": true}'
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from services.llm_governor import AsyncGovernedTransport, GovernedTransport, LLMGovernor, _GovernedCall
+from services.metrics import metrics
+from services.quota_scheduler import BATCH, INTERACTIVE, priority
+
+CHAT_BODY = {"model": "gpt-4o", "messages": [{"role": "user", "content": "Analyze AAPL"}], "max_tokens": 100}
+
+
+def test_429_is_retried_under_the_governor_and_halves_concurrency():
+    metrics.reset()
+    governor = LLMGovernor(max_concurrency=8, initial_concurrency=8)
+    statuses = iter([429, 200])
+
+    def handler(request):
+        status = next(statuses)
+        return httpx.Response(status, headers={"Retry-After": "0"} if status == 429 else {}, json={"ok": status == 200})
+
+    client = httpx.Client(transport=GovernedTransport(httpx.MockTransport(handler), _GovernedCall(governor, "technical", 3)))
+    response = client.post("https://api.openai.test/v1/chat/completions", json=CHAT_BODY)
+
+    assert response.status_code == 200 and response.json() == {"ok": True}
+    report = governor.report()
+    assert report["concurrency_limit"] == 4
+    assert report["in_flight"] == 0
+    outcomes = {r["outcome"]: r["count"] for r in report["requests"] if r.get("agent") == "technical"}
+    assert outcomes == {"throttled": 1, "ok": 1}
+
+
+def test_interactive_waiters_are_admitted_before_batch():
+    governor = LLMGovernor(max_concurrency=1, initial_concurrency=1)
+    governor.acquire(10, INTERACTIVE)  # hold the only slot
+    order = []
+
+    def waiter(level):
+        governor.acquire(10, level)
+        order.append(level)
+        governor.release(0.1)
+
+    batch = threading.Thread(target=waiter, args=(BATCH,))
+    batch.start()
+    while governor.report()["queued"] < 1:
+        time.sleep(0.01)
+    interactive = threading.Thread(target=waiter, args=(INTERACTIVE,))
+    interactive.start()
+    while governor.report()["queued"] < 2:
+        time.sleep(0.01)
+
+    governor.release(0.1)
+    batch.join(2)
+    interactive.join(2)
+    assert order == [INTERACTIVE, BATCH]
+
+
+def test_token_budget_holds_requests_until_the_window_frees(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.llm_governor.time.monotonic", lambda: now[0])
+    governor = LLMGovernor(max_concurrency=8, tokens_per_minute=100)
+
+    with governor._lock:
+        assert governor._enqueue_locked(80, BATCH) is None
+        queued = governor._enqueue_locked(50, BATCH)
+    assert queued is not None and not queued.granted
+
+    now[0] += 61
+    governor.release(0.5)
+    assert queued.granted
+
+
+@pytest.mark.asyncio
+async def test_async_transport_respects_the_concurrency_limit():
+    governor = LLMGovernor(max_concurrency=2, initial_concurrency=2, latency_target_s=60)
+    active = peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return httpx.Response(200, json={})
+
+    transport = AsyncGovernedTransport(httpx.MockTransport(handler), _GovernedCall(governor, "chat", 3))
+    async with httpx.AsyncClient(transport=transport) as client:
+        with priority(INTERACTIVE):
+            responses = await asyncio.gather(*[
+                client.post("https://api.openai.test/v1/chat/completions", json=CHAT_BODY) for _ in range(6)
+            ])
+
+    assert all(r.status_code == 200 for r in responses)
+    assert peak == 2
+    assert governor.report()["in_flight"] == 0
+    assert metrics.quantile("llm_queue_wait_ms", 0.95, priority=INTERACTIVE) > 0
+
+
+def test_transient_server_and_connection_errors_are_retried(monkeypatch):
+    metrics.reset()
+    governor = LLMGovernor(max_concurrency=8, initial_concurrency=8)
+    call = _GovernedCall(governor, "supervisor", 3)
+    monkeypatch.setattr(call, "backoff", lambda attempt: 0.0)
+    failures = iter(["connect", 503])
+
+    def handler(request):
+        failure = next(failures, None)
+        if failure == "connect":
+            raise httpx.ConnectError("connection reset")
+        if failure:
+            return httpx.Response(failure, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"ok": True})
+
+    client = httpx.Client(transport=GovernedTransport(httpx.MockTransport(handler), call))
+    response = client.post("https://api.openai.test/v1/chat/completions", json=CHAT_BODY)
+
+    assert response.status_code == 200
+    report = governor.report()
+    assert report["concurrency_limit"] == 8 and report["in_flight"] == 0  # not treated as throttling
+    outcomes = {r["outcome"]: r["count"] for r in report["requests"] if r.get("agent") == "supervisor"}
+    assert outcomes == {"connection_error": 1, "error": 1, "ok": 1}
+
+
+def test_analyze_resolves_intent_at_interactive_priority():
+    from unittest.mock import patch
+    from fastapi.testclient import TestClient
+    from main import app
+    from services.quota_scheduler import current_priority
+
+    seen = []
+
+    async def resolve(query, portfolio_context):
+        seen.append(current_priority())  # the LLM intent fallback queues at this priority
+        return {"intent": "GENERIC_CHAT", "ticker": None}
+
+    async def run_analysis(**kwargs):
+        seen.append(current_priority())
+        return {"synthesis": "Hello"}
+
+    with patch("routers.analyze.EntityResolutionService.resolve", resolve), patch("routers.analyze.run_analysis", run_analysis):
+        response = TestClient(app).post("/api/analyze", json={"query": "hello there"})
+
+    assert response.status_code == 200 and response.json()["synthesis"] == "Hello"
+    assert seen == [INTERACTIVE, INTERACTIVE]
@@ -0,0 +1,77 @@
+import httpx
+from services.llm_governor import GovernedTransport, LLMGovernor, _GovernedCall
+from services.metrics import metrics
+from services.model_router import ModelRouter
+
+
+def _router():
+    return ModelRouter(
+        node_models={"technical": "gpt-4o-mini"},
+        default_model="gpt-4o",
+        fallback_model="gpt-4o-mini",
+        latency_budgets_s={"supervisor": 5.0},
+        recent=10,
+        min_samples=3,
+        probe_every=4,
+    )
+
+
+def test_nodes_use_their_configured_primary():
+    metrics.reset()
+    router = _router()
+    assert router.model_for("technical") == "gpt-4o-mini"
+    assert router.model_for("supervisor") == "gpt-4o"
+    assert router.model_for("chat") == "gpt-4o"
+
+
+def test_slow_primary_downgrades_probes_and_recovers():
+    metrics.reset()
+    router = _router()
+    for _ in range(5):
+        metrics.observe("llm_node_latency_ms", 9000, agent="supervisor", model="gpt-4o")
+
+    routed = [router.model_for("supervisor") for _ in range(8)]
+    assert routed.count("gpt-4o-mini") == 6
+    assert routed[3] == routed[7] == "gpt-4o"  # probes keep the primary's p95 current
+    assert router.report()["nodes"]["supervisor"]["downgraded"] is True
+
+    for _ in range(10):
+        metrics.observe("llm_node_latency_ms", 1200, agent="supervisor", model="gpt-4o")
+    assert router.model_for("supervisor") == "gpt-4o"
+
+
+def test_recovery_is_decided_by_probes_with_production_settings():
+    metrics.reset()
+    router = ModelRouter(node_models={}, default_model="gpt-4o", fallback_model="gpt-4o-mini",
+                         latency_budgets_s={"supervisor": 5.0})  # recent=50, probe_every=10
+
+    def call(latency_ms):
+        model = router.model_for("supervisor")
+        if model == "gpt-4o":  # what the governed transport records for the primary
+            metrics.observe("llm_node_latency_ms", latency_ms, agent="supervisor", model=model)
+        return model
+
+    slow = [call(9000) for _ in range(6)]
+    assert slow[:5] == ["gpt-4o"] * 5 and slow[5] == "gpt-4o-mini"
+
+    # Latency back to normal: two fast probes (20 calls) bring the primary back,
+    # although 48 of the primary's last 50 samples are still slow
+    fast = [call(1200) for _ in range(30)]
+    assert fast.index("gpt-4o", 10) < 20 and fast[20:] == ["gpt-4o"] * 10
+    assert router.report()["nodes"]["supervisor"]["downgraded"] is False
+
+
+def test_transport_records_latency_and_tokens_per_model():
+    metrics.reset()
+
+    def handler(request):
+        return httpx.Response(200, json={"choices": [], "usage": {"prompt_tokens": 812, "completion_tokens": 240}})
+
+    transport = GovernedTransport(httpx.MockTransport(handler), _GovernedCall(LLMGovernor(), "supervisor", 0))
+    with httpx.Client(transport=transport) as client:
+        client.post("https://api.openai.test/v1/chat/completions",
+                    json={"model": "gpt-4o", "messages": [{"role": "user", "content": "Decide on NVDA"}]})
+
+    stats = _router().report()["models"]["gpt-4o"]
+    assert (stats["prompt_tokens"], stats["completion_tokens"], stats["calls"]) == (812, 240, 1)
+    assert metrics.count("llm_node_latency_ms", agent="supervisor", model="gpt-4o") == 1
@@ -0,0 +1,55 @@
+from unittest.mock import patch
+import numpy as np
+from services.news_dedup import MinHasher, NewsDeduplicator
+
+
+def _article(headline, summary="", url=""):
+    return {"headline": headline, "summary": summary, "url": url}
+
+
+def test_reworded_syndication_is_collapsed():
+    dedup = NewsDeduplicator()
+    articles = [
+        _article("Apple shares jump after record iPhone sales in China",
+                 "Apple reported record iPhone sales in China for the holiday quarter, beating estimates.", "a"),
+        _article("Apple Shares Jump After Record iPhone Sales In China - Reuters",
+                 "Apple reported record iPhone sales in China for the holiday quarter, beating analyst estimates.", "b"),
+        _article("Fed holds rates steady", "The Federal Reserve left rates unchanged.", "c"),
+    ]
+
+    kept = dedup.dedupe("AAPL", articles)
+
+    assert [a["url"] for a in kept] == ["a", "c"]
+
+
+def test_shared_prefix_headlines_are_kept():
+    dedup = NewsDeduplicator()
+    articles = [
+        _article("Apple announces new iPhone lineup at September event"),
+        _article("Apple announces quarterly dividend increase and buyback"),
+    ]
+
+    assert len(dedup.dedupe("AAPL", articles)) == 2
+
+
+def test_batch_signatures_match_single():
+    hasher = MinHasher()
+    texts = ["market crash deepens", "tech stocks rally", "x"]
+
+    batch = hasher.signatures(texts)
+
+    for i, text in enumerate(texts):
+        assert np.array_equal(batch[i], hasher.signatures([text])[0])
+
+
+def test_seen_index_skips_rehashing_and_persists(tmp_path):
+    articles = [_article("Tesla recalls vehicles", url="t1"), _article("Tesla opens new factory", url="t2")]
+    NewsDeduplicator(state_dir=str(tmp_path)).dedupe("TSLA", articles)
+
+    restarted = NewsDeduplicator(state_dir=str(tmp_path))
+    with patch.object(restarted._hasher, "signatures", wraps=restarted._hasher.signatures) as hashed:
+        kept = restarted.dedupe("TSLA", articles + [_article("Tesla cuts prices in Europe", url="t3")])
+
+    assert len(kept) == 3
+    # Only the unseen article was fingerprinted
+    assert len(hashed.call_args[0][0]) == 1
@@ -0,0 +1,52 @@
+import json
+import time
+from services.news_store import NewsStore, published_ts
+
+
+def _article(headline, ts, url=None):
+    return {"headline": headline, "datetime": ts, "url": url or f"https://news/{headline}"}
+
+
+def test_append_skips_known_articles_and_tracks_latest():
+    store = NewsStore(None)
+    now = time.time()
+    since = now - 7 * 86400
+
+    added = store.append("AAPL", "finnhub", [_article("a", now - 300), _article("b", now - 100)], since)
+    again = store.append("AAPL", "finnhub", [_article("b", now - 100), _article("c", now - 50)], now - 100)
+
+    assert [a["headline"] for a in added] == ["a", "b"]
+    assert [a["headline"] for a in again] == ["c"]
+    assert store.fetch_since("AAPL", "finnhub", since) == now - 50
+    # Another provider, or history never fetched, starts from the requested time
+    assert store.fetch_since("AAPL", "newsapi", since) == since
+    assert store.fetch_since("AAPL", "finnhub", since - 86400) == since - 86400
+
+
+def test_window_is_newest_first_and_bounded():
+    store = NewsStore(None)
+    now = time.time()
+    store.append("AAPL", "finnhub", [_article("old", now - 10 * 86400), _article("x", now - 60), _article("y", now - 30)], now - 11 * 86400)
+
+    assert [a["headline"] for a in store.window("AAPL", now - 7 * 86400)] == ["y", "x"]
+
+
+def test_store_survives_restart_and_compacts(tmp_path):
+    now = time.time()
+    store = NewsStore(str(tmp_path), retention_days=30)
+    for i in range(5):
+        store.append("TSLA", "newsapi", [_article(f"s{i}", now - 40 * 86400)], now - 41 * 86400)
+    store.append("TSLA", "newsapi", [_article("fresh", now - 60)], now - 120)
+
+    restarted = NewsStore(str(tmp_path), retention_days=30)
+
+    assert [a["headline"] for a in restarted.window("TSLA", 0)] == ["fresh"]
+    assert restarted.fetch_since("TSLA", "newsapi", now - 86400) == now - 60
+    lines = [json.loads(l) for l in (tmp_path / "TSLA.jsonl").read_text().splitlines()]
+    assert len(lines) == 2  # coverage record + the one live article
+
+
+def test_published_ts_handles_both_providers():
+    assert published_ts({"datetime": 1700000000}) == 1700000000
+    assert published_ts({"datetime": "2023-11-14T22:13:20Z"}) == 1700000000
+    assert published_ts({"datetime": "not a date"}) == 0.0
@@ -0,0 +1,60 @@
+import json
+import re
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+from services.news_summary_service import NewsSummaryService
+from services.tokens import fit_lines
+
+
+def _articles(n):
+    return [{"headline": f"Story {i}", "summary": f"Details {i}", "url": f"https://news/{i}"} for i in range(n)]
+
+
+def _fake_llm():
+    """ChatOpenAI stand-in that summarizes every numbered article in the prompt."""
+    def respond(messages):
+        ids = re.findall(r"^\[(\d+)\]", messages[1].content, re.MULTILINE)
+        return MagicMock(content=json.dumps({"summaries": [{"id": int(i), "summary": f"digest {i}"} for i in ids]}))
+
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=respond)
+    return llm
+
+
+@pytest.mark.asyncio
+@patch("services.news_summary_service.ChatOpenAI")
+async def test_batches_and_caches_across_requests(mock_chat, tmp_path):
+    llm = _fake_llm()
+    mock_chat.return_value = llm
+    service = NewsSummaryService(str(tmp_path / "digests.jsonl"), batch_size=8)
+
+    first = await service.summarize(_articles(10))
+    second = await service.summarize(_articles(10))
+
+    assert len(first) == 10 and first == second
+    assert llm.ainvoke.await_count == 2  # 8 + 2, and nothing for the repeat
+
+    restarted = NewsSummaryService(str(tmp_path / "digests.jsonl"))
+    assert restarted.cached("https://news/9") == first["https://news/9"]
+
+
+@pytest.mark.asyncio
+@patch("services.news_summary_service.ChatOpenAI")
+async def test_attach_falls_back_to_headlines_on_failure(mock_chat):
+    mock_chat.return_value.ainvoke = AsyncMock(side_effect=RuntimeError("upstream down"))
+    service = NewsSummaryService(None)
+    articles = _articles(3)
+
+    enriched = await service.attach(articles)
+
+    assert enriched == articles
+    assert service.cached("https://news/0") is None
+
+
+def test_fit_lines_respects_budget():
+    lines = [f"{i}. " + "word " * 20 for i in range(10)]
+
+    kept = fit_lines(lines, budget=60)
+
+    assert 1 <= len(kept) < len(lines)
+    assert kept == lines[:len(kept)]
@@ -0,0 +1,64 @@
+from langchain_core.prompts import ChatPromptTemplate
+from services.metrics import metrics
+from services.prompt_budget import PromptBudget, compact_number, rank_headlines, truncate_tokens
+from services.tokens import count_tokens
+
+
+def test_compact_number():
+    assert compact_number(63.12345678) == "63.12"
+    assert compact_number(391035000000) == "391B"
+    assert compact_number(2_850_000_000_000) == "2.85T"
+    assert compact_number(12345.6) == "12.35K"
+    assert compact_number(0.000012345) == "0.000012"
+    assert compact_number(None) == "N/A"
+    assert compact_number(float("nan")) == "N/A"
+    assert compact_number("N/A") == "N/A"
+
+
+def test_rank_headlines_prefers_recent_named_articles():
+    now = 1_700_000_000
+    articles = [
+        {"headline": "Markets drift ahead of Fed", "datetime": now - 3600},
+        {"headline": "Apple beats on services revenue", "datetime": now - 7200},
+        {"headline": "Old Apple supplier story", "datetime": now - 30 * 86400},
+    ]
+    ranked = rank_headlines(articles, "AAPL", "Apple Inc.", now=now)
+    assert [a["headline"] for a in ranked][0] == "Apple beats on services revenue"
+    assert ranked[-1]["headline"] == "Old Apple supplier story"
+
+
+def test_one_letter_ticker_and_generic_names_boost_only_real_mentions():
+    now = 1_700_000_000
+    articles = [
+        {"headline": "A Fed pause lifts stocks", "datetime": now - 3600},
+        {"headline": "Ford (F) recalls 200,000 trucks", "datetime": now - 5 * 3600},
+        {"headline": "Traders eye the Trade Desk earnings", "datetime": now - 4 * 3600},
+    ]
+    ranked = [a["headline"] for a in rank_headlines(articles, "F", "Ford Motor Company", now=now)]
+    assert ranked == ["Ford (F) recalls 200,000 trucks", "A Fed pause lifts stocks", "Traders eye the Trade Desk earnings"]
+
+    ranked = [a["headline"] for a in rank_headlines(articles, "TTD", "The Trade Desk", now=now)]
+    assert ranked[0] == "Traders eye the Trade Desk earnings"  # "Trade", not "The"
+
+
+def test_render_trims_shrinkable_variables_to_the_ceiling():
+    metrics.reset()
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are a careful analyst."),
+        ("human", "Ticker: {ticker}\n\nReport A:\n{a}\n\nReport B:\n{b}"),
+    ])
+    report = "\n".join(f"Line {i}: the quick brown fox jumps over the lazy dog." for i in range(80))
+    budget = PromptBudget({"supervisor": 400})
+
+    messages = budget.render("supervisor", prompt, {"ticker": "NVDA", "a": report, "b": report[:400]},
+                             shrink=("a", "b"))
+
+    assert sum(count_tokens(m.content) + 4 for m in messages) <= 400
+    assert "Ticker: NVDA" in messages[1].content
+    assert metrics.counter("prompt_trimmed", agent="supervisor") == 1
+    assert metrics.counter("prompt_over_ceiling", agent="supervisor") == 0
+
+
+def test_truncate_tokens_keeps_short_text():
+    assert truncate_tokens("short", 50) == "short"
+    assert count_tokens(truncate_tokens("word " * 500, 20)) <= 22
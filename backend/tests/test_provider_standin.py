@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+from tools.provider_standin import create_app
+
+QUIET_PROFILE = {"default": {"latency": {"distribution": "fixed", "ms": 0}, "error_rate": 0.0, "rate_limit": None}}
+
+
+def test_replays_fixture_with_ticker_and_recent_timestamps():
+    client = TestClient(create_app(QUIET_PROFILE, seed=1))
+    # finnhub-python joins its base URL and path with a double slash
+    resp = client.get("/finnhub//company-news", params={"symbol": "MSFT", "from": "2024-01-01", "to": "2024-01-08"})
+    assert resp.status_code == 200
+    articles = resp.json()
+    assert articles and all("{ticker}" not in a["headline"] for a in articles)
+    assert any("MSFT" in a["headline"] for a in articles)
+    assert all(isinstance(a["datetime"], int) for a in articles)
+
+
+def test_rate_limit_returns_429_with_retry_after():
+    profile = {**QUIET_PROFILE, "fmp": {"rate_limit": {"calls": 2, "window_s": 60}}}
+    client = TestClient(create_app(profile, seed=1))
+
+    statuses = [client.get("/fmp/api/v3/ratios/AAPL", params={"limit": 1}).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert client.get("/fmp/api/v3/ratios/AAPL").headers["Retry-After"]
+    assert client.get("/_standin/stats").json()["fmp"]["rate_limited"] == 2
+
+
+def test_error_rate_injects_server_errors():
+    profile = {**QUIET_PROFILE, "newsapi": {"error_rate": 1.0}}
+    client = TestClient(create_app(profile, seed=1))
+    assert client.get("/newsapi/v2/everything", params={"q": "AAPL"}).status_code >= 500
+
+
+def test_openai_chat_routes_by_system_prompt():
+    client = TestClient(create_app(QUIET_PROFILE, seed=1))
+    resp = client.post("/openai/chat/completions", json={
+        "model": "gpt-4o",
+        "messages": [
+            {"role": "system", "content": "You are the Chief Investment Strategist ... ## OUTPUT FORMAT — MANDATORY"},
+            {"role": "user", "content": "Synthesize"},
+        ],
+    })
+    body = resp.json()
+    assert body["object"] == "chat.completion"
+    assert '"action"' in body["choices"][0]["message"]["content"]
+    assert body["usage"]["total_tokens"] > 0
+
+
+def test_massive_aggregates_are_deterministic():
+    client = TestClient(create_app(QUIET_PROFILE, seed=1))
+    full_year = client.get("/massive/v2/aggs/ticker/AAPL/range/1/day/2024-01-01/2024-12-31").json()["results"]
+    last_month = client.get("/massive/v2/aggs/ticker/AAPL/range/1/day/2024-12-01/2024-12-31").json()["results"]
+    assert len(full_year) > 200
+    assert full_year[-len(last_month):] == last_month
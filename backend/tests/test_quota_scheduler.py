@@ -0,0 +1,97 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from services.quota_scheduler import (
+    BACKGROUND, BATCH, INTERACTIVE, MARKET_TZ, QuotaScheduler, current_priority, priority,
+)
+from services.rate_limiter import RateLimiter
+
+
+def _scheduler(elapsed: float = 1.0, **kwargs) -> QuotaScheduler:
+    limiter = RateLimiter(limits={"fmp": (10, 86400), "finnhub": (60, 60)})
+    scheduler = QuotaScheduler(limiter, interactive_reserve=0.3, batch_reserve=0.5, pace_burst=0, **kwargs)
+    scheduler.trading_day_elapsed = lambda now=None: elapsed
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_background_leaves_interactive_reserve():
+    scheduler = _scheduler()
+
+    admitted = [await scheduler.acquire("fmp", level=BACKGROUND) for _ in range(10)]
+
+    assert admitted.count(True) == 7
+    # The reserved 30% is still there for users
+    assert all([await scheduler.acquire("fmp", level=INTERACTIVE) for _ in range(3)])
+    assert await scheduler.acquire("fmp", level=INTERACTIVE) is False
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_less_than_background():
+    scheduler = _scheduler()
+
+    admitted = [await scheduler.acquire("fmp", level=BATCH) for _ in range(10)]
+
+    assert admitted.count(True) == 5
+
+
+@pytest.mark.asyncio
+async def test_background_paced_across_trading_day():
+    scheduler = _scheduler(elapsed=0.5)
+
+    admitted = [await scheduler.acquire("fmp", level=BACKGROUND) for _ in range(10)]
+
+    # Half the day gone: half of the unreserved 7 calls
+    assert admitted.count(True) == 3
+    assert await scheduler.acquire("fmp", level=INTERACTIVE) is True
+
+
+@pytest.mark.asyncio
+async def test_priority_context_propagates_to_tasks():
+    seen = []
+
+    async def worker():
+        seen.append(current_priority())
+
+    with priority(INTERACTIVE):
+        await asyncio.gather(worker(), asyncio.to_thread(lambda: seen.append(current_priority())))
+
+    assert seen == [INTERACTIVE, INTERACTIVE]
+    assert current_priority() == BACKGROUND
+
+
+@pytest.mark.asyncio
+async def test_pacing_ignores_calls_from_before_the_session_opened():
+    scheduler = _scheduler(elapsed=0.3)
+    scheduler.session_open = lambda now=None: datetime.now(timezone.utc) - timedelta(minutes=10)
+    for _ in range(4):  # yesterday afternoon, still inside the 24h quota window
+        scheduler._limiter._store.record("fmp", 10, time.time() - 7200)
+
+    admitted = [await scheduler.acquire("fmp", level=BACKGROUND) for _ in range(5)]
+
+    # 30% into the session: 2 of the unreserved 7, and the interactive reserve stays free
+    assert admitted.count(True) == 2
+    assert all([await scheduler.acquire("fmp", level=INTERACTIVE) for _ in range(3)])
+
+
+def test_trading_day_elapsed():
+    midday = datetime(2026, 3, 4, 12, 45, tzinfo=MARKET_TZ)  # Wednesday
+    assert QuotaScheduler.trading_day_elapsed(midday) == pytest.approx(0.5)
+    # Pre-open is still the previous session's post-close
+    assert QuotaScheduler.trading_day_elapsed(midday.replace(hour=8)) == 1.0
+    assert QuotaScheduler.session_open(midday.replace(hour=8)).day == 3
+    assert QuotaScheduler.session_open(datetime(2026, 3, 9, 8, tzinfo=MARKET_TZ)).day == 6  # Monday pre-open -> Friday
+    assert QuotaScheduler.trading_day_elapsed(datetime(2026, 3, 7, 12, tzinfo=MARKET_TZ)) == 1.0  # Saturday
+
+
+def test_report_projects_exhaustion():
+    scheduler = _scheduler()
+    scheduler._limiter.try_acquire("fmp", cost=4)
+
+    report = scheduler.report()["sources"]["fmp"]
+
+    assert report["remaining"] == 6
+    assert report["reserved_for_interactive"] == 3
+    # 4 calls in the last minute: the other 6 last another ~90 s
+    assert scheduler.projected_exhaustion("fmp", rate_window_s=60) is not None
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from services.quote_service import QuoteService
+from services.robinhood_service import RobinhoodService
+
+
+def _fake_fetch(calls):
+    def fetch(symbols):
+        calls.append(list(symbols))
+        return {s: {"symbol": s, "price": 100.0 + len(s), "change_percent": 1.5, "provider": "test"} for s in symbols}
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_batched_and_coalesced():
+    service = QuoteService(ttl_seconds=0.5, batch_window_ms=20)
+    calls = []
+    with patch.object(service, "_fetch_batch", side_effect=_fake_fetch(calls)):
+        a, b, c = await asyncio.gather(
+            service.get_quotes(["AAPL", "MSFT"]),
+            service.get_quotes(["msft", "NVDA"]),
+            service.get_quote("AAPL"),
+        )
+
+    assert len(calls) == 1
+    assert sorted(calls[0]) == ["AAPL", "MSFT", "NVDA"]
+    assert a["MSFT"] is b["MSFT"]
+    assert c["price"] == 104.0
+
+
+@pytest.mark.asyncio
+async def test_micro_cache_expires():
+    service = QuoteService(ttl_seconds=0.05, batch_window_ms=1)
+    calls = []
+    with patch.object(service, "_fetch_batch", side_effect=_fake_fetch(calls)):
+        await service.get_quotes(["AAPL"])
+        await service.get_quotes(["AAPL"])
+        assert len(calls) == 1
+
+        await asyncio.sleep(0.06)
+        await service.get_quotes(["AAPL"])
+        assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_symbols_resolve_to_none():
+    service = QuoteService(batch_window_ms=1)
+    with patch.object(service, "_fetch_batch", return_value={}):
+        assert await service.get_quotes(["ZZZZ"]) == {"ZZZZ": None}
+
+
+@pytest.mark.asyncio
+async def test_portfolio_valuation_reprices_snapshot(monkeypatch):
+    monkeypatch.setattr(RobinhoodService, "_holdings_snapshot", [
+        {"symbol": "AAPL", "name": "Apple", "price": 150.0, "quantity": 10.0, "value": 1500.0,
+         "change": 50.0, "average_buy_price": 100.0, "asset_type": "stock"},
+        {"symbol": "BTC", "name": "Bitcoin", "price": 500.0, "quantity": 1.0, "value": 500.0,
+         "change": 0.0, "asset_type": "crypto"},
+    ])
+    quotes = {"AAPL": {"symbol": "AAPL", "price": 200.0, "change_percent": 2.0}}
+
+    with patch("services.robinhood_service.quote_service.get_quotes", return_value=quotes) as mock_quotes, \
+         patch("services.robinhood_service.rh") as mock_rh:
+        mock_rh.get_crypto_quote.return_value = {"mark_price": "1000.00"}
+        portfolio = await RobinhoodService.get_portfolio_valuation()
+
+    # BTC is also an ETF ticker: crypto must never reach the stock quote path
+    mock_quotes.assert_called_once_with(["AAPL"])
+    mock_rh.get_crypto_quote.assert_called_once_with("BTC")
+    mock_rh.build_holdings.assert_not_called()
+    aapl = next(p for p in portfolio if p["symbol"] == "AAPL")
+    btc = next(p for p in portfolio if p["symbol"] == "BTC")
+    assert aapl["value"] == 2000.0
+    assert aapl["unrealized_pnl"] == 1000.0
+    assert aapl["change"] == 100.0  # vs average buy price, as in the holdings build; not intraday
+    assert btc["value"] == 1000.0 and btc["change"] == 0.0
+    assert aapl["allocation_pct"] == pytest.approx(66.67, abs=0.01)
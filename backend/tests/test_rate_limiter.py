@@ -0,0 +1,108 @@
+import multiprocessing
+import time
+import pytest
+from services.rate_limiter import MmapWindowStore, RateLimiter
+
+
+def test_try_acquire_enforces_window():
+    limiter = RateLimiter(limits={"src": (3, 60)})
+
+    assert all(limiter.try_acquire("src") for _ in range(3))
+    assert limiter.try_acquire("src") is False
+    assert 59 < limiter.wait_time("src") <= 60
+
+
+def test_expired_calls_free_capacity():
+    limiter = RateLimiter(limits={"src": (2, 60)})
+    limiter._store.load("src", 2, [time.time() - 120, time.time() - 90])
+
+    assert limiter.try_acquire("src") is True
+    assert limiter.usage("src")["used"] == 1
+
+
+def test_cost_counts_against_quota():
+    limiter = RateLimiter(limits={"src": (5, 60)})
+
+    assert limiter.try_acquire("src", cost=3) is True
+    assert limiter.try_acquire("src", cost=3) is False
+    assert limiter.try_acquire("src", cost=2) is True
+    assert limiter.wait_time("src", cost=10) == float("inf")
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_capacity():
+    limiter = RateLimiter(limits={"src": (1, 1)})
+    limiter._store.load("src", 1, [time.time() - 0.9])
+
+    start = time.monotonic()
+    assert await limiter.acquire("src", timeout=2) is True
+    assert 0.05 < time.monotonic() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_acquire_gives_up_without_sleeping_when_quota_exhausted():
+    limiter = RateLimiter(limits={"src": (1, 86400)})
+    limiter.try_acquire("src")
+
+    start = time.monotonic()
+    assert await limiter.acquire("src", timeout=5) is False
+    assert time.monotonic() - start < 0.1
+
+
+def test_daily_quota_survives_restart(tmp_path):
+    state_path = str(tmp_path / "rate_limits.json")
+    limits = {"daily": (2, 86400), "minute": (2, 60)}
+    limiter = RateLimiter(limits=limits, state_path=state_path)
+    limiter.try_acquire("daily", cost=2)
+    limiter.try_acquire("minute")
+
+    restarted = RateLimiter(limits=limits, state_path=state_path)
+
+    assert restarted.can_call("daily") is False
+    assert restarted.usage("minute")["used"] == 0
+
+
+def test_headroom_holds_quota_back():
+    limiter = RateLimiter(limits={"src": (5, 60)})
+
+    assert limiter.try_acquire("src", cost=2, headroom=3) is True
+    assert limiter.try_acquire("src", headroom=3) is False
+    assert limiter.try_acquire("src", cost=3) is True
+
+
+def test_mmap_store_shares_budget_between_limiters(tmp_path):
+    limits = {"src": (3, 60)}
+    first = RateLimiter(limits=limits, store=MmapWindowStore(str(tmp_path)))
+    second = RateLimiter(limits=limits, store=MmapWindowStore(str(tmp_path)))
+
+    assert first.try_acquire("src", cost=2) is True
+    assert second.try_acquire("src") is True
+    assert first.try_acquire("src") is False
+    assert second.usage("src")["used"] == 3
+
+
+def test_mmap_store_resizes_when_limit_changes(tmp_path):
+    RateLimiter(limits={"src": (3, 86400)}, store=MmapWindowStore(str(tmp_path))).try_acquire("src", cost=3)
+
+    resized = RateLimiter(limits={"src": (5, 86400)}, store=MmapWindowStore(str(tmp_path)))
+
+    assert resized.usage("src")["used"] == 3
+    assert resized.try_acquire("src", cost=2) is True
+    assert resized.try_acquire("src") is False
+
+
+def _hammer(directory, admitted):
+    limiter = RateLimiter(limits={"src": (50, 60)}, store=MmapWindowStore(directory))
+    admitted.put(sum(limiter.try_acquire("src") for _ in range(40)))
+
+
+def test_mmap_store_enforces_one_budget_across_processes(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    admitted = ctx.Queue()
+    workers = [ctx.Process(target=_hammer, args=(str(tmp_path), admitted)) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(10)
+
+    assert sum(admitted.get(timeout=5) for _ in workers) == 50
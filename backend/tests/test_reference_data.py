@@ -0,0 +1,51 @@
+from unittest.mock import MagicMock, patch
+from services.reference_data_service import ReferenceDataStore, TickerReference
+
+SAMPLE_INFO = {
+    "longName": "Apple Inc.",
+    "sector": "Technology",
+    "industry": "Consumer Electronics",
+    "quoteType": "EQUITY",
+    "marketCap": 3_000_000_000_000,
+    "trailingPE": "Infinity",  # yfinance sometimes returns strings for numeric fields
+    "forwardPE": 28.5,
+    "grossMargins": 0.45,
+    "averageAnalystRating": "1.9 - Buy",
+}
+
+
+def test_from_info_normalizes_fields():
+    ref = TickerReference.from_info("AAPL", SAMPLE_INFO)
+    assert ref.name == "Apple Inc."
+    assert ref.pe_ratio is None
+    assert ref.forward_pe == 28.5
+    assert ref.to_stock_info()["avg_analyst_rating"] == "1.9 - Buy"
+    assert ref.to_fundamentals()["gross_margins"] == 0.45
+
+
+@patch("services.reference_data_service.yf.Ticker")
+def test_info_fetched_once_per_ticker(mock_ticker):
+    """Stock info and fundamentals share a single .info download."""
+    mock_ticker.return_value = MagicMock(info=SAMPLE_INFO)
+    store = ReferenceDataStore(ttl_seconds=60)
+
+    first = store.get("aapl")
+    second = store.get("AAPL")
+
+    assert first is second
+    mock_ticker.assert_called_once_with("AAPL")
+
+
+@patch("services.reference_data_service.yf.Ticker")
+def test_bulk_refresh(mock_ticker):
+    mock_ticker.side_effect = lambda t: MagicMock(info={"longName": f"{t} Corp"})
+    store = ReferenceDataStore(ttl_seconds=60)
+
+    refreshed = store.refresh(["msft", "NVDA", "MSFT"])
+
+    assert set(refreshed) == {"MSFT", "NVDA"}
+    assert refreshed["NVDA"].name == "NVDA Corp"
+    assert mock_ticker.call_count == 2
+    # Subsequent reads are served from the store
+    store.get("MSFT")
+    assert mock_ticker.call_count == 2
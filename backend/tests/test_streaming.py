@@ -55,3 +55,49 @@ async def test_analyze_stream_portfolio_qa():
         assert "event: status" in content
         assert "event: result" in content
         assert "event: done" in content
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_the_running_analysis():
+    import asyncio
+    from unittest.mock import patch
+    from models.schemas import AnalyzeRequest
+    from routers.analyze import _analysis_events
+    from services.cancellation import CancelToken, is_cancelled
+
+    seen = {}
+
+    async def slow_stream(**kwargs):
+        yield {"event": "status", "data": json.dumps({"status": "resolving_intent"})}
+        try:
+            await asyncio.sleep(60)  # a graph node still working
+        except asyncio.CancelledError:
+            seen["cancelled"] = True
+            seen["token_set"] = is_cancelled()
+            raise
+        yield {"event": "done", "data": "[DONE]"}
+
+    token = CancelToken()
+    with patch("routers.analyze.run_analysis_stream", slow_stream):
+        events = _analysis_events(AnalyzeRequest(query="analyze AAPL"), token, "trace")
+        assert (await events.__anext__())["event"] == "status"
+        await events.aclose()  # what the SSE response does once the client is gone
+        await asyncio.sleep(0)
+
+    assert token.cancelled and seen == {"cancelled": True, "token_set": True}
+
+
+def test_cancelled_request_makes_no_further_llm_calls():
+    import httpx
+    from services.cancellation import CancelToken, RequestCancelled, cancel_scope
+    from services.llm_governor import GovernedTransport, LLMGovernor, _GovernedCall
+
+    calls = []
+    transport = GovernedTransport(httpx.MockTransport(lambda request: calls.append(request) or httpx.Response(200, json={})),
+                                  _GovernedCall(LLMGovernor(), "supervisor", 0))
+    token = CancelToken()
+    token.cancel("client disconnected")
+    with cancel_scope(token), httpx.Client(transport=transport) as http:
+        with pytest.raises(RequestCancelled):
+            http.post("https://api.openai.test/v1/chat/completions", json={"model": "gpt-4o", "messages": []})
+    assert calls == []
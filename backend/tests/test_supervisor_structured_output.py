@@ -84,3 +84,58 @@ def test_structured_supervisor_node(mock_state):
         assert result["recommendation"] == "BUY"
         assert result["confidence"] == "HIGH"
         assert result["synthesis"] == "Strong technicals and fundamentals align."
+
+def test_schema_is_requested_and_truncated_output_repaired_locally(mock_state):
+    """A cut-off response with lowercase enums is fixed without a second LLM call."""
+    settings.ENABLE_STRUCTURED_OUTPUTS = True
+    truncated = SAMPLE_JSON_OUTPUT.replace('"BUY"', '"buy"').split('"position_sizing"')[0] + '"position_siz'
+
+    with patch("agents.supervisor_agent.ChatOpenAI") as MockLLM:
+        mock_instance = MockLLM.return_value
+        mock_instance.invoke.return_value.content = truncated
+
+        result = supervisor_node(mock_state)
+
+        assert mock_instance.invoke.call_count == 1
+        response_format = mock_instance.invoke.call_args.kwargs["response_format"]
+        assert response_format["json_schema"]["schema"]["properties"]["action"]["enum"] == ["BUY", "HOLD", "SELL"]
+        assert response_format["json_schema"]["strict"] is True
+        assert result["recommendation"] == "BUY"
+        assert result["catalysts"] == ["Earnings report"]
+
+def test_repair_drops_only_structural_trailing_commas():
+    from services.json_repair import repair_json
+
+    text = '{"thesis": "Margins (ex-items, ]) widened, }", "risks": ["FX", ], }'
+    assert repair_json(text) == {"thesis": "Margins (ex-items, ]) widened, }", "risks": ["FX"]}
+    # Truncated mid-array, with the same text in an earlier value
+    assert repair_json('{"thesis": "Margins (ex-items, ]) widened", "risks": ["FX", "Rates",') == \
+        {"thesis": "Margins (ex-items, ]) widened", "risks": ["FX", "Rates"]}
+
+def test_decision_schema_is_strict_mode_compatible():
+    from agents.supervisor_agent import _DECISION_RESPONSE_FORMAT
+
+    schema = _DECISION_RESPONSE_FORMAT["json_schema"]["schema"]
+    objects = [schema] + list(schema["$defs"].values())
+    for obj in objects:
+        assert obj["additionalProperties"] is False
+        assert sorted(obj["required"]) == sorted(obj["properties"])
+    assert schema["properties"]["price_target"]["anyOf"][1] == {"type": "null"}
+    for keyword in ("default", "minItems", "maxItems"):
+        assert f'"{keyword}"' not in json.dumps(schema)
+
+def test_unrepairable_output_falls_back_to_llm_retry(mock_state):
+    settings.ENABLE_STRUCTURED_OUTPUTS = True
+
+    with patch("agents.supervisor_agent.ChatOpenAI") as MockLLM:
+        mock_instance = MockLLM.return_value
+        mock_instance.invoke.side_effect = [
+            MagicMock(content="I think you should buy."),
+            MagicMock(content=SAMPLE_JSON_OUTPUT),
+        ]
+
+        result = supervisor_node(mock_state)
+
+        assert mock_instance.invoke.call_count == 2
+        assert "previous output was invalid" in mock_instance.invoke.call_args.args[0][-1].content
+        assert result["decision"]["action"] == "BUY"
@@ -0,0 +1,78 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+from agents.orchestrator import run_analysis
+from services.symbol_master import SymbolMaster
+
+
+@pytest.mark.asyncio
+@patch("services.symbol_master.reference_data")
+async def test_master_symbols_and_aliases_need_no_lookup(mock_reference):
+    master = SymbolMaster()
+
+    aapl = await master.validate("aapl")
+    berkshire = await master.validate("BRK-B")
+
+    assert aapl.valid and aapl.record.name == "Apple Inc."
+    assert berkshire.valid and berkshire.symbol == "BRK.B"
+    mock_reference.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("services.symbol_master.reference_data")
+async def test_typo_is_negatively_cached_with_suggestions(mock_reference):
+    mock_reference.get.return_value = MagicMock(quote_type=None)
+    master = SymbolMaster()
+
+    first = await master.validate("APPL")
+    second = await master.validate("APPL")
+
+    assert not first.valid and not second.valid
+    assert "AAPL" in [s.symbol for s in first.suggestions]
+    assert "Did you mean AAPL (Apple Inc.)" in first.message()
+    assert second.source == "negative_cache"
+    assert mock_reference.get.call_count == 1
+
+
+@pytest.mark.asyncio
+@patch("services.symbol_master.reference_data")
+async def test_unlisted_symbol_confirmed_by_provider(mock_reference):
+    mock_reference.get.return_value = MagicMock(quote_type="EQUITY", exchange="NMS")
+    mock_reference.get.return_value.name = "Example Corp"
+    master = SymbolMaster()
+
+    result = await master.validate("EXMP")
+    again = await master.validate("EXMP")
+
+    assert result.valid and result.source == "provider"
+    assert again.source == "master"
+    assert mock_reference.get.call_count == 1
+
+
+@pytest.mark.asyncio
+@patch("agents.orchestrator.analysis_graph")
+@patch("agents.orchestrator.symbol_master")
+@patch("agents.orchestrator.EntityResolutionService")
+async def test_unknown_ticker_never_reaches_the_graph(mock_resolver, mock_master, mock_graph):
+    mock_resolver.resolve = AsyncMock(return_value={"intent": "TICKER_ANALYSIS", "ticker": "APPL", "confidence": 0.9, "method": "regex_command"})
+    master = SymbolMaster(strict=True)
+    mock_master.validate = master.validate
+
+    result = await run_analysis("analyze APPL", None, [], [])
+
+    mock_graph.ainvoke.assert_not_called()
+    assert result["ticker"] is None
+    assert "AAPL" in result["synthesis"]
+
+
+@pytest.mark.asyncio
+@patch("agents.orchestrator.analysis_graph")
+@patch("agents.orchestrator.symbol_master", SymbolMaster(strict=True))
+@patch("agents.orchestrator.EntityResolutionService")
+async def test_alias_is_analyzed_under_its_canonical_symbol(mock_resolver, mock_graph):
+    mock_resolver.resolve = AsyncMock(return_value={"intent": "TICKER_ANALYSIS", "ticker": "FB", "confidence": 0.9, "method": "regex_command"})
+    mock_graph.ainvoke = AsyncMock(side_effect=lambda state: state)
+
+    result = await run_analysis("analyze FB", None, [], [])
+
+    assert mock_graph.ainvoke.await_args.args[0]["ticker"] == "META"
+    assert result["ticker"] == "META"
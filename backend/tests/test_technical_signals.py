@@ -0,0 +1,70 @@
+from unittest.mock import patch
+from agents.technical_agent import technical_analysis_node
+from services.technical_signals import TechnicalSignalEngine, technical_signals
+
+UPTREND = {
+    "current_price": 110.0, "sma_50": 104.0, "sma_200": 95.0,
+    "ichimoku_conv": 108.0, "ichimoku_base": 105.0, "ichimoku_span_a": 101.0, "ichimoku_span_b": 99.0,
+    "adx": 31.0, "adx_pos": 28.0, "adx_neg": 14.0,
+    "rsi": 62.0, "stoch_k": 0.7, "macd_hist": 0.8, "williams_r": -30.0,
+    "atr": 2.2, "bb_upper": 114.0, "bb_lower": 100.0, "kc_upper": 113.0, "kc_lower": 101.0,
+    "cmf": 0.12, "pivot_point": 108.0, "r1": 111.0, "s1": 106.0,
+}
+
+
+def _mirror(indicators):
+    """Reflect prices around 100 and flip the oscillators: an equivalent downtrend."""
+    out = {k: 200.0 - v for k, v in indicators.items()}
+    out.update({
+        "adx": indicators["adx"], "adx_pos": indicators["adx_neg"], "adx_neg": indicators["adx_pos"],
+        "rsi": 100 - indicators["rsi"], "stoch_k": 1 - indicators["stoch_k"], "macd_hist": -indicators["macd_hist"],
+        "williams_r": -100 - indicators["williams_r"], "atr": indicators["atr"], "cmf": -indicators["cmf"],
+        "r1": 200.0 - indicators["s1"], "s1": 200.0 - indicators["r1"],
+        "bb_upper": 200.0 - indicators["bb_lower"], "bb_lower": 200.0 - indicators["bb_upper"],
+        "kc_upper": 200.0 - indicators["kc_lower"], "kc_lower": 200.0 - indicators["kc_upper"],
+    })
+    return out
+
+
+def test_trend_rules_are_symmetric():
+    up = technical_signals.evaluate(UPTREND)
+    down = technical_signals.evaluate(_mirror(UPTREND))
+
+    assert (up["rating"], up["conviction"], up["trend_strength"]) == ("BULLISH", "HIGH", "TRENDING")
+    assert down["rating"] == "BEARISH"
+    assert down["composite"] == -up["composite"]
+
+
+def test_nan_indicators_count_as_missing():
+    # Under 200 bars or with a flat Stoch RSI the indicator frame yields NaN for these
+    missing = ("sma_200", "rsi", "stoch_k", "williams_r", "cmf", "adx")
+    with_nan = technical_signals.evaluate(dict(UPTREND, **{k: float("nan") for k in missing}))
+    absent = technical_signals.evaluate({k: v for k, v in UPTREND.items() if k not in missing})
+
+    assert with_nan == absent
+    assert with_nan["scores"]["volume"] is None and with_nan["trend_strength"] == "DEVELOPING"
+    assert not any("nan" in signal for signal in with_nan["signals"])
+
+
+def test_overbought_and_squeeze_regimes():
+    stretched = dict(UPTREND, rsi=78.0, stoch_k=0.95)
+    result = technical_signals.evaluate(stretched)
+    assert result["momentum_extension"] == "OVERBOUGHT"
+    assert result["composite"] < technical_signals.evaluate(dict(UPTREND, rsi=69.0, stoch_k=0.79))["composite"]
+
+    squeeze = technical_signals.evaluate(dict(UPTREND, bb_upper=112.0, bb_lower=104.0))
+    assert squeeze["volatility_regime"] == "SQUEEZE"
+
+
+def test_partial_and_empty_indicators():
+    assert technical_signals.evaluate({}) == {}
+    assert TechnicalSignalEngine.summary_block({}) == "Unavailable."
+    partial = technical_signals.evaluate({"current_price": 50.0, "rsi": 25.0})
+    assert partial["scores"]["trend"] is None and partial["rating"] == "BEARISH"
+
+
+def test_skip_technical_llm_uses_the_rules_engine():
+    with patch("agents.technical_agent.ChatOpenAI") as MockLLM:
+        result = technical_analysis_node({"ticker": "AAPL", "technical_indicators": UPTREND, "skip_technical_llm": True})
+    MockLLM.assert_not_called()
+    assert "Primary Signal**: BULLISH" in result["technical_report"]
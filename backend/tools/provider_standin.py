@@ -0,0 +1,396 @@
+"""
+Offline stand-in for every external provider the backend calls
+(Finnhub, FMP, NewsAPI, Massive, yfinance `.info`) plus an OpenAI-compatible
+chat completions endpoint.
+
+Responses are replayed from fixtures in data/standin/fixtures/<provider>/.
+A per-ticker file (e.g. `company-news.AAPL.json`) takes precedence over the
+generic one, whose `{ticker}` placeholders are filled in. `"$now-3600"` and
+`"$iso_now-3600"` become epoch / ISO timestamps relative to the request time,
+so replayed news always looks recent.
+
+Latency distributions, error rates and upstream rate limits are configured per
+provider in data/standin/profile.json and can be swapped at runtime through
+`POST /_standin/profile`, so production load shapes can be reproduced locally.
+
+Usage:
+    python -m tools.provider_standin --port 8765 --seed 7
+    USE_PROVIDER_STANDIN=true uvicorn main:app
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STANDIN_DIR = Path(__file__).resolve().parent.parent / "data" / "standin"
+FIXTURES_DIR = STANDIN_DIR / "fixtures"
+DEFAULT_PROFILE = STANDIN_DIR / "profile.json"
+
+SERIES_ANCHOR = datetime(2020, 1, 1)
+
+_TIME_TOKEN = re.compile(r"^\$(now|iso_now)([+-]\d+)?$")
+
+
+class ProviderProfile:
+    """Latency / error / rate-limit behaviour for one provider."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.latency: Dict[str, Any] = spec.get("latency") or {"distribution": "fixed", "ms": 0}
+        self.error_rate: float = float(spec.get("error_rate", 0.0))
+        self.rate_limit: Optional[Dict[str, Any]] = spec.get("rate_limit")
+
+    def sample_latency_ms(self, rng: random.Random) -> float:
+        dist = self.latency.get("distribution", "fixed")
+        if dist == "fixed":
+            return float(self.latency.get("ms", 0))
+        if dist == "uniform":
+            return rng.uniform(self.latency.get("min_ms", 0), self.latency.get("max_ms", 0))
+        if dist == "normal":
+            return max(0.0, rng.gauss(self.latency.get("mean_ms", 0), self.latency.get("std_ms", 0)))
+        if dist == "lognormal":
+            median = float(self.latency.get("median_ms", 0))
+            if median <= 0:
+                return 0.0
+            return rng.lognormvariate(math.log(median), float(self.latency.get("sigma", 0.5)))
+        raise ValueError(f"Unknown latency distribution: {dist}")
+
+
+class StandinState:
+    """Mutable server state: active profile, RNG, rate-limit windows and counters."""
+
+    def __init__(self, profile: Dict[str, Any], seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.load_profile(profile)
+
+    def load_profile(self, profile: Dict[str, Any]):
+        self.raw_profile = profile
+        default = profile.get("default", {})
+        self.profiles = {name: ProviderProfile({**default, **spec}) for name, spec in profile.items()}
+        self.default_profile = ProviderProfile(default)
+        self.windows: Dict[str, Deque[float]] = defaultdict(deque)
+        self.stats: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+            "requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "latency_ms_total": 0.0,
+        })
+
+    def profile_for(self, provider: str) -> ProviderProfile:
+        return self.profiles.get(provider, self.default_profile)
+
+    def check_rate_limit(self, provider: str) -> Optional[float]:
+        """Record a call; return seconds until capacity frees up if the call exceeds the limit."""
+        limit = self.profile_for(provider).rate_limit
+        if not limit:
+            return None
+        window = self.windows[provider]
+        now = time.time()
+        window_s = float(limit["window_s"])
+        while window and now - window[0] >= window_s:
+            window.popleft()
+        if len(window) >= int(limit["calls"]):
+            return window_s - (now - window[0])
+        window.append(now)
+        return None
+
+
+# --- Fixture loading ---
+
+def _render(value: Any, ctx: Dict[str, str], now: float) -> Any:
+    if isinstance(value, dict):
+        return {k: _render(v, ctx, now) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_render(v, ctx, now) for v in value]
+    if isinstance(value, str):
+        match = _TIME_TOKEN.match(value)
+        if match:
+            ts = now + int(match.group(2) or 0)
+            if match.group(1) == "now":
+                return int(ts)
+            return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        for key, replacement in ctx.items():
+            value = value.replace("{" + key + "}", replacement)
+        return value
+    return value
+
+
+def load_fixture(provider: str, name: str, ticker: Optional[str] = None) -> Any:
+    """Load `<name>.<TICKER>.json` if recorded, else `<name>.json`, with placeholders rendered."""
+    folder = FIXTURES_DIR / provider
+    candidates = [folder / f"{name}.{ticker.upper()}.json"] if ticker else []
+    candidates.append(folder / f"{name}.json")
+    for path in candidates:
+        if path.exists():
+            with open(path) as f:
+                data = json.load(f)
+            return _render(data, {"ticker": (ticker or "").upper()}, time.time())
+    raise FileNotFoundError(f"No fixture for {provider}/{name}")
+
+
+# --- Synthetic price series (Massive aggregates / last trade / snapshots) ---
+
+def _ticker_seed(ticker: str) -> int:
+    return int(hashlib.sha256(ticker.upper().encode()).hexdigest()[:8], 16)
+
+
+def daily_bars(ticker: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """Deterministic random-walk daily bars, or a recorded `aggs.<TICKER>.json` replayed verbatim."""
+    try:
+        recorded = load_fixture("massive", "aggs", ticker)
+    except FileNotFoundError:
+        recorded = {}
+    if "results" in recorded:
+        return recorded["results"]
+
+    rng = random.Random(_ticker_seed(ticker))
+    price = float(recorded.get("start_price", 100.0)) * (0.5 + rng.random())
+    drift = float(recorded.get("daily_drift", 0.0005))
+    vol = float(recorded.get("daily_volatility", 0.015))
+    base_volume = float(recorded.get("volume", 10_000_000))
+
+    # Walk from a fixed anchor so every window of the same ticker sees the same prices
+    bars = []
+    day = SERIES_ANCHOR
+    while day <= end:
+        if day.weekday() < 5:
+            open_ = price
+            price = max(1.0, price * math.exp(rng.gauss(drift, vol)))
+            high = max(open_, price) * (1 + abs(rng.gauss(0, vol / 2)))
+            low = min(open_, price) * (1 - abs(rng.gauss(0, vol / 2)))
+            bars.append({
+                "o": round(open_, 2), "h": round(high, 2), "l": round(low, 2), "c": round(price, 2),
+                "v": int(base_volume * (0.6 + rng.random() * 0.8)),
+                "vw": round((high + low + price) / 3, 2),
+                "t": int(day.replace(tzinfo=timezone.utc).timestamp() * 1000),
+                "n": int(rng.uniform(200_000, 900_000)),
+            })
+        day += timedelta(days=1)
+    start_ms = start.replace(tzinfo=timezone.utc).timestamp() * 1000
+    return [bar for bar in bars if bar["t"] >= start_ms]
+
+
+def _last_bar(ticker: str) -> Dict[str, Any]:
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    bars = daily_bars(ticker, today - timedelta(days=400), today)
+    return bars[-1]
+
+
+def _parse_date(value: str) -> datetime:
+    if value.isdigit():
+        return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc).replace(tzinfo=None)
+    return datetime.strptime(value[:10], "%Y-%m-%d")
+
+
+# --- Provider handlers: (provider, path regex) -> handler(match, query, body) ---
+
+Handler = Callable[[re.Match, Dict[str, str], Dict[str, Any]], Any]
+
+
+def _finnhub_company_news(m, q, body):
+    return load_fixture("finnhub", "company-news", q.get("symbol"))
+
+
+def _finnhub_news_sentiment(m, q, body):
+    return load_fixture("finnhub", "news-sentiment", q.get("symbol"))
+
+
+def _fmp_statement(m, q, body):
+    data = load_fixture("fmp", m.group("endpoint"), m.group("ticker"))
+    limit = int(q.get("limit", len(data)))
+    return data[:limit]
+
+
+def _newsapi_everything(m, q, body):
+    data = load_fixture("newsapi", "everything", q.get("q"))
+    page_size = int(q.get("pageSize", len(data["articles"])))
+    since = q.get("from")
+    articles = data["articles"]
+    if since:
+        articles = [a for a in articles if a.get("publishedAt", "") > since]
+    return {**data, "totalResults": len(articles), "articles": articles[:page_size]}
+
+
+def _massive_aggs(m, q, body):
+    ticker = m.group("ticker")
+    bars = daily_bars(ticker, _parse_date(m.group("from")), _parse_date(m.group("to")))
+    return {"ticker": ticker, "status": "OK", "adjusted": True, "queryCount": len(bars),
+            "resultsCount": len(bars), "results": bars}
+
+
+def _massive_last_trade(m, q, body):
+    ticker = m.group("ticker")
+    bar = _last_bar(ticker)
+    return {"status": "OK", "results": {"T": ticker, "p": bar["c"], "s": 100, "t": time.time_ns()}}
+
+
+def _massive_snapshot(m, q, body):
+    tickers = [t for t in q.get("tickers", "").split(",") if t]
+    snapshots = []
+    for ticker in tickers:
+        bar = _last_bar(ticker)
+        snapshots.append({
+            "ticker": ticker.upper(),
+            "day": bar,
+            "lastTrade": {"T": ticker.upper(), "p": bar["c"], "s": 100, "t": time.time_ns()},
+            "todaysChange": round(bar["c"] - bar["o"], 2),
+            "todaysChangePerc": round((bar["c"] - bar["o"]) / bar["o"] * 100, 3),
+            "updated": time.time_ns(),
+        })
+    return {"status": "OK", "count": len(snapshots), "tickers": snapshots}
+
+
+def _yfinance_info(m, q, body):
+    return load_fixture("yfinance", "info", m.group("ticker"))
+
+
+def _openai_chat(m, q, body):
+    messages = body.get("messages", [])
+    system = " ".join(str(msg.get("content", "")) for msg in messages if msg.get("role") == "system").lower()
+    content = ""
+    for rule in load_fixture("openai", "chat-completions")["rules"]:
+        if rule["match"].lower() in system and rule.get("match_also", "").lower() in system:
+            content = rule["content"]
+            break
+
+    prompt_tokens = sum(len(str(msg.get("content", ""))) for msg in messages) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-standin-{int(time.time() * 1000)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "standin"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+ROUTES: List[Tuple[str, re.Pattern, Handler]] = [
+    ("finnhub", re.compile(r"^company-news$"), _finnhub_company_news),
+    ("finnhub", re.compile(r"^news-sentiment$"), _finnhub_news_sentiment),
+    ("fmp", re.compile(r"^api/v3/(?P<endpoint>income-statement|key-metrics|ratios)/(?P<ticker>[^/]+)$"), _fmp_statement),
+    ("newsapi", re.compile(r"^v2/everything$"), _newsapi_everything),
+    ("massive", re.compile(r"^v2/aggs/ticker/(?P<ticker>[^/]+)/range/\d+/\w+/(?P<from>[^/]+)/(?P<to>[^/]+)$"), _massive_aggs),
+    ("massive", re.compile(r"^v2/last/trade/(?P<ticker>[^/]+)$"), _massive_last_trade),
+    ("massive", re.compile(r"^v2/snapshot/locale/us/markets/stocks/tickers$"), _massive_snapshot),
+    ("yfinance", re.compile(r"^info/(?P<ticker>[^/]+)$"), _yfinance_info),
+    ("openai", re.compile(r"^(v1/)?chat/completions$"), _openai_chat),
+]
+
+
+def _error_response(provider: str, status: int, retry_after: Optional[float] = None) -> JSONResponse:
+    headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after is not None else {}
+    if provider == "openai":
+        kind = "rate_limit_exceeded" if status == 429 else "server_error"
+        body = {"error": {"message": f"Stand-in {kind}", "type": kind, "code": kind}}
+    elif provider == "newsapi":
+        body = {"status": "error", "code": "rateLimited" if status == 429 else "unexpectedError",
+                "message": "Stand-in error"}
+    else:
+        body = {"error": "API limit reached" if status == 429 else "Internal server error"}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def create_app(profile: Optional[Dict[str, Any]] = None, seed: Optional[int] = None) -> FastAPI:
+    if profile is None:
+        with open(DEFAULT_PROFILE) as f:
+            profile = json.load(f)
+
+    state = StandinState(profile, seed)
+    app = FastAPI(title="Provider Stand-in", version="1.0.0")
+    app.state.standin = state
+
+    @app.get("/_standin/stats")
+    def stats():
+        return {provider: dict(s) for provider, s in state.stats.items()}
+
+    @app.get("/_standin/profile")
+    def get_profile():
+        return state.raw_profile
+
+    @app.post("/_standin/profile")
+    async def set_profile(request: Request):
+        state.load_profile(await request.json())
+        return {"status": "ok"}
+
+    @app.api_route("/{provider}/{path:path}", methods=["GET", "POST"])
+    async def provider_call(provider: str, path: str, request: Request):
+        # finnhub-python joins API_URL and "/company-news" with an extra slash
+        path = re.sub(r"/+", "/", path).strip("/")
+        route = None
+        for name, pattern, handler in ROUTES:
+            match = pattern.match(path) if name == provider else None
+            if match:
+                route = (match, handler)
+                break
+        if route is None:
+            return JSONResponse({"error": f"Stand-in has no route for {provider}/{path}"}, status_code=404)
+
+        stats = state.stats[provider]
+        stats["requests"] += 1
+        profile = state.profile_for(provider)
+
+        latency_ms = profile.sample_latency_ms(state.rng)
+        stats["latency_ms_total"] += latency_ms
+        await asyncio.sleep(latency_ms / 1000)
+
+        retry_after = state.check_rate_limit(provider)
+        if retry_after is not None:
+            stats["rate_limited"] += 1
+            return _error_response(provider, 429, retry_after)
+        if state.rng.random() < profile.error_rate:
+            stats["errors"] += 1
+            return _error_response(provider, state.rng.choice([500, 502, 503]))
+
+        body = await request.json() if request.method == "POST" else {}
+        match, handler = route
+        try:
+            payload = handler(match, dict(request.query_params), body)
+        except FileNotFoundError as e:
+            return JSONResponse({"error": str(e)}, status_code=404)
+        stats["ok"] += 1
+
+        if provider == "openai" and body.get("stream"):
+            return StreamingResponse(_stream_chat(payload), media_type="text/event-stream")
+        return JSONResponse(copy.deepcopy(payload))
+
+    return app
+
+
+async def _stream_chat(completion: Dict[str, Any]):
+    """Replay a completion as a single OpenAI streaming chunk."""
+    chunk = {
+        "id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+        "model": completion["model"],
+        "choices": [{"index": 0, "delta": completion["choices"][0]["message"], "finish_reason": "stop"}],
+    }
+    yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Offline provider stand-in for load and latency testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", default=str(DEFAULT_PROFILE), help="Latency/error/rate-limit profile JSON")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency and error sampling")
+    args = parser.parse_args()
+
+    with open(args.profile) as f:
+        profile = json.load(f)
+    uvicorn.run(create_app(profile, args.seed), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()